@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from meldingen.config import settings
 from meldingen.dependencies import database_engine, database_session, database_session_manager
 from meldingen.models import Classification
+from meldingen.repositories import ClassificationResultRepository
 
 app = typer.Typer()
 
@@ -43,3 +44,24 @@ async def create_fallback_classification() -> None:
 @app.command()
 def ensure_fallback() -> None:
     asyncio.run(create_fallback_classification())
+
+
+async def delete_expired_classification_results(batch_size: int = 1000) -> int:
+    counter = 0
+
+    async for session in database_session(database_session_manager(database_engine())):
+        repository = ClassificationResultRepository(session)
+
+        while (deleted := await repository.delete_batch_expired(batch_size)) > 0:
+            counter += deleted
+
+    typer.echo(f"✅ - Deleted {counter} expired classification results")
+
+    return counter
+
+
+@app.command()
+def delete_expired_results(
+    batch_size: int = typer.Option(1000, min=1, help="The number of results deleted per transaction"),
+) -> None:
+    asyncio.run(delete_expired_classification_results(batch_size))
@@ -1,10 +1,16 @@
 import asyncio
+import sys
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Mapping
+from typing import Any, TextIO
 
 import typer
 from meldingen_core.statemachine import MeldingStates
 from rich import print
 
 from meldingen.dependencies import database_engine, database_session, database_session_manager
+from meldingen.export import EXPORT_SERIALIZERS, ExportFormat, buffered
+from meldingen.filters import MeldingListFilters, area_from_feature, backoffice_states_from_param
 from meldingen.repositories import MeldingRepository
 
 app = typer.Typer()
@@ -19,25 +25,115 @@ DRAFT_MELDING_STATES = (
 )
 
 
-async def delete_expired_draft_meldingen() -> None:
+async def delete_expired_draft_meldingen(batch_size: int = 1000) -> int:
+    """Deletes the expired drafts in batches, committing after every batch.
+
+    An interrupted run keeps everything deleted so far, running it again continues with what is left.
+    """
+    counter = 0
+    started = time.monotonic()
 
     async for session in database_session(database_session_manager(database_engine())):
         melding_repository = MeldingRepository(session)
 
-        result = await melding_repository.delete_with_expired_token_and_in_states(DRAFT_MELDING_STATES)
+        while True:
+            ids = await melding_repository.delete_batch_with_expired_token_and_in_states(
+                DRAFT_MELDING_STATES, batch_size
+            )
+            if len(ids) == 0:
+                break
+
+            counter += len(ids)
+            elapsed = time.monotonic() - started
+            print(
+                f"Deleted {len(ids)} meldingen (ids {min(ids)}-{max(ids)}), "
+                f"{counter} in total, {counter / elapsed if elapsed else 0:.0f} per second"
+            )
+
+    print(f"[green]Success[/green] - Deleted {counter} expired draft meldingen.")
+
+    return counter
+
+
+@app.command()
+def delete_expired_drafts(
+    batch_size: int = typer.Option(1000, min=1, help="The number of meldingen deleted per transaction"),
+) -> None:
+    asyncio.run(delete_expired_draft_meldingen(batch_size))
+
 
-        counter = 0
-        for melding in result:
-            print(f"Deleted melding {melding.id} expired on {melding.token_expires} with state {melding.state}")
+async def export_meldingen(
+    output: TextIO, format: ExportFormat, filters: MeldingListFilters, batch_size: int = 1000
+) -> int:
+    """Writes the export to `output` while it is read from the database, returns the number of exported meldingen."""
+    counter = 0
 
+    async def count(rows: AsyncIterable[Mapping[Any, Any]]) -> AsyncIterator[Mapping[Any, Any]]:
+        nonlocal counter
+        async for row in rows:
             counter += 1
+            yield row
+
+    async for session in database_session(database_session_manager(database_engine())):
+        rows = MeldingRepository(session).stream_export_rows(filters, batch_size)
+
+        async for chunk in buffered(EXPORT_SERIALIZERS[format](count(rows))):
+            output.write(chunk)
+
+    # The export itself may be written to stdout
+    print(f"[green]Success[/green] - Exported {counter} meldingen.", file=sys.stderr)
+
+    return counter
+
+
+@app.command()
+def export(
+    output: typer.FileTextWrite = typer.Option("-", help="The file to write the export to, - writes to stdout"),
+    format: ExportFormat = typer.Option(ExportFormat.NDJSON, help="The format of the export"),
+    in_area: str | None = typer.Option(None, help="GeoJSON Feature which the melding location should reside in"),
+    state: str | None = typer.Option(
+        None, help="Comma-separated list of states, if left empty all backoffice states are exported"
+    ),
+    q: str | None = typer.Option(None, help="Full-text search on the text of the melding"),
+    batch_size: int = typer.Option(1000, min=1, help="The number of meldingen fetched per round trip"),
+) -> None:
+    filters = MeldingListFilters(
+        area=None if in_area is None else area_from_feature(in_area),
+        states=backoffice_states_from_param(state),
+        q=q or None,
+    )
+
+    asyncio.run(export_meldingen(output, format, filters, batch_size))
+
+
+async def rebuild_melding_statistics() -> int:
+    rows = 0
+    async for session in database_session(database_session_manager(database_engine())):
+        rows = await MeldingRepository(session).rebuild_statistics()
+
+    print(f"[green]Success[/green] - Rebuilt the melding statistics, {rows} rows.")
+
+    return rows
+
+
+@app.command()
+def rebuild_statistics() -> None:
+    asyncio.run(rebuild_melding_statistics())
+
+
+async def compact_melding_statistics() -> int:
+    rows = 0
+    async for session in database_session(database_session_manager(database_engine())):
+        rows = await MeldingRepository(session).compact_statistics()
+
+    print(f"[green]Success[/green] - Compacted the melding statistics to {rows} rows.")
 
-        print(f"[green]Success[/green] - Deleted {counter} expired draft meldingen.")
+    return rows
 
 
 @app.command()
-def delete_expired_drafts() -> None:
-    asyncio.run(delete_expired_draft_meldingen())
+def compact_statistics() -> None:
+    asyncio.run(compact_melding_statistics())
 
 
 if __name__ == "__main__":
@@ -1,4 +1,5 @@
 CREATE DATABASE "meldingen-test";
 \c "meldingen-test";
 CREATE EXTENSION IF NOT EXISTS postgis;
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 GRANT ALL PRIVILEGES ON DATABASE "meldingen-test" to meldingen;
@@ -4,9 +4,10 @@ from typing import TypeVar
 from fastapi import HTTPException
 from meldingen_core import SortingDirection
 from meldingen_core.actions.base import BaseListAction as BaseCoreListAction
-from meldingen_core.filters import NameListFilters
 from starlette.status import HTTP_422_UNPROCESSABLE_CONTENT
 
+from meldingen.filters import NameListFilters
+from meldingen.pagination import InvalidCursorException, KeysetCursor
 from meldingen.repositories import AttributeNotFoundException
 
 T = TypeVar("T")
@@ -21,6 +22,7 @@ class BaseListAction(BaseCoreListAction[T]):
         sort_direction: SortingDirection | None = None,
         filters: NameListFilters | None = None,
         apply_visibility_filters: bool = True,
+        cursor: KeysetCursor | None = None,
     ) -> Sequence[T]:
         try:
             return await self._repository.list(
@@ -30,9 +32,15 @@ class BaseListAction(BaseCoreListAction[T]):
                 sort_direction=sort_direction,
                 filters=filters,
                 apply_visibility_filters=apply_visibility_filters,
+                cursor=cursor,
             )
         except AttributeNotFoundException as e:
             raise HTTPException(
                 HTTP_422_UNPROCESSABLE_CONTENT,
                 [{"loc": ("query", "sort"), "msg": e.message, "type": "attribute_not_found"}],
             )
+        except InvalidCursorException as e:
+            raise HTTPException(
+                HTTP_422_UNPROCESSABLE_CONTENT,
+                [{"loc": ("query", "cursor"), "msg": e.message, "type": "invalid_cursor"}],
+            )
@@ -1,5 +1,5 @@
 from collections.abc import Sequence
-from typing import Any
+from typing import Any, override
 
 from fastapi import HTTPException
 from meldingen_core.actions.base import BaseCRUDAction, BaseDeleteAction, BaseRetrieveAction
@@ -10,6 +10,7 @@ from starlette.status import HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND, HTTP_422_
 from meldingen.actions.base import BaseListAction
 from meldingen.exceptions import MeldingNotClassifiedException
 from meldingen.factories import AnswerFactory, FormIoQuestionComponentFactory
+from meldingen.form_cache import FormOutputCache
 from meldingen.jsonlogic import JSONLogicValidationException, JSONLogicValidator
 from meldingen.models import (
     Answer,
@@ -31,6 +32,7 @@ from meldingen.models import (
     Melding,
     Question,
     StaticForm,
+    StaticFormTypeEnum,
 )
 from meldingen.repositories import (
     AnswerRepository,
@@ -49,6 +51,7 @@ from meldingen.schemas.input import (
     StaticFormInput,
     TextAnswerInput,
 )
+from meldingen.validators import PrimaryFormSnapshot
 
 
 class BaseFormCreateUpdateAction(BaseCRUDAction[Form]):
@@ -265,6 +268,7 @@ class BaseFormCreateUpdateAction(BaseCRUDAction[Form]):
 
 class FormCreateAction(BaseFormCreateUpdateAction):
     _classification_repository: ClassificationRepository
+    _cache: FormOutputCache
 
     def __init__(
         self,
@@ -272,9 +276,11 @@ class FormCreateAction(BaseFormCreateUpdateAction):
         classification_repository: ClassificationRepository,
         question_repository: QuestionRepository,
         form_io_question_component_factory: FormIoQuestionComponentFactory,
+        cache: FormOutputCache,
     ):
         super().__init__(repository, question_repository, form_io_question_component_factory)
         self._classification_repository = classification_repository
+        self._cache = cache
 
     async def __call__(self, form_input: FormInput) -> Form:
         classification = None
@@ -291,6 +297,7 @@ class FormCreateAction(BaseFormCreateUpdateAction):
 
         await self._create_components(form, form_input.components)
         await self._repository.save(form)
+        self._cache.invalidate()
 
         return form
 
@@ -298,14 +305,32 @@ class FormCreateAction(BaseFormCreateUpdateAction):
 class FormListAction(BaseListAction[Form]): ...
 
 
-class FormRetrieveAction(BaseRetrieveAction[Form]): ...
+class FormRetrieveAction(BaseRetrieveAction[Form]):
+    _repository: FormRepository
+
+    def __init__(self, repository: FormRepository):
+        super().__init__(repository)
+
+    @override
+    async def __call__(self, pk: int) -> Form | None:
+        return await self._repository.retrieve(pk, with_components=True)
+
+
+class FormDeleteAction(BaseDeleteAction[Form]):
+    _cache: FormOutputCache
 
+    def __init__(self, repository: FormRepository, cache: FormOutputCache):
+        super().__init__(repository)
+        self._cache = cache
 
-class FormDeleteAction(BaseDeleteAction[Form]): ...
+    async def __call__(self, pk: int) -> None:
+        await super().__call__(pk)
+        self._cache.invalidate()
 
 
 class FormUpdateAction(BaseFormCreateUpdateAction):
     _classification_repository: ClassificationRepository
+    _cache: FormOutputCache
 
     def __init__(
         self,
@@ -313,9 +338,11 @@ class FormUpdateAction(BaseFormCreateUpdateAction):
         classification_repository: ClassificationRepository,
         question_repository: QuestionRepository,
         form_io_question_component_factory: FormIoQuestionComponentFactory,
+        cache: FormOutputCache,
     ):
         super().__init__(repository, question_repository, form_io_question_component_factory)
         self._classification_repository = classification_repository
+        self._cache = cache
 
     async def __call__(self, pk: int, form_input: FormInput) -> Form:
         obj = await self._repository.retrieve(pk=pk)
@@ -347,6 +374,7 @@ class FormUpdateAction(BaseFormCreateUpdateAction):
         await self._sync_component_tree(obj, form_input.components)
 
         await self._repository.save(obj)
+        self._cache.invalidate()
 
         return obj
 
@@ -356,7 +384,7 @@ class FormRetrieveByClassificationAction(BaseCRUDAction[Form]):
 
     async def __call__(self, classification_id: int) -> Form:
         try:
-            return await self._repository.find_by_classification_id(classification_id)
+            return await self._repository.find_by_classification_id(classification_id, with_components=True)
         except NotFoundException:
             raise HTTPException(status_code=HTTP_404_NOT_FOUND)
 
@@ -550,11 +578,20 @@ class StaticFormRetrieveAction(BaseCRUDAction[StaticForm]):
         super().__init__(repository)
 
     async def __call__(self, static_form_id: int) -> StaticForm | None:
-        return await self._repository.retrieve(static_form_id)
+        return await self._repository.retrieve(static_form_id, with_components=True)
 
 
 class StaticFormUpdateAction(BaseCRUDAction[StaticForm]):
     _repository: StaticFormRepository
+    _cache: FormOutputCache
+    _primary_form_snapshot: PrimaryFormSnapshot
+
+    def __init__(
+        self, repository: StaticFormRepository, cache: FormOutputCache, primary_form_snapshot: PrimaryFormSnapshot
+    ):
+        super().__init__(repository)
+        self._cache = cache
+        self._primary_form_snapshot = primary_form_snapshot
 
     async def _create_component_values(
         self, component: BaseFormIoValuesComponent, values: list[dict[str, Any]]
@@ -647,6 +684,10 @@ class StaticFormUpdateAction(BaseCRUDAction[StaticForm]):
 
         await self._create_components(obj, form_input.components)
         await self._repository.save(obj)
+        self._cache.invalidate()
+
+        if obj.type == StaticFormTypeEnum.primary:
+            await self._primary_form_snapshot.refresh(self._repository)
 
         return obj
 
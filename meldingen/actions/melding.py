@@ -1,4 +1,8 @@
+from collections import defaultdict
 from collections.abc import Sequence
+from dataclasses import dataclass
+from enum import StrEnum
+from itertools import groupby
 from typing import override
 
 from fastapi import BackgroundTasks, HTTPException
@@ -12,21 +16,31 @@ from meldingen_core.actions.melding import MeldingRetrieveAction as BaseMeldingR
 from meldingen_core.actions.melding import MeldingSubmitAction as BaseMeldingSubmitAction
 from meldingen_core.actions.melding import MeldingSubmitActionMelder as BaseMeldingSubmitActionMelder
 from meldingen_core.address import BaseAddressEnricher
-from meldingen_core.exceptions import NotFoundException
-from meldingen_core.filters import MeldingListFilters
+from meldingen_core.exceptions import LimitReachedException, NotFoundException
+from meldingen_core.labels import InvalidLabelException
 from meldingen_core.repositories import BaseMeldingRepository
-from meldingen_core.statemachine import MeldingBackofficeStates
+from meldingen_core.statemachine import MeldingBackofficeStates, MeldingTransitions
 from meldingen_core.token import TokenVerifier
+from mp_fsm.statemachine import GuardException, WrongStateException
 from starlette.status import HTTP_422_UNPROCESSABLE_CONTENT
 
+from meldingen.filters import MeldingListFilters
 from meldingen.location import MeldingLocationIngestor, WKBToPointShapeTransformer
+from meldingen.mail import AmsterdamMailServiceMeldingBulkCompleteMailer
 from meldingen.models import Answer, Asset, AssetType, Melding
-from meldingen.repositories import AttributeNotFoundException
+from meldingen.pagination import InvalidCursorException, KeysetCursor
+from meldingen.repositories import AttributeNotFoundException, LabelRepository, MeldingRepository
 from meldingen.schemas.types import Address, GeoJson
 from meldingen.statemachine import MeldingStateMachine
+from meldingen.tiles import VectorTileCache, cluster_cell_size
 
 
 class MeldingListAction(BaseMeldingListAction[Melding]):
+    _repository: MeldingRepository
+
+    def __init__(self, repository: MeldingRepository):
+        super().__init__(repository)
+
     @override
     async def __call__(
         self,
@@ -36,14 +50,46 @@ class MeldingListAction(BaseMeldingListAction[Melding]):
         sort_attribute_name: str | None = None,
         sort_direction: SortingDirection | None = None,
         filters: MeldingListFilters | None = None,
+        cursor: KeysetCursor | None = None,
     ) -> Sequence[Melding]:
         try:
-            return await super().__call__(
+            return await self._repository.list_meldingen(
+                limit=limit,
+                offset=offset,
+                sort_attribute_name=sort_attribute_name,
+                sort_direction=sort_direction,
+                filters=filters,
+                loader_profile="backoffice_list",
+                cursor=cursor,
+            )
+        except AttributeNotFoundException as e:
+            raise HTTPException(
+                HTTP_422_UNPROCESSABLE_CONTENT,
+                [{"loc": ("query", "sort"), "msg": e.message, "type": "attribute_not_found"}],
+            )
+        except InvalidCursorException as e:
+            raise HTTPException(
+                HTTP_422_UNPROCESSABLE_CONTENT,
+                [{"loc": ("query", "cursor"), "msg": e.message, "type": "invalid_cursor"}],
+            )
+
+    async def with_total(
+        self,
+        *,
+        limit: int | None = None,
+        offset: int | None = None,
+        sort_attribute_name: str | None = None,
+        sort_direction: SortingDirection | None = None,
+        filters: MeldingListFilters | None = None,
+    ) -> tuple[Sequence[Melding], int | None]:
+        try:
+            return await self._repository.list_meldingen_with_total(
                 limit=limit,
                 offset=offset,
                 sort_attribute_name=sort_attribute_name,
                 sort_direction=sort_direction,
                 filters=filters,
+                loader_profile="backoffice_list",
             )
         except AttributeNotFoundException as e:
             raise HTTPException(
@@ -52,7 +98,15 @@ class MeldingListAction(BaseMeldingListAction[Melding]):
             )
 
 
-class MeldingRetrieveAction(BaseMeldingRetrieveAction[Melding]): ...
+class MeldingRetrieveAction(BaseMeldingRetrieveAction[Melding]):
+    _repository: MeldingRepository
+
+    def __init__(self, repository: MeldingRepository):
+        super().__init__(repository)
+
+    @override
+    async def __call__(self, pk: int) -> Melding | None:
+        return await self._repository.retrieve(pk, loader_profile="detail")
 
 
 class MelderMeldingRetrieveAction:
@@ -116,6 +170,73 @@ class AddLocationToMeldingAction:
         return melding
 
 
+class MeldingVectorTileAction:
+    _repository: MeldingRepository
+    _cache: VectorTileCache
+
+    def __init__(self, repository: MeldingRepository, cache: VectorTileCache) -> None:
+        self._repository = repository
+        self._cache = cache
+
+    async def __call__(self, z: int, x: int, y: int, states: Sequence[str]) -> bytes:
+        key = self._cache.key(states, z, x, y)
+
+        tile = self._cache.get(key)
+        if tile is None:
+            tile = await self._repository.vector_tile(z, x, y, states)
+            self._cache.put(key, tile)
+
+        return tile
+
+
+@dataclass(frozen=True)
+class MeldingCluster:
+    longitude: float
+    latitude: float
+    count: int
+    states: dict[str, int]
+    classifications: dict[int, int]
+
+
+class MeldingClusterAction:
+    """Groups the meldingen within a bounding box into a grid of cells that are about 64 pixels on the map.
+
+    Each cluster is placed on the average location of its meldingen and counts them per state and classification.
+    """
+
+    _repository: MeldingRepository
+
+    def __init__(self, repository: MeldingRepository) -> None:
+        self._repository = repository
+
+    async def __call__(
+        self, bbox: tuple[float, float, float, float], zoom: int, filters: MeldingListFilters | None = None
+    ) -> list[MeldingCluster]:
+        cell_size = cluster_cell_size(zoom, (bbox[1] + bbox[3]) / 2)
+        rows = await self._repository.cluster(bbox, cell_size, filters)
+
+        clusters = []
+        for _, cell_rows in groupby(rows, key=lambda row: (row[0], row[1])):
+            count = 0
+            longitude = latitude = 0.0
+            states: dict[str, int] = defaultdict(int)
+            classifications: dict[int, int] = defaultdict(int)
+
+            for _, _, state, classification_id, row_count, row_longitude, row_latitude in cell_rows:
+                count += row_count
+                longitude += row_longitude * row_count
+                latitude += row_latitude * row_count
+                states[state] += row_count
+                if classification_id is not None:
+                    classifications[classification_id] += row_count
+
+            clusters.append(
+                MeldingCluster(longitude / count, latitude / count, count, dict(states), dict(classifications))
+            )
+
+        return clusters
+
+
 class MeldingGetPossibleNextStatesAction:
     _state_machine: MeldingStateMachine
     _melding_repository: BaseMeldingRepository[Melding]
@@ -137,3 +258,160 @@ class MeldingGetPossibleNextStatesAction:
             for transition_name, transition in self._state_machine._state_machine._transitions.items()
             if melding_state in transition.from_states and melding_state in MeldingBackofficeStates
         ]
+
+
+async def select_bulk_melding_ids(
+    repository: MeldingRepository, limit: int, ids: Sequence[int] | None, filters: MeldingListFilters | None
+) -> list[int]:
+    """Resolves the meldingen of a bulk operation to their ids, without duplicates and at most `limit` of them."""
+    if ids is not None:
+        ids = list(dict.fromkeys(ids))
+    elif filters is not None:
+        # One more than the limit, to tell a filter that matches exactly the limit from one that matches more
+        ids = list(await repository.find_ids(filters, limit + 1))
+    else:
+        raise ValueError("Either ids or filters must be given")
+
+    if len(ids) > limit:
+        raise LimitReachedException(f"A bulk operation can change at most {limit} meldingen")
+
+    return ids
+
+
+class MeldingBulkTransitionStatus(StrEnum):
+    TRANSITIONED = "transitioned"
+    NOT_FOUND = "not_found"
+    TRANSITION_NOT_ALLOWED = "transition_not_allowed"
+
+
+@dataclass(frozen=True)
+class MeldingBulkTransitionResult:
+    id: int
+    status: MeldingBulkTransitionStatus
+    state: str | None = None
+
+
+class MeldingBulkTransitionAction:
+    """Applies one transition to many meldingen, selected by id or by the filters of the melding list.
+
+    Every chunk of meldingen is loaded and locked in a single query, after which the transition and its guards
+    are evaluated in memory. A melding that does not exist or cannot make the transition is reported in the results
+    instead of failing the request. Each chunk is committed as one transaction, without a chunk size the whole
+    request is. The completed mails are queued once, after all chunks have been committed.
+    """
+
+    _state_machine: MeldingStateMachine
+    _repository: MeldingRepository
+    _complete_mailer: AmsterdamMailServiceMeldingBulkCompleteMailer
+    _limit: int
+    _chunk_size: int | None
+
+    def __init__(
+        self,
+        state_machine: MeldingStateMachine,
+        repository: MeldingRepository,
+        complete_mailer: AmsterdamMailServiceMeldingBulkCompleteMailer,
+        limit: int,
+        chunk_size: int | None = None,
+    ) -> None:
+        self._state_machine = state_machine
+        self._repository = repository
+        self._complete_mailer = complete_mailer
+        self._limit = limit
+        self._chunk_size = chunk_size
+
+    async def __call__(
+        self,
+        transition_name: str,
+        *,
+        ids: Sequence[int] | None = None,
+        filters: MeldingListFilters | None = None,
+        mail_text: str | None = None,
+    ) -> list[MeldingBulkTransitionResult]:
+        ids = await select_bulk_melding_ids(self._repository, self._limit, ids, filters)
+
+        results: dict[int, MeldingBulkTransitionResult] = {}
+        completed: list[Melding] = []
+        chunk_size = self._chunk_size or max(len(ids), 1)
+
+        for start in range(0, len(ids), chunk_size):
+            meldingen = await self._repository.list_by_ids_for_update(ids[start : start + chunk_size])
+
+            for melding in meldingen:
+                try:
+                    await self._state_machine.transition(melding, transition_name)
+                except (WrongStateException, GuardException):
+                    results[melding.id] = MeldingBulkTransitionResult(
+                        melding.id, MeldingBulkTransitionStatus.TRANSITION_NOT_ALLOWED, melding.state
+                    )
+                    continue
+
+                await self._repository.save(melding, commit=False)
+                results[melding.id] = MeldingBulkTransitionResult(
+                    melding.id, MeldingBulkTransitionStatus.TRANSITIONED, melding.state
+                )
+
+                if transition_name == MeldingTransitions.COMPLETE:
+                    completed.append(melding)
+
+            # Also releases the locks on the meldingen that were not transitioned
+            await self._repository.commit()
+
+        if mail_text is not None and len(completed) > 0:
+            await self._complete_mailer(completed, mail_text)
+
+        return [
+            results.get(_id, MeldingBulkTransitionResult(_id, MeldingBulkTransitionStatus.NOT_FOUND)) for _id in ids
+        ]
+
+
+@dataclass(frozen=True)
+class MeldingBulkLabelResult:
+    meldingen: int
+    added: int
+    removed: int
+
+
+class MeldingBulkLabelAction:
+    """Adds labels to and removes labels from many meldingen, selected by id or by the filters of the melding list.
+
+    Adding and removing are each a single set-based statement on the link table, both run in one transaction.
+    """
+
+    _melding_repository: MeldingRepository
+    _label_repository: LabelRepository
+    _limit: int
+
+    def __init__(self, melding_repository: MeldingRepository, label_repository: LabelRepository, limit: int) -> None:
+        self._melding_repository = melding_repository
+        self._label_repository = label_repository
+        self._limit = limit
+
+    async def __call__(
+        self,
+        *,
+        add: Sequence[int] = (),
+        remove: Sequence[int] = (),
+        ids: Sequence[int] | None = None,
+        filters: MeldingListFilters | None = None,
+    ) -> MeldingBulkLabelResult:
+        label_ids = set(add) | set(remove)
+        labels = await self._label_repository.list_by_ids(list(label_ids))
+        if len(labels) != len(label_ids):
+            unknown_label_ids = sorted(label_ids - {label.id for label in labels})
+
+            raise InvalidLabelException(f"Can't find labels with id's: {unknown_label_ids}")
+
+        ids = await select_bulk_melding_ids(self._melding_repository, self._limit, ids, filters)
+
+        added = 0
+        removed = 0
+        if len(ids) > 0:
+            if len(add) > 0:
+                added = await self._melding_repository.add_labels(ids, add)
+            if len(remove) > 0:
+                removed = await self._melding_repository.remove_labels(ids, remove)
+
+            await self._melding_repository.commit()
+
+        return MeldingBulkLabelResult(meldingen=len(ids), added=added, removed=removed)
@@ -1,3 +1,5 @@
+from typing import Any
+
 from meldingen_core.actions.user import UserCreateAction as BaseUserCreateAction
 from meldingen_core.actions.user import UserDeleteAction as BaseUserDeleteAction
 from meldingen_core.actions.user import UserListAction as BaseUserListAction
@@ -6,6 +8,8 @@ from meldingen_core.actions.user import UserUpdateAction as BaseUserUpdateAction
 
 from meldingen.actions.base import BaseListAction
 from meldingen.models import User
+from meldingen.principals import VerifiedPrincipalCache
+from meldingen.repositories import UserRepository
 
 
 class UserCreateAction(BaseUserCreateAction[User]): ...
@@ -17,7 +21,27 @@ class UserListAction(BaseUserListAction[User], BaseListAction[User]): ...
 class UserRetrieveAction(BaseUserRetrieveAction[User]): ...
 
 
-class UserUpdateAction(BaseUserUpdateAction[User]): ...
+class UserUpdateAction(BaseUserUpdateAction[User]):
+    _principal_cache: VerifiedPrincipalCache
+
+    def __init__(self, repository: UserRepository, principal_cache: VerifiedPrincipalCache) -> None:
+        super().__init__(repository)
+        self._principal_cache = principal_cache
+
+    async def __call__(self, pk: int, values: dict[str, Any]) -> User:
+        user = await super().__call__(pk, values)
+        self._principal_cache.invalidate_user(pk)
+
+        return user
+
+
+class UserDeleteAction(BaseUserDeleteAction[User]):
+    _principal_cache: VerifiedPrincipalCache
 
+    def __init__(self, repository: UserRepository, principal_cache: VerifiedPrincipalCache) -> None:
+        super().__init__(repository)
+        self._principal_cache = principal_cache
 
-class UserDeleteAction(BaseUserDeleteAction[User]): ...
+    async def __call__(self, pk: int) -> None:
+        await super().__call__(pk)
+        self._principal_cache.invalidate_user(pk)
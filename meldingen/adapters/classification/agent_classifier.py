@@ -1,12 +1,19 @@
 import logging
+from typing import Any, cast
 
 from meldingen_core.classification import BaseClassifierAdapter
 from pydantic_ai import Agent
+from pydantic_ai.models import Model
 from pydantic_ai.output import NativeOutput
 from pydantic_ai.settings import ModelSettings
 
-from meldingen.classification import build_classification_prompt, build_dynamic_classification_response_model
-from meldingen.repositories import ClassificationRepository
+from meldingen.classification import (
+    ClassificationPrompt,
+    ClassificationPromptCache,
+    ClassificationResultCache,
+    ClassificationResultHits,
+)
+from meldingen.repositories import ClassificationRepository, ClassificationResultRepository
 
 logger = logging.getLogger(__name__)
 
@@ -15,16 +22,28 @@ class AgentClassifierAdapter(BaseClassifierAdapter):
     _agent: Agent
     _repository: ClassificationRepository
     _model_settings: ModelSettings | None
+    _prompt_cache: ClassificationPromptCache | None
+    _result_cache: ClassificationResultCache | None
+    _result_repository: ClassificationResultRepository | None
+    _result_hits: ClassificationResultHits | None
 
     def __init__(
         self,
         agent: Agent,
         repository: ClassificationRepository,
         model_settings: ModelSettings | None = None,
+        prompt_cache: ClassificationPromptCache | None = None,
+        result_cache: ClassificationResultCache | None = None,
+        result_repository: ClassificationResultRepository | None = None,
+        result_hits: ClassificationResultHits | None = None,
     ):
         self._agent = agent
         self._repository = repository
         self._model_settings = model_settings
+        self._prompt_cache = prompt_cache
+        self._result_cache = result_cache
+        self._result_repository = result_repository
+        self._result_hits = result_hits
 
     async def classify(self, text: str) -> str | None:
         """Run the LLM and return the chosen classification name.
@@ -49,19 +68,65 @@ class AgentClassifierAdapter(BaseClassifierAdapter):
         - `NativeOutput` leaves the [system, user] message shape untouched and
           relies on the server-side response_format parameter, which llama.cpp
           and OpenAI both honor.
+
+        Without a prompt cache the classifications are read from the
+        repository on every call, which the eval suite relies on to swap them
+        between runs. With a result cache, texts that were classified before
+        reuse that classification instead of running the LLM again. The reuses
+        are added to the result hits, to be recorded once the melding is saved.
         """
-        classification_prompt = await build_classification_prompt(self._repository)
-        user_prompt = f"{classification_prompt}{text}"
-        ClassificationModel = await build_dynamic_classification_response_model(self._repository)
+        prompt = await self._prompt()
+        if self._result_cache is None or self._result_repository is None:
+            return await self._run(prompt, text)
+
+        normalized_text = self._result_cache.normalize(text)
+        model = self._model_name()
+        reasoning_effort = self._reasoning_effort()
+        key = self._result_cache.key(normalized_text, model, reasoning_effort, prompt)
+
+        result = await self._result_cache.get(self._result_repository, key)
+        if result is not None:
+            result_id, classification = result
+            if self._result_hits is not None:
+                self._result_hits.add(result_id, normalized_text, classification)
+
+            logger.info("Reused classification %r for an equal text", classification)
+            return classification
+
+        llm_classification = await self._run(prompt, text)
+        if llm_classification is not None:
+            await self._result_cache.put(
+                self._result_repository, key, normalized_text, model, reasoning_effort, prompt, llm_classification
+            )
+
+        return llm_classification
+
+    async def _run(self, prompt: ClassificationPrompt, text: str) -> str | None:
+        user_prompt = f"{prompt.text}{text}"
 
         result = await self._agent.run(
-            user_prompt, output_type=NativeOutput(ClassificationModel), model_settings=self._model_settings
+            user_prompt, output_type=NativeOutput(prompt.response_model), model_settings=self._model_settings
         )
         classification = getattr(result.output, "classification", None)
 
         logger.info("LLM classified melding as %r", classification)
         return classification
 
+    def _model_name(self) -> str:
+        model = self._agent.model
+        return model.model_name if isinstance(model, Model) else str(model)
+
+    def _reasoning_effort(self) -> str | None:
+        # Only sent to reasoning models, see classification_model_settings()
+        model_settings = cast(dict[str, Any], self._model_settings or {})
+        return model_settings.get("openai_reasoning_effort")
+
+    async def _prompt(self) -> ClassificationPrompt:
+        if self._prompt_cache is None:
+            return await ClassificationPrompt.build(self._repository)
+
+        return await self._prompt_cache.get(self._repository)
+
     async def __call__(self, text: str) -> str | None:
         try:
             return await self.classify(text)
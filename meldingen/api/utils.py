@@ -1,15 +1,21 @@
+import hashlib
+import json
+import time
+from collections.abc import Sequence
 from dataclasses import dataclass
-from typing import Annotated, AsyncIterator, Generic, List, TypedDict, TypeVar
+from enum import StrEnum
+from typing import Annotated, Any, AsyncIterator, Generic, List, TypedDict, TypeVar
 
-from fastapi import Depends, HTTPException, Query, Response, UploadFile
+from fastapi import Depends, HTTPException, Query, Request, Response, UploadFile
 from meldingen_core import SortingDirection
 from pydantic import BaseModel, RootModel, ValidationError
 from sqlalchemy import ColumnExpressionArgument
-from starlette.status import HTTP_422_UNPROCESSABLE_CONTENT
+from starlette.status import HTTP_304_NOT_MODIFIED, HTTP_422_UNPROCESSABLE_CONTENT
 
 from meldingen.config import settings
 from meldingen.models import BaseDBModel
-from meldingen.repositories import BaseSQLAlchemyRepository
+from meldingen.pagination import InvalidCursorException, KeysetCursor
+from meldingen.repositories import SEARCH_RANK, BaseSQLAlchemyRepository
 
 
 class PaginationParams(TypedDict):
@@ -50,8 +56,98 @@ def optional_sort_param(sort: Annotated[str | None, Query()] = None) -> SortPara
     return None if sort is None else sort_param(sort)
 
 
+def cursor_param(
+    sort: Annotated[SortParams, Depends(sort_param)],
+    cursor: Annotated[
+        str | None,
+        Query(
+            description=(
+                "Opt in to cursor pagination by passing an empty cursor for the first page. The cursors of the "
+                "adjacent pages are returned in the Next-Cursor and Prev-Cursor headers. The offset is ignored "
+                "in this mode."
+            )
+        ),
+    ] = None,
+) -> KeysetCursor | None:
+    if cursor is None:
+        return None
+
+    if cursor == "":
+        return KeysetCursor(sort_attribute_name=sort.get_attribute_name(), sort_direction=sort.get_direction())
+
+    try:
+        keyset_cursor = KeysetCursor.decode(cursor)
+    except InvalidCursorException as e:
+        raise HTTPException(
+            HTTP_422_UNPROCESSABLE_CONTENT, [{"loc": ("query", "cursor"), "msg": e.message, "type": "invalid_cursor"}]
+        )
+
+    if (keyset_cursor.sort_attribute_name, keyset_cursor.sort_direction) != sort.root:
+        raise HTTPException(
+            HTTP_422_UNPROCESSABLE_CONTENT,
+            [{"loc": ("query", "cursor"), "msg": "Cursor does not match the sort order", "type": "invalid_cursor"}],
+        )
+
+    return keyset_cursor
+
+
+def bbox_param(
+    bbox: Annotated[
+        str,
+        Query(
+            description="Bounding box as minimum longitude, minimum latitude, maximum longitude, maximum latitude.",
+            examples=["4.85,52.35,4.95,52.40"],
+        ),
+    ],
+) -> tuple[float, float, float, float]:
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(value) for value in bbox.split(","))
+    except ValueError:
+        valid = False
+    else:
+        valid = -180 <= min_lon < max_lon <= 180 and -90 <= min_lat < max_lat <= 90
+
+    if not valid:
+        raise HTTPException(
+            HTTP_422_UNPROCESSABLE_CONTENT,
+            [{"loc": ("query", "bbox"), "msg": "Invalid bounding box", "type": "bbox_invalid"}],
+        )
+
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def weak_etag(*parts: Any) -> str:
+    """A weak entity tag built from a hash of the parts, which together identify a version of the response."""
+    return f'W/"{hashlib.sha256(json.dumps(list(map(str, parts))).encode()).hexdigest()[:32]}"'
+
+
+def check_etag(request: Request, response: Response, etag: str) -> None:
+    """Adds the ETag header to the response and raises a 304 Not Modified when the client already has this version.
+
+    The tags in If-None-Match are compared weakly, as prescribed for GET requests.
+    """
+    response.headers["ETag"] = etag
+
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is None:
+        return
+
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if "*" in tags or etag.removeprefix("W/") in tags:
+        raise HTTPException(HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+def cursor_fetch_limit(limit: int, cursor: KeysetCursor | None) -> int:
+    """In cursor mode one extra row is fetched, to find out whether there is another page."""
+    if cursor is None or not limit:
+        return limit
+
+    return limit + 1
+
+
 class FilterParams(BaseModel, extra="ignore"):
     q: str | None = None
+    prefix: bool = False  # Only match names that start with q, for type-ahead
 
 
 def filter_param(filter: Annotated[str | None, Query()] = None) -> FilterParams:
@@ -68,6 +164,18 @@ def filter_param(filter: Annotated[str | None, Query()] = None) -> FilterParams:
         raise HTTPException(HTTP_422_UNPROCESSABLE_CONTENT, errors)
 
 
+def name_search_sort_param(
+    request: Request,
+    sort: Annotated[SortParams, Depends(sort_param)],
+    filter_params: Annotated[FilterParams, Depends(filter_param)],
+) -> SortParams:
+    """Like ``sort_param``, but a name search without an explicit sort lists the best matches first."""
+    if filter_params.q is not None and "sort" not in request.query_params:
+        return SortParams((SEARCH_RANK, SortingDirection.DESC))
+
+    return sort
+
+
 T = TypeVar("T", bound=BaseDBModel)
 
 
@@ -106,13 +214,91 @@ class PreparedAttachmentUpload:
         )
 
 
+class CountStrategy(StrEnum):
+    """How ContentRangeHeaderAdder determines the total number of results.
+
+    - exact: a separate COUNT query.
+    - window: the total is counted by the list query itself using a window function and passed in.
+    - estimate: the query planner's row estimate when it is above a threshold, an exact count otherwise.
+    - cached: an exact count that is cached for a short time, keyed by the filters.
+    """
+
+    EXACT = "exact"
+    WINDOW = "window"
+    ESTIMATE = "estimate"
+    CACHED = "cached"
+
+
+class CountCache:
+    """Process-wide cache of counts, keyed by a hash of the compiled filters."""
+
+    _ttl: float
+    _max_size: int
+    _entries: dict[str, tuple[int, float]]
+
+    def __init__(self, ttl: float, max_size: int = 1024) -> None:
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries = {}
+
+    def get(self, key: str) -> int | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        count, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+
+        return count
+
+    def set(self, key: str, count: int) -> None:
+        if len(self._entries) >= self._max_size:
+            now = time.monotonic()
+            self._entries = {k: v for k, v in self._entries.items() if v[1] > now}
+            if len(self._entries) >= self._max_size:
+                self._entries.pop(next(iter(self._entries)))
+
+        self._entries[key] = (count, time.monotonic() + self._ttl)
+
+    @staticmethod
+    def key(identifier: str, condition: str, *parts: Any) -> str:
+        """`condition` is the compiled filters, see BaseSQLAlchemyRepository.compile_filters."""
+        return hashlib.sha256(json.dumps([identifier, condition, *map(str, parts)]).encode()).hexdigest()
+
+
 class ContentRangeHeaderAdder(Generic[T]):
+    """Adds the Content-Range header. Approximate totals are prefixed with a tilde, e.g. `melding 0-49/~12000`."""
+
     _repository: BaseSQLAlchemyRepository[T]
     _identifier: str
+    _strategy: CountStrategy
+    _count_cache: CountCache | None
+    _estimate_threshold: int
+
+    def __init__(
+        self,
+        repository: BaseSQLAlchemyRepository[T],
+        identifier: str,
+        strategy: CountStrategy = CountStrategy.EXACT,
+        count_cache: CountCache | None = None,
+        estimate_threshold: int | None = None,
+    ) -> None:
+        if strategy == CountStrategy.CACHED and count_cache is None:
+            raise ValueError("The cached count strategy requires a count cache")
 
-    def __init__(self, repository: BaseSQLAlchemyRepository[T], identifier: str) -> None:
         self._repository = repository
         self._identifier = identifier
+        self._strategy = strategy
+        self._count_cache = count_cache
+        self._estimate_threshold = (
+            settings.list_count_estimate_threshold if estimate_threshold is None else estimate_threshold
+        )
+
+    @property
+    def strategy(self) -> CountStrategy:
+        return self._strategy
 
     async def __call__(
         self,
@@ -120,11 +306,63 @@ class ContentRangeHeaderAdder(Generic[T]):
         pagination: Annotated[PaginationParams, Depends(pagination_params)],
         filters: List[ColumnExpressionArgument[bool]] | None = None,
         apply_visibility_filters: bool = True,
+        total: int | None = None,
     ) -> int:
+        """`total` is the count produced by the list query when the window strategy is used."""
         limit = pagination["limit"] or 0
         offset = pagination["offset"] or 0
-        total = await self._repository.count(filters, apply_visibility_filters=apply_visibility_filters)
+        approximate = False
 
-        response.headers["Content-Range"] = f"{self._identifier} {offset}-{limit - 1 + offset}/{total}"
+        if total is None:
+            total, approximate = await self._count(filters, apply_visibility_filters)
+
+        response.headers["Content-Range"] = (
+            f"{self._identifier} {offset}-{limit - 1 + offset}/{'~' if approximate else ''}{total}"
+        )
 
         return 0
+
+    async def _count(
+        self, filters: List[ColumnExpressionArgument[bool]] | None, apply_visibility_filters: bool
+    ) -> tuple[int, bool]:
+        if self._strategy == CountStrategy.ESTIMATE:
+            estimate = await self._repository.estimate_count(filters, apply_visibility_filters=apply_visibility_filters)
+            if estimate > self._estimate_threshold:
+                return estimate, True
+
+        if self._strategy == CountStrategy.CACHED and self._count_cache is not None:
+            condition = await self._repository.compile_filters(filters) if filters else ""
+            key = CountCache.key(self._identifier, condition, apply_visibility_filters)
+            total = self._count_cache.get(key)
+            if total is None:
+                total = await self._repository.count(filters, apply_visibility_filters=apply_visibility_filters)
+                self._count_cache.set(key, total)
+
+            return total, False
+
+        return await self._repository.count(filters, apply_visibility_filters=apply_visibility_filters), False
+
+
+class CursorHeaderAdder(Generic[T]):
+    """Adds the cursors of the adjacent pages to the response and drops the extra row
+    fetched because of `cursor_fetch_limit`. Without a cursor the items are returned as they are."""
+
+    def __call__(self, response: Response, items: Sequence[T], cursor: KeysetCursor | None, limit: int) -> Sequence[T]:
+        if cursor is None:
+            return items
+
+        has_more = bool(limit) and len(items) > limit
+        if has_more:
+            # The extra row is the one furthest away from the cursor
+            items = items[1:] if cursor.backwards else items[:-1]
+
+        if len(items) == 0:
+            return items
+
+        if has_more or cursor.backwards:
+            response.headers["Next-Cursor"] = cursor.after(items[-1]).encode()
+
+        if (has_more and cursor.backwards) or (not cursor.backwards and not cursor.is_first_page()):
+            response.headers["Prev-Cursor"] = cursor.before(items[0]).encode()
+
+        return items
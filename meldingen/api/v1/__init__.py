@@ -3,6 +3,7 @@ from typing import Any, Final
 from pydantic import BaseModel
 from starlette.status import (
     HTTP_200_OK,
+    HTTP_304_NOT_MODIFIED,
     HTTP_400_BAD_REQUEST,
     HTTP_401_UNAUTHORIZED,
     HTTP_403_FORBIDDEN,
@@ -60,13 +61,27 @@ forbidden_response: Final[dict[str | int, dict[str, Any]]] = {
         },
     }
 }
+not_modified_response: Final[dict[str | int, dict[str, Any]]] = {
+    HTTP_304_NOT_MODIFIED: {
+        "description": "Not Modified, the ETag in If-None-Match is still current.",
+        "headers": {"ETag": {"schema": {"type": "string"}, "description": "Weak entity tag of the response."}},
+    }
+}
 list_response: Final[dict[str | int, dict[str, Any]]] = {
     HTTP_200_OK: {
         "headers": {
             "Content-Range": {
                 "schema": {"type": "string"},
                 "description": "Range and total number of results for pagination.",
-            }
+            },
+            "Next-Cursor": {
+                "schema": {"type": "string"},
+                "description": "Cursor of the next page, only in cursor pagination mode when there is a next page.",
+            },
+            "Prev-Cursor": {
+                "schema": {"type": "string"},
+                "description": "Cursor of the previous page, only in cursor pagination mode when there is a previous page.",
+            },
         }
     }
 }
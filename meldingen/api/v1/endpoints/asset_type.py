@@ -4,9 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, Path, Response
 from geojson_pydantic import FeatureCollection
 from httpx import HTTPError
 from meldingen_core.exceptions import NotFoundException
-from meldingen_core.filters import NameListFilters
 from meldingen_core.wfs import InvalidWfsProviderException
-from sqlalchemy import ColumnExpressionArgument
 from starlette.responses import StreamingResponse
 from starlette.status import (
     HTTP_201_CREATED,
@@ -27,12 +25,15 @@ from meldingen.actions.asset_type import (
 )
 from meldingen.api.utils import (
     ContentRangeHeaderAdder,
+    CursorHeaderAdder,
     FilterParams,
     PaginationParams,
     SortParams,
+    cursor_fetch_limit,
+    cursor_param,
     filter_param,
+    name_search_sort_param,
     pagination_params,
-    sort_param,
 )
 from meldingen.api.v1 import conflict_response, list_response, not_found_response, unauthorized_response
 from meldingen.authentication import authenticate_user
@@ -46,8 +47,10 @@ from meldingen.dependencies import (
     asset_type_update_action,
     wfs_retrieve_action,
 )
+from meldingen.filters import NameListFilters
 from meldingen.models import AssetType
-from meldingen.repositories import AssetTypeRepository
+from meldingen.pagination import KeysetCursor
+from meldingen.repositories import AssetTypeRepository, name_filter_expressions
 from meldingen.schemas.input import AssetTypeInput, AssetTypeUpdateInput
 from meldingen.schemas.output import AssetTypeOutput
 from meldingen.schemas.output_factories import AssetTypeOutputFactory
@@ -111,7 +114,9 @@ async def list_asset_types(
     response: Response,
     content_range_header_adder: Annotated[ContentRangeHeaderAdder[AssetType], Depends(content_range_header_adder)],
     pagination: Annotated[PaginationParams, Depends(pagination_params)],
-    sort: Annotated[SortParams, Depends(sort_param)],
+    sort: Annotated[SortParams, Depends(name_search_sort_param)],
+    cursor: Annotated[KeysetCursor | None, Depends(cursor_param)],
+    cursor_header_adder: Annotated[CursorHeaderAdder[AssetType], Depends(CursorHeaderAdder)],
     action: Annotated[AssetTypeListAction, Depends(asset_type_list_action)],
     produce_output: Annotated[AssetTypeOutputFactory, Depends(asset_type_output_factory)],
     filter_params: Annotated[FilterParams, Depends(filter_param)],
@@ -119,19 +124,20 @@ async def list_asset_types(
     limit = pagination["limit"] or 0
     offset = pagination["offset"] or 0
     q = filter_params.q
+    name_filters = NameListFilters(name_contains=q, prefix=filter_params.prefix) if q is not None else None
 
     asset_types = await action(
-        limit=limit,
+        limit=cursor_fetch_limit(limit, cursor),
         offset=offset,
         sort_attribute_name=sort.get_attribute_name(),
         sort_direction=sort.get_direction(),
-        filters=NameListFilters(name_contains=q) if q is not None else None,
+        filters=name_filters,
+        cursor=cursor,
     )
 
-    content_range_filters: list[ColumnExpressionArgument[bool]] | None = (
-        [AssetType.name.ilike(f"%{q}%")] if q is not None else None
-    )
-    await content_range_header_adder(response, pagination, content_range_filters)
+    asset_types = cursor_header_adder(response, asset_types, cursor, limit)
+
+    await content_range_header_adder(response, pagination, name_filter_expressions(AssetType.name, name_filters))
 
     return [produce_output(asset_type) for asset_type in asset_types]
 
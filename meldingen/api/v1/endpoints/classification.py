@@ -2,8 +2,6 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
 from meldingen_core.exceptions import NotFoundException
-from meldingen_core.filters import NameListFilters
-from sqlalchemy import ColumnExpressionArgument
 from starlette.status import HTTP_201_CREATED, HTTP_204_NO_CONTENT, HTTP_404_NOT_FOUND
 
 from meldingen.actions.classification import (
@@ -15,12 +13,15 @@ from meldingen.actions.classification import (
 )
 from meldingen.api.utils import (
     ContentRangeHeaderAdder,
+    CursorHeaderAdder,
     FilterParams,
     PaginationParams,
     SortParams,
+    cursor_fetch_limit,
+    cursor_param,
     filter_param,
+    name_search_sort_param,
     pagination_params,
-    sort_param,
 )
 from meldingen.api.v1 import conflict_response, list_response, not_found_response, unauthorized_response
 from meldingen.authentication import authenticate_user
@@ -28,12 +29,14 @@ from meldingen.dependencies import (
     classification_create_action,
     classification_delete_action,
     classification_list_action,
-    classification_repository,
+    classification_read_repository,
     classification_retrieve_action,
     classification_update_action,
 )
+from meldingen.filters import NameListFilters
 from meldingen.models import Classification
-from meldingen.repositories import ClassificationRepository
+from meldingen.pagination import KeysetCursor
+from meldingen.repositories import ClassificationRepository, name_filter_expressions
 from meldingen.schemas.input import ClassificationCreateInput, ClassificationUpdateInput
 from meldingen.schemas.output import ClassificationOutput
 
@@ -41,7 +44,7 @@ router = APIRouter()
 
 
 async def content_range_header_adder(
-    repo: Annotated[ClassificationRepository, Depends(classification_repository)],
+    repo: Annotated[ClassificationRepository, Depends(classification_read_repository)],
 ) -> ContentRangeHeaderAdder[Classification]:
     return ContentRangeHeaderAdder(repo, "classification")
 
@@ -97,7 +100,9 @@ async def list_classifications(
     response: Response,
     content_range_header_adder: Annotated[ContentRangeHeaderAdder[Classification], Depends(content_range_header_adder)],
     pagination: Annotated[PaginationParams, Depends(pagination_params)],
-    sort: Annotated[SortParams, Depends(sort_param)],
+    sort: Annotated[SortParams, Depends(name_search_sort_param)],
+    cursor: Annotated[KeysetCursor | None, Depends(cursor_param)],
+    cursor_header_adder: Annotated[CursorHeaderAdder[Classification], Depends(CursorHeaderAdder)],
     action: Annotated[ClassificationListAction, Depends(classification_list_action)],
     filter_params: Annotated[FilterParams, Depends(filter_param)],
     include_deleted: Annotated[
@@ -111,23 +116,23 @@ async def list_classifications(
     offset = pagination["offset"] or 0
     q = filter_params.q
 
-    content_range_filters: list[ColumnExpressionArgument[bool]] | None = (
-        [Classification.name.ilike(f"%{q}%")] if q is not None else None
-    )
-    name_filters = NameListFilters(name_contains=q) if q is not None else None
+    name_filters = NameListFilters(name_contains=q, prefix=filter_params.prefix) if q is not None else None
 
     classifications = await action(
-        limit=limit,
+        limit=cursor_fetch_limit(limit, cursor),
         offset=offset,
         sort_attribute_name=sort.get_attribute_name(),
         sort_direction=sort.get_direction(),
         filters=name_filters,
         apply_visibility_filters=not include_deleted,
+        cursor=cursor,
     )
+
+    classifications = cursor_header_adder(response, classifications, cursor, limit)
     await content_range_header_adder(
         response,
         pagination,
-        content_range_filters,
+        name_filter_expressions(Classification.name, name_filters),
         apply_visibility_filters=not include_deleted,
     )
 
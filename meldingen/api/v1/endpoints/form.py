@@ -12,13 +12,23 @@ from meldingen.actions.form import (
     FormRetrieveByClassificationAction,
     FormUpdateAction,
 )
-from meldingen.api.utils import ContentRangeHeaderAdder, PaginationParams, SortParams, pagination_params, sort_param
+from meldingen.api.utils import (
+    ContentRangeHeaderAdder,
+    CursorHeaderAdder,
+    PaginationParams,
+    SortParams,
+    cursor_fetch_limit,
+    cursor_param,
+    pagination_params,
+    sort_param,
+)
 from meldingen.api.v1 import list_response, not_found_response, unauthorized_response
 from meldingen.authentication import authenticate_user
 from meldingen.dependencies import (
     form_create_action,
     form_delete_action,
     form_list_action,
+    form_output_cache,
     form_output_factory,
     form_repository,
     form_retrieve_action,
@@ -26,7 +36,9 @@ from meldingen.dependencies import (
     form_update_action,
     simple_form_output_factory,
 )
+from meldingen.form_cache import FormOutputCache
 from meldingen.models import Form
+from meldingen.pagination import KeysetCursor
 from meldingen.repositories import FormRepository
 from meldingen.schemas.input import FormInput
 from meldingen.schemas.output import FormOutput, SimpleFormOutput
@@ -51,6 +63,8 @@ async def list_form(
     content_range_header_adder: Annotated[ContentRangeHeaderAdder[Form], Depends(content_range_header_adder)],
     pagination: Annotated[PaginationParams, Depends(pagination_params)],
     sort: Annotated[SortParams, Depends(sort_param)],
+    cursor: Annotated[KeysetCursor | None, Depends(cursor_param)],
+    cursor_header_adder: Annotated[CursorHeaderAdder[Form], Depends(CursorHeaderAdder)],
     action: Annotated[FormListAction, Depends(form_list_action)],
     produce_output: Annotated[SimpleFormOutputFactory, Depends(simple_form_output_factory)],
 ) -> list[SimpleFormOutput]:
@@ -58,36 +72,58 @@ async def list_form(
     offset = pagination["offset"] or 0
 
     forms = await action(
-        limit=limit, offset=offset, sort_attribute_name=sort.get_attribute_name(), sort_direction=sort.get_direction()
+        limit=cursor_fetch_limit(limit, cursor),
+        offset=offset,
+        sort_attribute_name=sort.get_attribute_name(),
+        sort_direction=sort.get_direction(),
+        cursor=cursor,
     )
 
+    forms = cursor_header_adder(response, forms, cursor, limit)
+
     await content_range_header_adder(response, pagination)
 
     return [produce_output(db_form) for db_form in forms]
 
 
-@router.get("/{form_id}", name="form:retrieve", responses={**not_found_response})
+@router.get("/{form_id}", name="form:retrieve", response_model=FormOutput, responses={**not_found_response})
 async def retrieve_form(
     form_id: Annotated[int, Path(description="The id of the form.", ge=1)],
     action: Annotated[FormRetrieveAction, Depends(form_retrieve_action)],
     produce_output_model: Annotated[FormOutputFactory, Depends(form_output_factory)],
-) -> FormOutput:
-    db_form = await action(pk=form_id)
-    if not db_form:
-        raise HTTPException(status_code=HTTP_404_NOT_FOUND)
+    cache: Annotated[FormOutputCache, Depends(form_output_cache)],
+) -> Response:
+    async def produce() -> bytes:
+        db_form = await action(pk=form_id)
+        if not db_form:
+            raise HTTPException(status_code=HTTP_404_NOT_FOUND)
+
+        output = await produce_output_model(db_form)
+
+        return output.model_dump_json(by_alias=True).encode()
 
-    return await produce_output_model(db_form)
+    return Response(await cache.get(("form", form_id), produce), media_type="application/json")
 
 
-@router.get("/classification/{classification_id}", name="form:classification", responses={**not_found_response})
+@router.get(
+    "/classification/{classification_id}",
+    name="form:classification",
+    response_model=FormOutput,
+    responses={**not_found_response},
+)
 async def retrieve_form_by_classification(
     classification_id: Annotated[int, Path(description="The id of the classification that the form belongs to.", ge=1)],
     action: Annotated[FormRetrieveByClassificationAction, Depends(form_retrieve_by_classification_action)],
     produce_output_model: Annotated[FormOutputFactory, Depends(form_output_factory)],
-) -> FormOutput:
-    form = await action(classification_id)
+    cache: Annotated[FormOutputCache, Depends(form_output_cache)],
+) -> Response:
+    async def produce() -> bytes:
+        form = await action(classification_id)
+        output = await produce_output_model(form)
 
-    return await produce_output_model(form)
+        return output.model_dump_json(by_alias=True).encode()
+
+    return Response(await cache.get(("classification", classification_id), produce), media_type="application/json")
 
 
 @router.post(
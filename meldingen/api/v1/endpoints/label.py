@@ -1,24 +1,27 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Response
-from meldingen_core.filters import NameListFilters
-from sqlalchemy import ColumnExpressionArgument
 
 from meldingen.actions.label import LabelListAction
 from meldingen.api.utils import (
     ContentRangeHeaderAdder,
+    CursorHeaderAdder,
     FilterParams,
     PaginationParams,
     SortParams,
+    cursor_fetch_limit,
+    cursor_param,
     filter_param,
+    name_search_sort_param,
     pagination_params,
-    sort_param,
 )
 from meldingen.api.v1 import list_response, unauthorized_response
 from meldingen.authentication import authenticate_user
-from meldingen.dependencies import label_list_action, label_output_factory, label_repository
+from meldingen.dependencies import label_list_action, label_output_factory, label_read_repository
+from meldingen.filters import NameListFilters
 from meldingen.models import Label
-from meldingen.repositories import LabelRepository
+from meldingen.pagination import KeysetCursor
+from meldingen.repositories import LabelRepository, name_filter_expressions
 from meldingen.schemas.output import LabelOutput
 from meldingen.schemas.output_factories import LabelOutputFactory
 
@@ -26,7 +29,7 @@ router = APIRouter()
 
 
 async def content_range_header_adder(
-    repo: Annotated[LabelRepository, Depends(label_repository)],
+    repo: Annotated[LabelRepository, Depends(label_read_repository)],
 ) -> ContentRangeHeaderAdder[Label]:
     return ContentRangeHeaderAdder(repo, "label")
 
@@ -41,7 +44,9 @@ async def list_labels(
     response: Response,
     content_range_header_adder: Annotated[ContentRangeHeaderAdder[Label], Depends(content_range_header_adder)],
     pagination: Annotated[PaginationParams, Depends(pagination_params)],
-    sort: Annotated[SortParams, Depends(sort_param)],
+    sort: Annotated[SortParams, Depends(name_search_sort_param)],
+    cursor: Annotated[KeysetCursor | None, Depends(cursor_param)],
+    cursor_header_adder: Annotated[CursorHeaderAdder[Label], Depends(CursorHeaderAdder)],
     action: Annotated[LabelListAction, Depends(label_list_action)],
     produce_output: Annotated[LabelOutputFactory, Depends(label_output_factory)],
     filter_params: Annotated[FilterParams, Depends(filter_param)],
@@ -49,18 +54,19 @@ async def list_labels(
     limit = pagination["limit"] or 0
     offset = pagination["offset"] or 0
     q = filter_params.q
+    name_filters = NameListFilters(name_contains=q, prefix=filter_params.prefix) if q is not None else None
 
     labels = await action(
-        limit=limit,
+        limit=cursor_fetch_limit(limit, cursor),
         offset=offset,
         sort_attribute_name=sort.get_attribute_name(),
         sort_direction=sort.get_direction(),
-        filters=NameListFilters(name_contains=q) if q is not None else None,
+        filters=name_filters,
+        cursor=cursor,
     )
 
-    content_range_filters: list[ColumnExpressionArgument[bool]] | None = (
-        [Label.name.ilike(f"%{q}%")] if q is not None else None
-    )
-    await content_range_header_adder(response, pagination, content_range_filters)
+    labels = cursor_header_adder(response, labels, cursor, limit)
+
+    await content_range_header_adder(response, pagination, name_filter_expressions(Label.name, name_filters))
 
     return [produce_output(label) for label in labels]
@@ -1,10 +1,10 @@
 import logging
-from typing import Annotated, Any, Sequence
+from datetime import date
+from typing import Annotated, Any
 
 from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response, UploadFile
 from fastapi.responses import StreamingResponse
-from geojson_pydantic import Feature
-from geojson_pydantic.geometries import Geometry
+from meldingen_core import SortingDirection
 from meldingen_core.actions.attachment import AttachmentTypes
 from meldingen_core.actions.melding import (
     AssetData,
@@ -27,15 +27,13 @@ from meldingen_core.actions.melding import (
 )
 from meldingen_core.actions.note import NoteCreateAction, NoteRetrieveAction, NoteUpdateAction
 from meldingen_core.exceptions import InvalidInputException, LimitReachedException, NotFoundException
-from meldingen_core.filters import MeldingListFilters
 from meldingen_core.labels import InvalidLabelException
 from meldingen_core.managers import RelationshipExistsException
-from meldingen_core.statemachine import MeldingBackofficeStates, MeldingStates, get_all_backoffice_states
+from meldingen_core.statemachine import MeldingStates, get_all_backoffice_states
 from meldingen_core.token import TokenException
 from meldingen_core.validators import AttachmentLimitReachedException, MediaTypeIntegrityError, MediaTypeNotAllowed
 from mp_fsm.statemachine import GuardException, WrongStateException
-from pydantic import BaseModel, TypeAdapter, ValidationError
-from sqlalchemy.exc import IntegrityError
+from pydantic import TypeAdapter, ValidationError
 from starlette.status import (
     HTTP_200_OK,
     HTTP_201_CREATED,
@@ -62,22 +60,34 @@ from meldingen.actions.melding import (
     MelderMeldingRetrieveAction,
     MeldingAddAssetAction,
     MeldingAnswerDeleteAction,
+    MeldingBulkLabelAction,
+    MeldingBulkTransitionAction,
+    MeldingClusterAction,
     MeldingDeleteAssetAction,
     MeldingGetPossibleNextStatesAction,
     MeldingListAction,
     MeldingRetrieveAction,
     MeldingSubmitAction,
     MeldingSubmitActionMelder,
+    MeldingVectorTileAction,
 )
 from meldingen.actions.note import NoteListAction
 from meldingen.api.utils import (
     ContentRangeHeaderAdder,
+    CountCache,
+    CountStrategy,
+    CursorHeaderAdder,
     PaginationParams,
     PreparedAttachmentUpload,
     SortParams,
+    bbox_param,
+    check_etag,
+    cursor_fetch_limit,
+    cursor_param,
     optional_sort_param,
     pagination_params,
     sort_param,
+    weak_etag,
 )
 from meldingen.api.v1 import (
     attachment_upload_bad_request_response,
@@ -87,14 +97,19 @@ from meldingen.api.v1 import (
     image_data_response,
     list_response,
     not_found_response,
+    not_modified_response,
     transition_not_allowed,
     unauthorized_response,
 )
 from meldingen.authentication import authenticate_user, verify_melding_token
+from meldingen.classification import ClassificationResultHits
+from meldingen.config import settings
 from meldingen.dependencies import (
     answer_output_factory,
     asset_output_factory,
     attachment_output_factory,
+    classification_result_hits,
+    count_cache,
     form_io_question_component_repository,
     melder_melding_delete_attachment_action,
     melder_melding_download_attachment_action,
@@ -111,7 +126,10 @@ from meldingen.dependencies import (
     melding_answer_delete_action,
     melding_answer_questions_action,
     melding_answer_update_action,
+    melding_bulk_label_action,
+    melding_bulk_transition_action,
     melding_cancel_action,
+    melding_cluster_action,
     melding_complete_action,
     melding_contact_info_added_action,
     melding_create_action,
@@ -127,6 +145,7 @@ from meldingen.dependencies import (
     melding_plan_action,
     melding_primary_form_validator,
     melding_process_action,
+    melding_read_repository,
     melding_reopen_action,
     melding_repository,
     melding_request_processing_action,
@@ -139,6 +158,7 @@ from meldingen.dependencies import (
     melding_update_action_melder,
     melding_update_output_factory,
     melding_upload_attachment_action,
+    melding_vector_tile_action,
     note_create_action,
     note_list_action,
     note_list_output_factory,
@@ -146,11 +166,13 @@ from meldingen.dependencies import (
     note_retrieve_action,
     note_retrieve_output_factory,
     note_update_action,
-    public_id_generator,
+    public_id_allocator,
     states_output_factory,
 )
 from meldingen.exceptions import MeldingNotClassifiedException
-from meldingen.generators import PublicIdGenerator
+from meldingen.export import EXPORT_SERIALIZERS, ExportFormat, buffered
+from meldingen.filters import MeldingListFilters, area_from_feature, backoffice_states_from_param
+from meldingen.generators import PublicIdAllocator
 from meldingen.models import (
     Answer,
     Attachment,
@@ -159,15 +181,20 @@ from meldingen.models import (
     FormIoComponentTypeEnum,
     Label,
     Melding,
+    MeldingStatisticsGroupEnum,
     Note,
     Source,
     User,
 )
-from meldingen.repositories import FormIoQuestionComponentRepository, MeldingRepository
+from meldingen.pagination import KeysetCursor
+from meldingen.repositories import SEARCH_RANK, FormIoQuestionComponentRepository, MeldingRepository
 from meldingen.schemas.input import (
     AnswerInputUnion,
     CompleteMeldingInput,
     MeldingAssetInput,
+    MeldingBulkInput,
+    MeldingBulkLabelInput,
+    MeldingBulkTransitionInput,
     MeldingContactInput,
     MeldingInput,
     MeldingUpdateInput,
@@ -179,8 +206,12 @@ from meldingen.schemas.output import (
     AnswerQuestionOutputUnion,
     AssetOutput,
     AttachmentOutput,
+    MeldingBulkLabelOutput,
+    MeldingBulkTransitionResultOutput,
+    MeldingClusterOutput,
     MeldingCreateOutput,
     MeldingOutput,
+    MeldingStatisticsOutput,
     MeldingUpdateOutput,
     NoteOutput,
     NoteRetrieveOutput,
@@ -211,45 +242,60 @@ async def create_melding(
     melding_input: MeldingInput,
     action: Annotated[MeldingCreateAction[Melding, Classification], Depends(melding_create_action)],
     validate_using_jsonlogic: Annotated[MeldingPrimaryFormValidator, Depends(melding_primary_form_validator)],
-    generate_public_id: Annotated[PublicIdGenerator, Depends(public_id_generator)],
+    allocate_public_id: Annotated[PublicIdAllocator, Depends(public_id_allocator)],
+    repository: Annotated[MeldingRepository, Depends(melding_repository)],
     produce_output: Annotated[MeldingCreateOutputFactory, Depends(melding_create_output_factory)],
+    result_hits: Annotated[ClassificationResultHits, Depends(classification_result_hits)],
 ) -> MeldingCreateOutput:
     melding_dict = melding_input.model_dump(exclude_unset=True)
 
     await validate_using_jsonlogic(melding_dict)
 
     melding = Melding(**melding_dict)
+    melding.public_id = await allocate_public_id(repository)
 
-    while True:
-        melding.public_id = generate_public_id()
+    await action(melding)
+    await result_hits.record(melding.id)
+
+    return await produce_output(melding)
+
+
+def list_filters(in_area: str | None, state: str | None, q: str | None) -> MeldingListFilters:
+    area = None
+    if in_area is not None:
         try:
-            await action(melding)
-        except IntegrityError:
-            continue
+            area = area_from_feature(in_area)
+        except ValidationError as e:
+            raise HTTPException(HTTP_422_UNPROCESSABLE_CONTENT, e.errors()) from e
 
-        break
+    if q is not None and q.strip() == "":
+        q = None
 
-    return await produce_output(melding)
+    return MeldingListFilters(area=area, states=backoffice_states_from_param(state), q=q)
 
 
 async def content_range_header_adder(
-    repo: Annotated[MeldingRepository, Depends(melding_repository)],
+    repo: Annotated[MeldingRepository, Depends(melding_read_repository)],
+    cache: Annotated[CountCache, Depends(count_cache)],
 ) -> ContentRangeHeaderAdder[Melding]:
-    return ContentRangeHeaderAdder(repo, "melding")
+    return ContentRangeHeaderAdder(repo, "melding", CountStrategy(settings.melding_list_count_strategy), cache)
 
 
 @router.get(
     "/",
     name="melding:list",
-    responses={**list_response, **unauthorized_response},
+    responses={**list_response, **not_modified_response, **unauthorized_response},
     dependencies=[Depends(authenticate_user)],
 )
 async def list_meldingen(
+    request: Request,
     response: Response,
-    repo: Annotated[MeldingRepository, Depends(melding_repository)],
+    repo: Annotated[MeldingRepository, Depends(melding_read_repository)],
     content_range_header_adder: Annotated[ContentRangeHeaderAdder[Melding], Depends(content_range_header_adder)],
     pagination: Annotated[PaginationParams, Depends(pagination_params)],
     sort: Annotated[SortParams, Depends(sort_param)],
+    cursor: Annotated[KeysetCursor | None, Depends(cursor_param)],
+    cursor_header_adder: Annotated[CursorHeaderAdder[Melding], Depends(CursorHeaderAdder)],
     action: Annotated[MeldingListAction, Depends(melding_list_action)],
     produce_output: Annotated[MeldingOutputFactory, Depends(melding_output_factory)],
     in_area: Annotated[str, Query(description="Geometry which the melding location should reside in.")] | None = None,
@@ -263,60 +309,250 @@ async def list_meldingen(
         ]
         | None
     ) = None,
+    q: (
+        Annotated[
+            str,
+            Query(
+                description=(
+                    'Full-text search on the text of the melding, supports quoted phrases, "or" and a leading "-" '
+                    "to exclude words. Without a sort the results are ordered on relevance, which can also be "
+                    f'requested explicitly with ["{SEARCH_RANK}","{SortingDirection.DESC}"]. Sorting on '
+                    "relevance is not available with cursor pagination."
+                ),
+            ),
+        ]
+        | None
+    ) = None,
 ) -> list[MeldingOutput]:
-    area = None
-    if in_area is not None:
-        try:
-            feature: Feature[Geometry, dict[str, Any] | BaseModel] = Feature.model_validate_json(in_area)
-        except ValidationError as e:
-            raise HTTPException(HTTP_422_UNPROCESSABLE_CONTENT, e.errors()) from e
-
-        if feature.geometry is not None:
-            area = feature.geometry.model_dump_json()
+    filter_input = list_filters(in_area, state, q)
 
     limit = pagination["limit"] or 0
     offset = pagination["offset"] or 0
 
-    states: Sequence[MeldingBackofficeStates] = (
-        [MeldingBackofficeStates(s) for s in state.split(",") if s in MeldingBackofficeStates]
-        if state
-        else get_all_backoffice_states()
+    sort_attribute_name = sort.get_attribute_name()
+    sort_direction = sort.get_direction()
+    if filter_input.q is not None and "sort" not in request.query_params:
+        sort_attribute_name = SEARCH_RANK
+        sort_direction = SortingDirection.DESC
+
+    # The query string holds everything that selects and orders the meldingen, so along with the version of the
+    # meldingen it identifies the response. When the client already has it, the meldingen don't have to be loaded.
+    count, last_updated_at, related_updated_at = await repo.list_version()
+    check_etag(
+        request,
+        response,
+        weak_etag(sorted(request.query_params.multi_items()), count, last_updated_at, related_updated_at),
     )
 
-    filter_input = MeldingListFilters(
-        area=area,
-        states=states,
-    )
+    total = None
+    if content_range_header_adder.strategy == CountStrategy.WINDOW and cursor is None:
+        meldingen, total = await action.with_total(
+            limit=limit,
+            offset=offset,
+            sort_attribute_name=sort_attribute_name,
+            sort_direction=sort_direction,
+            filters=filter_input,
+        )
+    else:
+        meldingen = await action(
+            limit=cursor_fetch_limit(limit, cursor),
+            offset=offset,
+            sort_attribute_name=sort_attribute_name,
+            sort_direction=sort_direction,
+            filters=filter_input,
+            cursor=cursor,
+        )
+
+    meldingen = cursor_header_adder(response, meldingen, cursor, limit)
 
-    meldingen = await action(
-        limit=limit,
-        offset=offset,
-        sort_attribute_name=sort.get_attribute_name(),
-        sort_direction=sort.get_direction(),
-        filters=filter_input,
-    )
     output = []
     for melding in meldingen:
         output.append(await produce_output(melding))
 
     filters = repo.filter_input_to_expression_arguments(filter_input)
 
-    await content_range_header_adder(response, pagination, filters)
+    await content_range_header_adder(response, pagination, filters, total=total)
 
     return output
 
 
+@router.get(
+    "/export",
+    name="melding:export",
+    description=(
+        "Streams all meldingen matching the filters, in the format of choice. The filters are the same as those of "
+        "melding:list. The rows are read from a server-side cursor and written as they come in."
+    ),
+    responses={
+        HTTP_200_OK: {
+            "content": {
+                serializer.media_type: {"schema": {"type": "string"}} for serializer in EXPORT_SERIALIZERS.values()
+            },
+        },
+        **unauthorized_response,
+    },
+    response_class=StreamingResponse,
+    dependencies=[Depends(authenticate_user)],
+)
+async def export_meldingen(
+    repo: Annotated[MeldingRepository, Depends(melding_read_repository)],
+    format: Annotated[ExportFormat, Query(description="The format of the export.")] = ExportFormat.NDJSON,
+    in_area: Annotated[str, Query(description="Geometry which the melding location should reside in.")] | None = None,
+    state: (
+        Annotated[
+            str,
+            Query(
+                examples=f"{MeldingStates.PROCESSING},{MeldingStates.COMPLETED}",
+                description="Comma-seperated list of states that the melding should have. If left empty, meldingen will be filtered by backoffice states.",
+            ),
+        ]
+        | None
+    ) = None,
+    q: Annotated[str, Query(description="Full-text search on the text of the melding.")] | None = None,
+) -> StreamingResponse:
+    filter_input = list_filters(in_area, state, q)
+    serializer = EXPORT_SERIALIZERS[format]
+
+    return StreamingResponse(
+        buffered(serializer(repo.stream_export_rows(filter_input, settings.melding_export_batch_size))),
+        media_type=serializer.media_type,
+        headers={"Content-Disposition": f'attachment; filename="meldingen.{serializer.file_extension}"'},
+    )
+
+
+@router.get(
+    "/tiles/{z}/{x}/{y}.mvt",
+    name="melding:tile",
+    description=(
+        "Mapbox Vector Tile with the locations of the meldingen in a single layer named meldingen. "
+        "The features carry the id, state, classification_id and urgency of the melding."
+    ),
+    responses={
+        HTTP_200_OK: {"content": {"application/vnd.mapbox-vector-tile": {"schema": {"type": "string"}}}},
+        **unauthorized_response,
+        **not_found_response,
+    },
+    response_class=Response,
+    dependencies=[Depends(authenticate_user)],
+)
+async def melding_vector_tile(
+    z: Annotated[int, Path(description="The zoom level of the tile.", ge=0, le=24)],
+    x: Annotated[int, Path(description="The column of the tile.", ge=0)],
+    y: Annotated[int, Path(description="The row of the tile.", ge=0)],
+    action: Annotated[MeldingVectorTileAction, Depends(melding_vector_tile_action)],
+    state: (
+        Annotated[
+            str,
+            Query(
+                examples=f"{MeldingStates.PROCESSING},{MeldingStates.COMPLETED}",
+                description="Comma-seperated list of states that the melding should have. If left empty, meldingen will be filtered by backoffice states.",
+            ),
+        ]
+        | None
+    ) = None,
+) -> Response:
+    if x >= 2**z or y >= 2**z:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND)
+
+    tile = await action(z, x, y, backoffice_states_from_param(state))
+
+    return Response(content=tile, media_type="application/vnd.mapbox-vector-tile")
+
+
+@router.get(
+    "/clusters",
+    name="melding:clusters",
+    description=(
+        "Groups the meldingen within the bounding box into cells of about 64 pixels on a map at the given zoom level, "
+        "with the number of meldingen per state and per classification id. Takes the same filters as melding:list."
+    ),
+    responses={**unauthorized_response},
+    dependencies=[Depends(authenticate_user)],
+)
+async def cluster_meldingen(
+    bbox: Annotated[tuple[float, float, float, float], Depends(bbox_param)],
+    zoom: Annotated[int, Query(description="The zoom level of the map.", ge=0, le=24)],
+    action: Annotated[MeldingClusterAction, Depends(melding_cluster_action)],
+    in_area: Annotated[str, Query(description="Geometry which the melding location should reside in.")] | None = None,
+    state: (
+        Annotated[
+            str,
+            Query(
+                examples=f"{MeldingStates.PROCESSING},{MeldingStates.COMPLETED}",
+                description="Comma-seperated list of states that the melding should have. If left empty, meldingen will be filtered by backoffice states.",
+            ),
+        ]
+        | None
+    ) = None,
+) -> list[MeldingClusterOutput]:
+    clusters = await action(bbox, zoom, list_filters(in_area, state, None))
+
+    return [
+        MeldingClusterOutput(
+            longitude=cluster.longitude,
+            latitude=cluster.latitude,
+            count=cluster.count,
+            states=cluster.states,
+            classifications=cluster.classifications,
+        )
+        for cluster in clusters
+    ]
+
+
+@router.get(
+    "/statistics",
+    name="melding:statistics",
+    description=(
+        "The number of meldingen grouped by any combination of the day they were created, their state, "
+        "classification id and source id. The counts come from a summary table that is kept up to date "
+        "on every change to a melding, so this does not have to count the meldingen themselves."
+    ),
+    responses={**unauthorized_response},
+    dependencies=[Depends(authenticate_user)],
+)
+async def melding_statistics(
+    repo: Annotated[MeldingRepository, Depends(melding_read_repository)],
+    group_by: Annotated[
+        list[MeldingStatisticsGroupEnum], Query(description="The columns to group by, can be given more than once.")
+    ] = [MeldingStatisticsGroupEnum.STATE],
+    since: Annotated[date, Query(description="Only count meldingen created on or after this day.")] | None = None,
+    until: Annotated[date, Query(description="Only count meldingen created on or before this day.")] | None = None,
+    state: (
+        Annotated[
+            str,
+            Query(
+                examples=f"{MeldingStates.PROCESSING},{MeldingStates.COMPLETED}",
+                description="Comma-seperated list of states that the melding should have. If left empty, meldingen will be filtered by backoffice states.",
+            ),
+        ]
+        | None
+    ) = None,
+) -> list[MeldingStatisticsOutput]:
+    rows = await repo.statistics(group_by, backoffice_states_from_param(state), since, until)
+
+    return [MeldingStatisticsOutput(**row) for row in rows]
+
+
 @router.get(
     "/{melding_id}",
     name="melding:retrieve",
-    responses={**unauthorized_response, **not_found_response},
+    responses={**not_modified_response, **unauthorized_response, **not_found_response},
     dependencies=[Depends(authenticate_user)],
 )
 async def retrieve_melding(
+    request: Request,
+    response: Response,
     melding_id: Annotated[int, Path(description="The id of the melding.", ge=1)],
+    repo: Annotated[MeldingRepository, Depends(melding_read_repository)],
     action: Annotated[MeldingRetrieveAction, Depends(melding_retrieve_action)],
     produce_output: Annotated[MeldingOutputFactory, Depends(melding_output_factory)],
 ) -> MeldingOutput:
+    version = await repo.retrieve_version(melding_id)
+    if version is None:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND)
+
+    check_etag(request, response, weak_etag(melding_id, *version))
+
     melding = await action(pk=melding_id)
 
     if not melding:
@@ -382,6 +618,7 @@ async def update_melding_melder(
     validate_using_jsonlogic: Annotated[MeldingPrimaryFormValidator, Depends(melding_primary_form_validator)],
     action: Annotated[MeldingUpdateActionMelder[Melding, Classification], Depends(melding_update_action_melder)],
     produce_output: Annotated[MeldingUpdateOutputFactory, Depends(melding_update_output_factory)],
+    result_hits: Annotated[ClassificationResultHits, Depends(classification_result_hits)],
 ) -> MeldingUpdateOutput:
     melding_dict = melding_input.model_dump(exclude_unset=True)
 
@@ -394,6 +631,8 @@ async def update_melding_melder(
     except TokenException:
         raise HTTPException(status_code=HTTP_401_UNAUTHORIZED)
 
+    await result_hits.record(melding.id)
+
     return await produce_output(melding)
 
 
@@ -723,6 +962,97 @@ async def cancel_melding(
     return await produce_output(melding)
 
 
+bulk_limit_reached_response: dict[str | int, dict[str, Any]] = {
+    HTTP_400_BAD_REQUEST: {
+        "description": "More meldingen are selected than a single bulk operation can change",
+        "content": {
+            "application/json": {
+                "example": {"detail": f"A bulk operation can change at most {settings.melding_bulk_limit} meldingen"}
+            }
+        },
+    },
+}
+
+
+def bulk_filters(input: MeldingBulkInput) -> MeldingListFilters | None:
+    if input.filter is None:
+        return None
+
+    area = None
+    if input.filter.in_area is not None and input.filter.in_area.geometry is not None:
+        area = input.filter.in_area.geometry.model_dump_json()
+
+    q = input.filter.q
+    if q is not None and q.strip() == "":
+        q = None
+
+    return MeldingListFilters(
+        area=area,
+        states=input.filter.state or get_all_backoffice_states(),
+        q=q,
+    )
+
+
+@router.post(
+    "/bulk/transition",
+    description=(
+        "Applies a backoffice transition to the given meldingen, or to all meldingen matching the filter. The result "
+        "is reported per melding, meldingen that do not exist or cannot make the transition are left unchanged."
+    ),
+    name="melding:bulk-transition",
+    responses={
+        **bulk_limit_reached_response,
+        **unauthorized_response,
+        **default_response,
+    },
+    dependencies=[Depends(authenticate_user)],
+)
+async def bulk_transition_meldingen(
+    input: MeldingBulkTransitionInput,
+    action: Annotated[MeldingBulkTransitionAction, Depends(melding_bulk_transition_action)],
+) -> list[MeldingBulkTransitionResultOutput]:
+    try:
+        results = await action(input.transition, ids=input.ids, filters=bulk_filters(input), mail_text=input.mail_body)
+    except LimitReachedException as e:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+    return [
+        MeldingBulkTransitionResultOutput(id=result.id, status=result.status, state=result.state) for result in results
+    ]
+
+
+@router.post(
+    "/bulk/labels",
+    description=(
+        "Adds labels to and removes labels from the given meldingen, or all meldingen matching the filter. "
+        "Reports the number of selected meldingen and the number of labels that were actually added and removed."
+    ),
+    name="melding:bulk-labels",
+    responses={
+        **bulk_limit_reached_response,
+        **unauthorized_response,
+        HTTP_404_NOT_FOUND: {
+            "description": "Providing a label id that does not exist",
+            "content": {"application/json": {"example": {"detail": "Can't find labels with id's: [123]"}}},
+        },
+        **default_response,
+    },
+    dependencies=[Depends(authenticate_user)],
+)
+async def bulk_label_meldingen(
+    input: MeldingBulkLabelInput,
+    action: Annotated[MeldingBulkLabelAction, Depends(melding_bulk_label_action)],
+) -> MeldingBulkLabelOutput:
+    try:
+        result = await action(add=input.add, remove=input.remove, ids=input.ids, filters=bulk_filters(input))
+    except InvalidLabelException as e:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail=str(e)) from e
+    except LimitReachedException as e:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+    return MeldingBulkLabelOutput(meldingen=result.meldingen, added=result.added, removed=result.removed)
+
+
 async def resolve_answer_type_through_question_id(
     request: Request,
     question_id: int,
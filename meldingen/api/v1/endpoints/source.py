@@ -1,24 +1,27 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Response
-from meldingen_core.filters import NameListFilters
-from sqlalchemy import ColumnExpressionArgument
 
 from meldingen.actions.source import SourceListAction
 from meldingen.api.utils import (
     ContentRangeHeaderAdder,
+    CursorHeaderAdder,
     FilterParams,
     PaginationParams,
     SortParams,
+    cursor_fetch_limit,
+    cursor_param,
     filter_param,
+    name_search_sort_param,
     pagination_params,
-    sort_param,
 )
 from meldingen.api.v1 import list_response, unauthorized_response
 from meldingen.authentication import authenticate_user
-from meldingen.dependencies import source_list_action, source_output_factory, source_repository
+from meldingen.dependencies import source_list_action, source_output_factory, source_read_repository
+from meldingen.filters import NameListFilters
 from meldingen.models import Source
-from meldingen.repositories import SourceRepository
+from meldingen.pagination import KeysetCursor
+from meldingen.repositories import SourceRepository, name_filter_expressions
 from meldingen.schemas.output import SourceOutput
 from meldingen.schemas.output_factories import SourceOutputFactory
 
@@ -26,7 +29,7 @@ router = APIRouter()
 
 
 async def content_range_header_adder(
-    repo: Annotated[SourceRepository, Depends(source_repository)],
+    repo: Annotated[SourceRepository, Depends(source_read_repository)],
 ) -> ContentRangeHeaderAdder[Source]:
     return ContentRangeHeaderAdder(repo, "source")
 
@@ -41,7 +44,9 @@ async def list_sources(
     response: Response,
     content_range_header_adder: Annotated[ContentRangeHeaderAdder[Source], Depends(content_range_header_adder)],
     pagination: Annotated[PaginationParams, Depends(pagination_params)],
-    sort: Annotated[SortParams, Depends(sort_param)],
+    sort: Annotated[SortParams, Depends(name_search_sort_param)],
+    cursor: Annotated[KeysetCursor | None, Depends(cursor_param)],
+    cursor_header_adder: Annotated[CursorHeaderAdder[Source], Depends(CursorHeaderAdder)],
     action: Annotated[SourceListAction, Depends(source_list_action)],
     produce_output: Annotated[SourceOutputFactory, Depends(source_output_factory)],
     filter_params: Annotated[FilterParams, Depends(filter_param)],
@@ -49,18 +54,19 @@ async def list_sources(
     limit = pagination["limit"] or 0
     offset = pagination["offset"] or 0
     q = filter_params.q
+    name_filters = NameListFilters(name_contains=q, prefix=filter_params.prefix) if q is not None else None
 
     sources = await action(
-        limit=limit,
+        limit=cursor_fetch_limit(limit, cursor),
         offset=offset,
         sort_attribute_name=sort.get_attribute_name(),
         sort_direction=sort.get_direction(),
-        filters=NameListFilters(name_contains=q) if q is not None else None,
+        filters=name_filters,
+        cursor=cursor,
     )
 
-    content_range_filters: list[ColumnExpressionArgument[bool]] | None = (
-        [Source.name.ilike(f"%{q}%")] if q is not None else None
-    )
-    await content_range_header_adder(response, pagination, content_range_filters)
+    sources = cursor_header_adder(response, sources, cursor, limit)
+
+    await content_range_header_adder(response, pagination, name_filter_expressions(Source.name, name_filters))
 
     return [produce_output(source) for source in sources]
@@ -4,18 +4,30 @@ from fastapi import APIRouter, Depends, HTTPException, Path, Response
 from starlette.status import HTTP_404_NOT_FOUND
 
 from meldingen.actions.form import StaticFormListAction, StaticFormRetrieveAction, StaticFormUpdateAction
-from meldingen.api.utils import ContentRangeHeaderAdder, PaginationParams, SortParams, pagination_params, sort_param
+from meldingen.api.utils import (
+    ContentRangeHeaderAdder,
+    CursorHeaderAdder,
+    PaginationParams,
+    SortParams,
+    cursor_fetch_limit,
+    cursor_param,
+    pagination_params,
+    sort_param,
+)
 from meldingen.api.v1 import not_found_response, unauthorized_response
 from meldingen.authentication import authenticate_user
 from meldingen.dependencies import (
     simple_static_form_output_factory,
     static_form_list_action,
+    static_form_output_cache,
     static_form_output_factory,
     static_form_repository,
     static_form_retrieve_action,
     static_form_update_action,
 )
+from meldingen.form_cache import FormOutputCache
 from meldingen.models import StaticForm
+from meldingen.pagination import KeysetCursor
 from meldingen.repositories import StaticFormRepository
 from meldingen.schemas.input import StaticFormInput
 from meldingen.schemas.output import SimpleStaticFormOutput, StaticFormOutput
@@ -30,18 +42,26 @@ async def content_range_header_adder(
     return ContentRangeHeaderAdder(repo, "StaticForm")
 
 
-@router.get("/{static_form_id}", name="static-form:retrieve", responses={**not_found_response})
+@router.get(
+    "/{static_form_id}", name="static-form:retrieve", response_model=StaticFormOutput, responses={**not_found_response}
+)
 async def retrieve_static_form(
     static_form_id: Annotated[int, Path(description="The id of the static form.", ge=1)],
     action: Annotated[StaticFormRetrieveAction, Depends(static_form_retrieve_action)],
     produce_output_model: Annotated[StaticFormOutputFactory, Depends(static_form_output_factory)],
-) -> StaticFormOutput:
-    db_form = await action(static_form_id)
+    cache: Annotated[FormOutputCache, Depends(static_form_output_cache)],
+) -> Response:
+    async def produce() -> bytes:
+        db_form = await action(static_form_id)
 
-    if db_form is None:
-        raise HTTPException(status_code=HTTP_404_NOT_FOUND)
+        if db_form is None:
+            raise HTTPException(status_code=HTTP_404_NOT_FOUND)
 
-    return await produce_output_model(db_form)
+        output = await produce_output_model(db_form)
+
+        return output.model_dump_json(by_alias=True).encode()
+
+    return Response(await cache.get(static_form_id, produce), media_type="application/json")
 
 
 @router.put(
@@ -76,14 +96,22 @@ async def list_static_forms(
     produce_output_model: Annotated[SimpleStaticFormOutputFactory, Depends(simple_static_form_output_factory)],
     pagination: Annotated[PaginationParams, Depends(pagination_params)],
     sort: Annotated[SortParams, Depends(sort_param)],
+    cursor: Annotated[KeysetCursor | None, Depends(cursor_param)],
+    cursor_header_adder: Annotated[CursorHeaderAdder[StaticForm], Depends(CursorHeaderAdder)],
 ) -> list[SimpleStaticFormOutput]:
     limit = pagination["limit"] or 0
     offset = pagination["offset"] or 0
 
     forms = await action(
-        limit=limit, offset=offset, sort_attribute_name=sort.get_attribute_name(), sort_direction=sort.get_direction()
+        limit=cursor_fetch_limit(limit, cursor),
+        offset=offset,
+        sort_attribute_name=sort.get_attribute_name(),
+        sort_direction=sort.get_direction(),
+        cursor=cursor,
     )
 
+    forms = cursor_header_adder(response, forms, cursor, limit)
+
     await content_range_header_adder(response, pagination)
 
     return [await produce_output_model(db_form) for db_form in forms]
@@ -11,7 +11,16 @@ from meldingen.actions.user import (
     UserRetrieveAction,
     UserUpdateAction,
 )
-from meldingen.api.utils import ContentRangeHeaderAdder, PaginationParams, SortParams, pagination_params, sort_param
+from meldingen.api.utils import (
+    ContentRangeHeaderAdder,
+    CursorHeaderAdder,
+    PaginationParams,
+    SortParams,
+    cursor_fetch_limit,
+    cursor_param,
+    pagination_params,
+    sort_param,
+)
 from meldingen.api.v1 import conflict_response, list_response, not_found_response, unauthorized_response
 from meldingen.authentication import authenticate_user
 from meldingen.dependencies import (
@@ -23,6 +32,7 @@ from meldingen.dependencies import (
     user_update_action,
 )
 from meldingen.models import User
+from meldingen.pagination import KeysetCursor
 from meldingen.repositories import UserRepository
 from meldingen.schemas.input import UserCreateInput, UserUpdateInput
 from meldingen.schemas.output import UserOutput
@@ -81,15 +91,23 @@ async def list_users(
     content_range_header: Annotated[ContentRangeHeaderAdder[User], Depends(content_range_header_adder)],
     pagination: Annotated[PaginationParams, Depends(pagination_params)],
     sort: Annotated[SortParams, Depends(sort_param)],
+    cursor: Annotated[KeysetCursor | None, Depends(cursor_param)],
+    cursor_header_adder: Annotated[CursorHeaderAdder[User], Depends(CursorHeaderAdder)],
     action: Annotated[UserListAction, Depends(user_list_action)],
 ) -> list[UserOutput]:
     limit = pagination["limit"] or 0
     offset = pagination["offset"] or 0
 
     users = await action(
-        limit=limit, offset=offset, sort_attribute_name=sort.get_attribute_name(), sort_direction=sort.get_direction()
+        limit=cursor_fetch_limit(limit, cursor),
+        offset=offset,
+        sort_attribute_name=sort.get_attribute_name(),
+        sort_direction=sort.get_direction(),
+        cursor=cursor,
     )
 
+    users = cursor_header_adder(response, users, cursor, limit)
+
     await content_range_header(response, pagination)
 
     return [_hydrate_output(db_user) for db_user in users]
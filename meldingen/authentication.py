@@ -3,11 +3,11 @@ from typing import Annotated
 from fastapi import Depends, HTTPException, Path, Query
 from fastapi.security import OAuth2AuthorizationCodeBearer
 from jwt import (
+    DecodeError,
     ExpiredSignatureError,
     InvalidAudienceError,
     InvalidIssuerError,
     MissingRequiredClaimError,
-    PyJWKClient,
     PyJWT,
 )
 from meldingen_core.exceptions import NotFoundException
@@ -16,8 +16,10 @@ from sqlalchemy.exc import NoResultFound
 from starlette.status import HTTP_400_BAD_REQUEST, HTTP_401_UNAUTHORIZED, HTTP_404_NOT_FOUND
 
 from meldingen.config import settings
-from meldingen.dependencies import jwks_client, py_jwt, token_verifier, user_repository
+from meldingen.dependencies import jwks_key_store, py_jwt, token_verifier, user_repository, verified_principal_cache
+from meldingen.jwks import JWKSKeyStore, SigningKeyNotFoundException
 from meldingen.models import Melding, User
+from meldingen.principals import UserSnapshot, VerifiedPrincipalCache
 from meldingen.repositories import UserRepository
 
 oauth2_scheme = OAuth2AuthorizationCodeBearer(
@@ -43,11 +45,15 @@ class InvalidTokenException(HTTPException):
 
 async def authenticate_user(
     token: Annotated[str, Depends(oauth2_scheme)],
-    jwks_client: Annotated[PyJWKClient, Depends(jwks_client)],
+    jwks_key_store: Annotated[JWKSKeyStore, Depends(jwks_key_store)],
     py_jwt: Annotated[PyJWT, Depends(py_jwt)],
     user_repository: Annotated[UserRepository, Depends(user_repository)],
+    principal_cache: Annotated[VerifiedPrincipalCache, Depends(verified_principal_cache)],
 ) -> User:
-    signing_key = jwks_client.get_signing_key_from_jwt(token)
+    try:
+        signing_key = await jwks_key_store.get_signing_key_from_jwt(token)
+    except (DecodeError, SigningKeyNotFoundException):
+        raise InvalidTokenException()
 
     try:
         payload = py_jwt.decode(
@@ -65,7 +71,14 @@ async def authenticate_user(
 
     email = str(payload.get(settings.auth_identifier_field))
 
-    return await user_repository.find_by_email_or_create(email)
+    snapshot = principal_cache.get(email)
+    if snapshot is not None:
+        return await user_repository.merge_snapshot(snapshot)
+
+    user = await user_repository.find_by_email_or_create(email)
+    principal_cache.put(email, UserSnapshot.from_user(user), float(payload["exp"]))
+
+    return user
 
 
 async def verify_melding_token(
@@ -1,21 +1,46 @@
+import asyncio
+import hashlib
 import logging
+import string
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
 from typing import Literal
 
+from opentelemetry import metrics
 from pydantic import BaseModel, Field, create_model
 
-from meldingen.repositories import ClassificationRepository
+from meldingen.database import invalidate_after_commit
+from meldingen.models import Classification
+from meldingen.repositories import ClassificationRepository, ClassificationResultRepository
 
 logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+prompt_cache_hits = meter.create_counter(
+    "classification.prompt_cache.hits", description="Classifications that reused the cached prompt and response model"
+)
+prompt_cache_misses = meter.create_counter(
+    "classification.prompt_cache.misses",
+    description="Classifications that had to build the prompt and response model from the database",
+)
+result_cache_hits = meter.create_counter(
+    "classification.result_cache.hits", description="Texts that reused the classification of an earlier, equal text"
+)
+result_cache_misses = meter.create_counter(
+    "classification.result_cache.misses", description="Texts that had to be classified by the LLM"
+)
 
 
 class ClassificationResponse(BaseModel):
     classification: str = Field(..., description="The chosen classification")
 
 
-async def build_dynamic_classification_response_model(repository: ClassificationRepository) -> type[BaseModel]:
-    """Function to create a dynamic Pydantic model to ensure the LLM's response is one of the valid classification names inside the Literal tuple."""
+def _response_model(classifications: Sequence[Classification]) -> type[BaseModel]:
+    """Dynamic model that only accepts one of the classification names, so the LLM can't make one up."""
 
-    classifications_list = [c.name for c in await repository.list()]
+    classifications_list = [c.name for c in classifications]
     classification_type = Literal[tuple(classifications_list)]
     return create_model(
         "ClassificationResponse",
@@ -23,10 +48,202 @@ async def build_dynamic_classification_response_model(repository: Classification
     )
 
 
-async def build_classification_prompt(repository: ClassificationRepository) -> str:
-    """Build a prompt section listing all classifications with their instructions."""
+def _prompt(classifications: Sequence[Classification]) -> str:
+    """Prompt section listing all classifications with their instructions."""
 
-    classifications = await repository.list()
     lines = [f"- **{c.name}**: {c.instructions}" if c.instructions else f"- **{c.name}**" for c in classifications]
 
     return "Beschikbare classificaties:\n" + "\n".join(lines) + "\n\n" + "Meldtekst:\n"
+
+
+@dataclass(frozen=True)
+class ClassificationPrompt:
+    """The prompt section listing the classifications, with the response model that only accepts their names."""
+
+    text: str
+    response_model: type[BaseModel]
+    # Identifies the set of classifications across processes, the same classifications give the same fingerprint
+    fingerprint: str
+
+    @classmethod
+    async def build(cls, repository: ClassificationRepository) -> "ClassificationPrompt":
+        classifications = await repository.list()
+        text = _prompt(classifications)
+
+        return cls(text, _response_model(classifications), hashlib.sha256(text.encode()).hexdigest())
+
+
+class ClassificationPromptCache:
+    """Process-wide copy of the classification prompt, built for a version of the set of classifications.
+
+    Every commit that creates, changes or soft-deletes a classification through the ORM bumps the version, after
+    which the prompt is built again on the next use. Changes made by other processes can't be seen, so a prompt
+    older than `max_age` seconds is built again as well.
+    """
+
+    _max_age: float
+    _version: int
+    _entry: tuple[int, float, ClassificationPrompt] | None
+    _lock: asyncio.Lock
+
+    def __init__(self, max_age: float) -> None:
+        self._max_age = max_age
+        self._version = 0
+        self._entry = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self) -> None:
+        self._version += 1
+        self._entry = None
+
+    async def get(self, repository: ClassificationRepository) -> ClassificationPrompt:
+        prompt = self._fresh_prompt()
+        if prompt is not None:
+            prompt_cache_hits.add(1)
+            return prompt
+
+        async with self._lock:
+            prompt = self._fresh_prompt()
+            if prompt is not None:
+                prompt_cache_hits.add(1)
+                return prompt
+
+            prompt_cache_misses.add(1)
+
+            version = self._version
+            prompt = await ClassificationPrompt.build(repository)
+
+            # A classification was changed while the prompt was being built, it might already be outdated
+            if version == self._version and self._max_age > 0:
+                self._entry = (version, time.monotonic() + self._max_age, prompt)
+
+            return prompt
+
+    def invalidate_on_classification_writes(self) -> None:
+        """Bumps the version after every commit that changed a classification."""
+        invalidate_after_commit((Classification,), self.invalidate)
+
+    def _fresh_prompt(self) -> ClassificationPrompt | None:
+        if self._entry is None:
+            return None
+
+        version, expires_at, prompt = self._entry
+        if version != self._version or time.monotonic() >= expires_at:
+            return None
+
+        return prompt
+
+
+class ClassificationResultCache:
+    """Classifications chosen by the LLM, reused for texts that are the same after normalization.
+
+    Results are stored in the database, so every process can reuse them, and expire after `ttl` seconds. The most
+    recently used results are also kept in the process, up to `max_size` and until the result in the database
+    expires, so reusing them costs no query to look them up. Reuses are recorded with ClassificationResultHits.
+
+    The key contains the fingerprint of the offered classifications, a result is never reused after a
+    classification was added, changed or deleted.
+    """
+
+    _max_size: int
+    _ttl: float
+    _entries: OrderedDict[str, tuple[int, str, float]]
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Ignores case, whitespace and punctuation around the text, which don't change its classification."""
+        return " ".join(text.casefold().split()).strip(string.punctuation + " ")
+
+    @staticmethod
+    def key(text: str, model: str, reasoning_effort: str | None, prompt: ClassificationPrompt) -> str:
+        return hashlib.sha256("\0".join((text, model, reasoning_effort or "", prompt.fingerprint)).encode()).hexdigest()
+
+    async def get(self, repository: ClassificationResultRepository, key: str) -> tuple[int, str] | None:
+        """The id and classification of the unexpired result with the key, or None when there is none."""
+        if self._ttl <= 0:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() < entry[2]:
+            self._entries.move_to_end(key)
+            result_cache_hits.add(1, {"source": "process"})
+
+            return entry[0], entry[1]
+
+        result = await repository.find_unexpired(key)
+        if result is None:
+            self._entries.pop(key, None)
+            result_cache_misses.add(1)
+            return None
+
+        self._put(key, *result)
+        result_cache_hits.add(1, {"source": "database"})
+
+        return result[0], result[1]
+
+    async def put(
+        self,
+        repository: ClassificationResultRepository,
+        key: str,
+        text: str,
+        model: str,
+        reasoning_effort: str | None,
+        prompt: ClassificationPrompt,
+        classification: str,
+    ) -> None:
+        if self._ttl <= 0:
+            return
+
+        result = await repository.store(
+            key, text, model, reasoning_effort, prompt.fingerprint, classification, self._ttl
+        )
+        if result is not None:
+            self._put(key, *result)
+
+    def _put(self, key: str, result_id: int, classification: str, expires_in: float) -> None:
+        """Keeps the result until the result in the database expires, `expires_in` seconds from now."""
+        if self._max_size <= 0:
+            return
+
+        self._entries[key] = (result_id, classification, time.monotonic() + expires_in)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+
+class ClassificationResultHits:
+    """The cached results that were reused while handling a request, recorded to audit the reused classifications.
+
+    They are recorded once the melding they classified has been saved, separately from it, so a failure to record
+    them never fails the request.
+    """
+
+    _repository: ClassificationResultRepository
+    _hits: list[tuple[int, str, str]]
+
+    def __init__(self, repository: ClassificationResultRepository) -> None:
+        self._repository = repository
+        self._hits = []
+
+    def add(self, result_id: int, text: str, classification: str) -> None:
+        self._hits.append((result_id, text, classification))
+
+    async def record(self, melding_id: int) -> None:
+        hits, self._hits = self._hits, []
+        if not hits:
+            return
+
+        try:
+            await self._repository.record_hits(melding_id, hits)
+        except Exception:
+            logger.exception("Failed to record the reused classifications of melding %d", melding_id)
@@ -1,7 +1,105 @@
+import asyncio
 import contextlib
-from typing import AsyncIterator
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
 
+from opentelemetry import metrics
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, UOWTransaction
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+pool_checkout_wait = meter.create_histogram(
+    "db.pool.checkout.wait", unit="s", description="Time spent waiting for a connection from the pool"
+)
+pool_connections_in_use = meter.create_up_down_counter(
+    "db.pool.connections.in_use", description="Connections currently checked out of the pool"
+)
+replica_fallbacks = meter.create_counter(
+    "db.replica.fallbacks", description="Read-only sessions opened on the primary because the replica was unavailable"
+)
+
+
+def _on_checkout(*_: Any) -> None:
+    pool_connections_in_use.add(1)
+
+
+def _on_checkin(*_: Any) -> None:
+    pool_connections_in_use.add(-1)
+
+
+@dataclass(frozen=True, eq=False)
+class _Invalidation:
+    model_types: tuple[type[Any], ...]
+    invalidate: Callable[[], None]
+    is_changed: Callable[[Any], bool] | None
+
+    def matches(self, instance: object) -> bool:
+        return isinstance(instance, self.model_types) and (self.is_changed is None or self.is_changed(instance))
+
+
+# The invalidations of all process-wide caches, run by the one set of Session listeners below
+_invalidations: list[_Invalidation] = []
+
+# The invalidations of which a session flushed a change, until it commits or rolls back
+_CHANGED_INVALIDATIONS = "changed_invalidations"
+
+
+def invalidate_after_commit(
+    model_types: tuple[type[Any], ...],
+    invalidate: Callable[[], None],
+    is_changed: Callable[[Any], bool] | None = None,
+) -> Callable[[], None]:
+    """Calls `invalidate` after every commit of a session that flushed an insert, update or delete of one of the
+    model types, for which `is_changed` holds when given. Used to keep process-wide caches in step with the database.
+
+    The invalidation happens after the commit and not at the flush, otherwise a request in between would load the
+    old data and cache it again. Changes that are rolled back are forgotten. Returns a function that stops the
+    invalidation.
+    """
+    invalidation = _Invalidation(model_types, invalidate, is_changed)
+    _invalidations.append(invalidation)
+
+    def stop() -> None:
+        _invalidations.remove(invalidation)
+
+    return stop
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_changed_invalidations(session: Session, flush_context: UOWTransaction) -> None:
+    """Goes over the flushed instances once for all invalidations, and stops when all of them have a change."""
+    changed: set[_Invalidation] = session.info.get(_CHANGED_INVALIDATIONS, set())
+    pending = [invalidation for invalidation in _invalidations if invalidation not in changed]
+
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if len(pending) == 0:
+            break
+
+        matched = [invalidation for invalidation in pending if invalidation.matches(instance)]
+        if matched:
+            changed.update(matched)
+            pending = [invalidation for invalidation in pending if invalidation not in changed]
+
+    if changed:
+        session.info[_CHANGED_INVALIDATIONS] = changed
+
+
+@event.listens_for(Session, "after_commit")
+def _run_changed_invalidations(session: Session) -> None:
+    for invalidation in session.info.pop(_CHANGED_INVALIDATIONS, ()):
+        invalidation.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_invalidations(session: Session) -> None:
+    session.info.pop(_CHANGED_INVALIDATIONS, None)
 
 
 class DatabaseSessionManager:
@@ -22,3 +120,77 @@ class DatabaseSessionManager:
             raise
         finally:
             await session.close()
+
+
+class MeteredAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """The default pool of async engines, exporting checkout wait time and in-use connections as metrics."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+
+        # A recreated pool receives the listeners of the pool it replaces through `_dispatch`
+        if "_dispatch" not in kwargs:
+            event.listen(self, "checkout", _on_checkout)
+            event.listen(self, "checkin", _on_checkin)
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_checkout_wait.record(time.perf_counter() - started)
+
+
+class DatabaseReplica(DatabaseSessionManager):
+    """A read replica that is only used while it is reachable and not lagging too far behind the primary.
+
+    The state of the replica is checked at most once every `check_interval` seconds, requests arriving
+    while a check is running use the outcome of the previous check.
+    """
+
+    # A replica that has replayed everything it received is up-to-date, even when the primary has been idle
+    LAG_QUERY = text(
+        "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+    )
+
+    _max_lag: float
+    _check_interval: float
+    _available: bool
+    _checked_at: float | None
+    _lock: asyncio.Lock
+
+    def __init__(self, engine: AsyncEngine, max_lag: float, check_interval: float):
+        super().__init__(engine)
+        self._max_lag = max_lag
+        self._check_interval = check_interval
+        self._available = False
+        self._checked_at = None
+        self._lock = asyncio.Lock()
+
+    async def is_available(self) -> bool:
+        is_stale = self._checked_at is None or time.monotonic() - self._checked_at >= self._check_interval
+        if is_stale and not self._lock.locked():
+            async with self._lock:
+                self._available = await self._check()
+                self._checked_at = time.monotonic()
+
+        if not self._available:
+            replica_fallbacks.add(1)
+
+        return self._available
+
+    async def _check(self) -> bool:
+        try:
+            async with asyncio.timeout(self._check_interval):
+                async with self._engine.connect() as connection:
+                    lag = await connection.scalar(self.LAG_QUERY)
+        except Exception:
+            logger.warning("Database replica is unreachable, reading from the primary", exc_info=True)
+            return False
+
+        if lag is None or lag > self._max_lag:
+            logger.warning(f"Database replica lags {lag} seconds behind, reading from the primary")
+            return False
+
+        return True
@@ -2,6 +2,7 @@ import logging
 import os
 from functools import lru_cache
 from typing import Annotated, Any, AsyncIterator
+from uuid import uuid4
 
 from amsterdam_mail_service_client.api.default_api import DefaultApi
 from amsterdam_mail_service_client.api_client import ApiClient
@@ -11,7 +12,7 @@ from azure.storage.blob.aio import ContainerClient
 from fastapi import BackgroundTasks, Depends
 from httpx import AsyncClient
 from jsonlogic.resolving import DotReferenceParser, ReferenceParser
-from jwt import PyJWKClient, PyJWT
+from jwt import PyJWT
 from meldingen_core.actions.melding import (
     MelderMeldingListQuestionsAnswersAction,
     MeldingAddAttachmentsAction,
@@ -100,12 +101,16 @@ from meldingen.actions.melding import (
     MelderMeldingRetrieveAction,
     MeldingAddAssetAction,
     MeldingAnswerDeleteAction,
+    MeldingBulkLabelAction,
+    MeldingBulkTransitionAction,
+    MeldingClusterAction,
     MeldingDeleteAssetAction,
     MeldingGetPossibleNextStatesAction,
     MeldingListAction,
     MeldingRetrieveAction,
     MeldingSubmitAction,
     MeldingSubmitActionMelder,
+    MeldingVectorTileAction,
 )
 from meldingen.actions.note import NoteListAction
 from meldingen.actions.source import SourceListAction
@@ -122,9 +127,11 @@ from meldingen.adapters.malware.azure_defender_for_storage_scanner import AzureD
 from meldingen.adapters.malware.dummy_scanner import DummyMalwareScanner
 from meldingen.address import AddressEnricherTask, PDOKAddressResolver, PDOKAddressTransformer
 from meldingen.answer import AnswerPurger
+from meldingen.api.utils import CountCache
 from meldingen.asset import AssetPurger
+from meldingen.classification import ClassificationPromptCache, ClassificationResultCache, ClassificationResultHits
 from meldingen.config import settings
-from meldingen.database import DatabaseSessionManager
+from meldingen.database import DatabaseReplica, DatabaseSessionManager, MeteredAsyncAdaptedQueuePool
 from meldingen.factories import (
     AnswerFactory,
     AssetFactory,
@@ -134,7 +141,8 @@ from meldingen.factories import (
     FormIoQuestionComponentFactory,
     NoteFactory,
 )
-from meldingen.generators import PublicIdGenerator
+from meldingen.form_cache import FormOutputCache
+from meldingen.generators import PublicIdAllocator, PublicIdPermutation
 from meldingen.image import (
     ImageOptimizerTask,
     IMGProxyImageOptimizer,
@@ -146,7 +154,8 @@ from meldingen.image import (
     Ingestor,
     ThumbnailGeneratorTask,
 )
-from meldingen.jsonlogic import JSONLogicValidator
+from meldingen.jsonlogic import JSONLogicExpressionCache, JSONLogicValidator
+from meldingen.jwks import JWKSKeyStore
 from meldingen.labels import LabelReplacer
 from meldingen.location import (
     GeoJsonFeatureFactory,
@@ -160,6 +169,7 @@ from meldingen.location import (
 from meldingen.mail import (
     AmsterdamMailServiceMailer,
     AmsterdamMailServiceMailPreviewer,
+    AmsterdamMailServiceMeldingBulkCompleteMailer,
     AmsterdamMailServiceMeldingCompleteMailer,
     AmsterdamMailServiceMeldingConfirmationMailer,
     BaseMailer,
@@ -168,6 +178,7 @@ from meldingen.mail import (
     SendConfirmationMailTask,
 )
 from meldingen.models import Answer, Asset, Classification, Label, Melding, Note, Source, User
+from meldingen.principals import VerifiedPrincipalCache
 from meldingen.reclassification import Reclassifier
 from meldingen.repositories import (
     AnswerRepository,
@@ -175,6 +186,7 @@ from meldingen.repositories import (
     AssetTypeRepository,
     AttachmentRepository,
     ClassificationRepository,
+    ClassificationResultRepository,
     FormIoQuestionComponentRepository,
     FormRepository,
     LabelRepository,
@@ -243,6 +255,7 @@ from meldingen.statemachine import (
     Submit,
     SubmitLocation,
 )
+from meldingen.tiles import VectorTileCache
 from meldingen.token import TokenInvalidator, UrlSafeTokenGenerator
 from meldingen.validators import (
     BackofficeAttachmentLimitValidator,
@@ -250,12 +263,12 @@ from meldingen.validators import (
     MediaTypeValidator,
     MeldingFormAttachmentLimitValidator,
     MeldingPrimaryFormValidator,
+    PrimaryFormSnapshot,
 )
 from meldingen.wfs import ProxyWfsProviderValidator
 
 
-@lru_cache
-def database_engine() -> AsyncEngine:
+def create_database_engine(dsn: str) -> AsyncEngine:
     echo: bool | str = False
     match settings.log_level:  # pragma: no cover
         case logging.INFO:
@@ -263,13 +276,60 @@ def database_engine() -> AsyncEngine:
         case logging.DEBUG:
             echo = "debug"
 
-    engine = create_async_engine(str(settings.database_dsn), echo=echo)
+    server_settings = {"application_name": settings.database_application_name}
+    if settings.database_statement_timeout is not None:
+        server_settings["statement_timeout"] = str(settings.database_statement_timeout)
+
+    connect_args: dict[str, Any] = {
+        "server_settings": server_settings,
+        "statement_cache_size": settings.database_statement_cache_size,
+        "prepared_statement_cache_size": settings.database_prepared_statement_cache_size,
+    }
+    if settings.database_pgbouncer:
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        # Unique names, so statements prepared on another server connection by PgBouncer never collide
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+
+    engine = create_async_engine(
+        dsn,
+        echo=echo,
+        poolclass=MeteredAsyncAdaptedQueuePool,
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_pool_max_overflow,
+        pool_timeout=settings.database_pool_timeout,
+        pool_recycle=settings.database_pool_recycle,
+        pool_pre_ping=settings.database_pool_pre_ping,
+        connect_args=connect_args,
+    )
 
     SQLAlchemyInstrumentor().instrument(engine=engine.sync_engine)
 
     return engine
 
 
+@lru_cache
+def database_engine() -> AsyncEngine:
+    return create_database_engine(str(settings.database_dsn))
+
+
+@lru_cache
+def database_replica() -> DatabaseReplica | None:
+    if settings.database_replica_dsn is None:
+        return None
+
+    return DatabaseReplica(
+        create_database_engine(str(settings.database_replica_dsn)),
+        settings.database_replica_max_lag,
+        settings.database_replica_check_interval,
+    )
+
+
+@lru_cache
+def count_cache() -> CountCache:
+    return CountCache(settings.list_count_cache_ttl)
+
+
 def database_session_manager(engine: Annotated[AsyncEngine, Depends(database_engine)]) -> DatabaseSessionManager:
     return DatabaseSessionManager(engine)
 
@@ -281,10 +341,43 @@ async def database_session(
         yield session
 
 
+async def read_only_database_session(
+    session: Annotated[AsyncSession, Depends(database_session)],
+    replica: Annotated[DatabaseReplica | None, Depends(database_replica)],
+) -> AsyncIterator[AsyncSession]:
+    """A session on the read replica when one is configured and available, otherwise the session on the primary.
+
+    Only for endpoints that do not write, and not for the melder token flow, which has to read its own writes. Nor
+    for data kept in a process cache, like forms and vector tiles: those caches are emptied after a commit on the
+    primary, and a lagging replica would fill them with the old data again.
+
+    Without a replica this is the same session that the other dependencies of the request use, so the request
+    never holds a second connection to the primary.
+    """
+    if replica is None or not await replica.is_available():
+        yield session
+        return
+
+    async with replica.session() as replica_session:
+        yield replica_session
+
+
 def classification_repository(session: Annotated[AsyncSession, Depends(database_session)]) -> ClassificationRepository:
     return ClassificationRepository(session)
 
 
+def classification_result_repository(
+    session: Annotated[AsyncSession, Depends(database_session)],
+) -> ClassificationResultRepository:
+    return ClassificationResultRepository(session)
+
+
+def classification_read_repository(
+    session: Annotated[AsyncSession, Depends(read_only_database_session)],
+) -> ClassificationRepository:
+    return ClassificationRepository(session)
+
+
 def asset_type_repository(database_session: Annotated[AsyncSession, Depends(database_session)]) -> AssetTypeRepository:
     return AssetTypeRepository(database_session)
 
@@ -297,13 +390,13 @@ def classification_create_action(
 
 
 def classification_retrieve_action(
-    repository: Annotated[ClassificationRepository, Depends(classification_repository)],
+    repository: Annotated[ClassificationRepository, Depends(classification_read_repository)],
 ) -> ClassificationRetrieveAction:
     return ClassificationRetrieveAction(repository)
 
 
 def classification_list_action(
-    repository: Annotated[ClassificationRepository, Depends(classification_repository)],
+    repository: Annotated[ClassificationRepository, Depends(classification_read_repository)],
 ) -> ClassificationListAction:
     return ClassificationListAction(repository)
 
@@ -329,6 +422,10 @@ def melding_repository(session: Annotated[AsyncSession, Depends(database_session
     return MeldingRepository(session)
 
 
+def melding_read_repository(session: Annotated[AsyncSession, Depends(read_only_database_session)]) -> MeldingRepository:
+    return MeldingRepository(session)
+
+
 def answer_repository(session: Annotated[AsyncSession, Depends(database_session)]) -> AnswerRepository:
     return AnswerRepository(session)
 
@@ -345,6 +442,12 @@ def attachment_repository(session: Annotated[AsyncSession, Depends(database_sess
     return AttachmentRepository(session)
 
 
+def attachment_read_repository(
+    session: Annotated[AsyncSession, Depends(read_only_database_session)],
+) -> AttachmentRepository:
+    return AttachmentRepository(session)
+
+
 def asset_repository(session: Annotated[AsyncSession, Depends(database_session)]) -> AssetRepository:
     return AssetRepository(session)
 
@@ -430,12 +533,45 @@ def classification_model_settings() -> OpenAIChatModelSettings | None:
     return OpenAIChatModelSettings(openai_reasoning_effort=effort)
 
 
+@lru_cache
+def classification_prompt_cache() -> ClassificationPromptCache:
+    cache = ClassificationPromptCache(settings.classification_prompt_cache_max_age)
+    cache.invalidate_on_classification_writes()
+
+    return cache
+
+
+@lru_cache
+def classification_result_cache() -> ClassificationResultCache:
+    return ClassificationResultCache(
+        settings.classification_result_cache_size, settings.classification_result_cache_ttl
+    )
+
+
+def classification_result_hits(
+    repository: Annotated[ClassificationResultRepository, Depends(classification_result_repository)],
+) -> ClassificationResultHits:
+    return ClassificationResultHits(repository)
+
+
 def classifier_adapter(
     agent: Annotated[Agent, Depends(classifier_agent)],
     repository: Annotated[ClassificationRepository, Depends(classification_repository)],
+    prompt_cache: Annotated[ClassificationPromptCache, Depends(classification_prompt_cache)],
+    result_cache: Annotated[ClassificationResultCache, Depends(classification_result_cache)],
+    result_repository: Annotated[ClassificationResultRepository, Depends(classification_result_repository)],
+    result_hits: Annotated[ClassificationResultHits, Depends(classification_result_hits)],
 ) -> AgentClassifierAdapter | DummyClassifierAdapter:
     if settings.llm_enabled:
-        return AgentClassifierAdapter(agent, repository, classification_model_settings())
+        return AgentClassifierAdapter(
+            agent,
+            repository,
+            classification_model_settings(),
+            prompt_cache,
+            result_cache,
+            result_repository,
+            result_hits,
+        )
     return DummyClassifierAdapter()
 
 
@@ -495,8 +631,9 @@ def melding_state_machine(
     )
 
 
-def public_id_generator() -> PublicIdGenerator:
-    return PublicIdGenerator()
+@lru_cache
+def public_id_allocator() -> PublicIdAllocator:
+    return PublicIdAllocator(PublicIdPermutation(settings.melding_public_id_key), settings.melding_public_id_block_size)
 
 
 def asset_type_output_factory() -> AssetTypeOutputFactory:
@@ -527,7 +664,7 @@ def melding_create_action(
 
 
 def melding_retrieve_action(
-    repository: Annotated[MeldingRepository, Depends(melding_repository)],
+    repository: Annotated[MeldingRepository, Depends(melding_read_repository)],
 ) -> MeldingRetrieveAction:
     return MeldingRetrieveAction(repository)
 
@@ -538,7 +675,9 @@ def melder_melding_retrieve_action(
     return MelderMeldingRetrieveAction(token_verifier)
 
 
-def melding_list_action(repository: Annotated[MeldingRepository, Depends(melding_repository)]) -> MeldingListAction:
+def melding_list_action(
+    repository: Annotated[MeldingRepository, Depends(melding_read_repository)],
+) -> MeldingListAction:
     return MeldingListAction(repository)
 
 
@@ -569,12 +708,16 @@ def label_repository(session: Annotated[AsyncSession, Depends(database_session)]
     return LabelRepository(session)
 
 
+def label_read_repository(session: Annotated[AsyncSession, Depends(read_only_database_session)]) -> LabelRepository:
+    return LabelRepository(session)
+
+
 def label_replacer(repository: Annotated[LabelRepository, Depends(label_repository)]) -> LabelReplacer:
     return LabelReplacer(repository)
 
 
 def label_list_action(
-    repository: Annotated[LabelRepository, Depends(label_repository)],
+    repository: Annotated[LabelRepository, Depends(label_read_repository)],
 ) -> LabelListAction:
     return LabelListAction(repository)
 
@@ -583,8 +726,12 @@ def source_repository(session: Annotated[AsyncSession, Depends(database_session)
     return SourceRepository(session)
 
 
+def source_read_repository(session: Annotated[AsyncSession, Depends(read_only_database_session)]) -> SourceRepository:
+    return SourceRepository(session)
+
+
 def source_list_action(
-    repository: Annotated[SourceRepository, Depends(source_repository)],
+    repository: Annotated[SourceRepository, Depends(source_read_repository)],
 ) -> SourceListAction:
     return SourceListAction(repository)
 
@@ -593,6 +740,10 @@ def note_repository(session: Annotated[AsyncSession, Depends(database_session)])
     return NoteRepository(session)
 
 
+def note_read_repository(session: Annotated[AsyncSession, Depends(read_only_database_session)]) -> NoteRepository:
+    return NoteRepository(session)
+
+
 def note_factory() -> NoteFactory:
     return NoteFactory()
 
@@ -626,8 +777,8 @@ def note_update_action(
 
 
 def note_list_action(
-    repository: Annotated[NoteRepository, Depends(note_repository)],
-    melding_repository: Annotated[MeldingRepository, Depends(melding_repository)],
+    repository: Annotated[NoteRepository, Depends(note_read_repository)],
+    melding_repository: Annotated[MeldingRepository, Depends(melding_read_repository)],
 ) -> NoteListAction:
     return NoteListAction(repository, melding_repository)
 
@@ -820,14 +971,44 @@ def melding_complete_action(
     return MeldingCompleteAction(state_machine, repository, mailer)
 
 
+def melding_bulk_complete_mailer(
+    background_task_manager: BackgroundTasks,
+    send_completed_mail_task: Annotated[SendCompletedMailTask, Depends(send_completed_mail_task)],
+) -> AmsterdamMailServiceMeldingBulkCompleteMailer:
+    return AmsterdamMailServiceMeldingBulkCompleteMailer(background_task_manager, send_completed_mail_task)
+
+
+def melding_bulk_transition_action(
+    state_machine: Annotated[MeldingStateMachine, Depends(melding_state_machine)],
+    repository: Annotated[MeldingRepository, Depends(melding_repository)],
+    complete_mailer: Annotated[AmsterdamMailServiceMeldingBulkCompleteMailer, Depends(melding_bulk_complete_mailer)],
+) -> MeldingBulkTransitionAction:
+    return MeldingBulkTransitionAction(
+        state_machine, repository, complete_mailer, settings.melding_bulk_limit, settings.melding_bulk_chunk_size
+    )
+
+
+def melding_bulk_label_action(
+    melding_repository: Annotated[MeldingRepository, Depends(melding_repository)],
+    label_repository: Annotated[LabelRepository, Depends(label_repository)],
+) -> MeldingBulkLabelAction:
+    return MeldingBulkLabelAction(melding_repository, label_repository, settings.melding_bulk_limit)
+
+
 def jsonlogic_reference_parser() -> ReferenceParser:
     return DotReferenceParser()
 
 
+@lru_cache
+def jsonlogic_expression_cache() -> JSONLogicExpressionCache:
+    return JSONLogicExpressionCache(settings.jsonlogic_expression_cache_size)
+
+
 def jsonlogic_validator(
     reference_parser: Annotated[ReferenceParser, Depends(jsonlogic_reference_parser)],
+    expression_cache: Annotated[JSONLogicExpressionCache, Depends(jsonlogic_expression_cache)],
 ) -> JSONLogicValidator:
-    return JSONLogicValidator(reference_parser)
+    return JSONLogicValidator(reference_parser, expression_cache)
 
 
 def form_io_question_component_repository(
@@ -1135,7 +1316,7 @@ def download_attachment_action(
 
 
 def melding_list_attachments_action(
-    attachment_repository: Annotated[AttachmentRepository, Depends(attachment_repository)],
+    attachment_repository: Annotated[AttachmentRepository, Depends(attachment_read_repository)],
 ) -> ListAttachmentsAction:
     return ListAttachmentsAction(attachment_repository)
 
@@ -1331,10 +1512,30 @@ def static_form_retrieve_action(
     return StaticFormRetrieveAction(repository)
 
 
+@lru_cache
+def primary_form_snapshot() -> PrimaryFormSnapshot:
+    snapshot = PrimaryFormSnapshot(settings.primary_form_snapshot_max_age)
+    snapshot.invalidate_on_static_form_writes()
+
+    return snapshot
+
+
+@lru_cache
+def form_output_cache() -> FormOutputCache:
+    return FormOutputCache("form", settings.form_output_cache_size, settings.form_output_cache_ttl)
+
+
+@lru_cache
+def static_form_output_cache() -> FormOutputCache:
+    return FormOutputCache("static_form", settings.form_output_cache_size, settings.form_output_cache_ttl)
+
+
 def static_form_update_action(
     repository: Annotated[StaticFormRepository, Depends(static_form_repository)],
+    cache: Annotated[FormOutputCache, Depends(static_form_output_cache)],
+    snapshot: Annotated[PrimaryFormSnapshot, Depends(primary_form_snapshot)],
 ) -> StaticFormUpdateAction:
-    return StaticFormUpdateAction(repository)
+    return StaticFormUpdateAction(repository, cache, snapshot)
 
 
 def static_form_list_action(
@@ -1496,9 +1697,10 @@ def form_create_action(
     form_io_question_component_factory: Annotated[
         FormIoQuestionComponentFactory, Depends(form_io_question_component_factory)
     ],
+    cache: Annotated[FormOutputCache, Depends(form_output_cache)],
 ) -> FormCreateAction:
     return FormCreateAction(
-        repository, classification_repository, question_repository, form_io_question_component_factory
+        repository, classification_repository, question_repository, form_io_question_component_factory, cache
     )
 
 
@@ -1523,18 +1725,55 @@ def form_update_action(
     form_io_question_component_factory: Annotated[
         FormIoQuestionComponentFactory, Depends(form_io_question_component_factory)
     ],
+    cache: Annotated[FormOutputCache, Depends(form_output_cache)],
 ) -> FormUpdateAction:
     return FormUpdateAction(
-        repository, classification_repository, question_repository, form_io_question_component_factory
+        repository, classification_repository, question_repository, form_io_question_component_factory, cache
+    )
+
+
+def form_delete_action(
+    repository: Annotated[FormRepository, Depends(form_repository)],
+    cache: Annotated[FormOutputCache, Depends(form_output_cache)],
+) -> FormDeleteAction:
+    return FormDeleteAction(repository, cache)
+
+
+@lru_cache
+def jwks_key_store() -> JWKSKeyStore:
+    return JWKSKeyStore(
+        settings.jwks_url,
+        settings.jwks_cache_ttl,
+        settings.jwks_min_refresh_interval,
+        settings.jwks_fetch_timeout,
     )
 
 
-def form_delete_action(repository: Annotated[FormRepository, Depends(form_repository)]) -> FormDeleteAction:
-    return FormDeleteAction(repository)
+@lru_cache
+def vector_tile_cache() -> VectorTileCache:
+    cache = VectorTileCache(settings.melding_tile_cache_size, settings.melding_tile_cache_ttl)
+    cache.invalidate_on_melding_writes()
+
+    return cache
 
 
-def jwks_client() -> PyJWKClient:
-    return PyJWKClient(settings.jwks_url)
+def melding_cluster_action(
+    repository: Annotated[MeldingRepository, Depends(melding_read_repository)],
+) -> MeldingClusterAction:
+    return MeldingClusterAction(repository)
+
+
+def melding_vector_tile_action(
+    # Not the read replica, the tiles are cached, see read_only_database_session
+    repository: Annotated[MeldingRepository, Depends(melding_repository)],
+    cache: Annotated[VectorTileCache, Depends(vector_tile_cache)],
+) -> MeldingVectorTileAction:
+    return MeldingVectorTileAction(repository, cache)
+
+
+@lru_cache
+def verified_principal_cache() -> VerifiedPrincipalCache:
+    return VerifiedPrincipalCache(settings.auth_principal_cache_size, settings.auth_principal_cache_ttl)
 
 
 def py_jwt() -> PyJWT:
@@ -1553,12 +1792,18 @@ def user_retrieve_action(repository: Annotated[UserRepository, Depends(user_repo
     return UserRetrieveAction(repository)
 
 
-def user_update_action(repository: Annotated[UserRepository, Depends(user_repository)]) -> UserUpdateAction:
-    return UserUpdateAction(repository)
+def user_update_action(
+    repository: Annotated[UserRepository, Depends(user_repository)],
+    principal_cache: Annotated[VerifiedPrincipalCache, Depends(verified_principal_cache)],
+) -> UserUpdateAction:
+    return UserUpdateAction(repository, principal_cache)
 
 
-def user_delete_action(repository: Annotated[UserRepository, Depends(user_repository)]) -> UserDeleteAction:
-    return UserDeleteAction(repository)
+def user_delete_action(
+    repository: Annotated[UserRepository, Depends(user_repository)],
+    principal_cache: Annotated[VerifiedPrincipalCache, Depends(verified_principal_cache)],
+) -> UserDeleteAction:
+    return UserDeleteAction(repository, principal_cache)
 
 
 def wfs_provider_validator() -> BaseWfsProviderValidator:
@@ -1634,6 +1879,7 @@ def simple_form_output_factory() -> SimpleFormOutputFactory:
 
 def melding_primary_form_validator(
     _static_form_repository: Annotated[StaticFormRepository, Depends(static_form_repository)],
+    _primary_form_snapshot: Annotated[PrimaryFormSnapshot, Depends(primary_form_snapshot)],
     _jsonlogic_validator: Annotated[JSONLogicValidator, Depends(jsonlogic_validator)],
 ) -> MeldingPrimaryFormValidator:
-    return MeldingPrimaryFormValidator(_static_form_repository, _jsonlogic_validator)
+    return MeldingPrimaryFormValidator(_static_form_repository, _primary_form_snapshot, _jsonlogic_validator)
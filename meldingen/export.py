@@ -0,0 +1,176 @@
+import csv
+import io
+import json
+from abc import ABCMeta, abstractmethod
+from collections.abc import AsyncIterable, AsyncIterator, Mapping
+from datetime import datetime
+from enum import StrEnum
+from typing import Any
+
+# The columns of an exported melding, in order. `geo_location` holds the location as a GeoJSON geometry string.
+EXPORT_COLUMNS = (
+    "id",
+    "public_id",
+    "text",
+    "state",
+    "urgency",
+    "classification",
+    "source",
+    "labels",
+    "street",
+    "house_number",
+    "house_number_addition",
+    "postal_code",
+    "city",
+    "email",
+    "phone",
+    "created_at",
+    "updated_at",
+)
+
+
+# Spreadsheets run a cell that starts with one of these as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+# The free text columns, which are written by citizens. The other columns are either generated or validated, like
+# the phone number that starts with a plus and would be corrupted by escaping it.
+FORMULA_ESCAPED_COLUMNS = frozenset({"text", "street", "house_number_addition", "postal_code", "city", "email"})
+
+
+class ExportFormat(StrEnum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+    GEOJSON = "geojson"
+
+
+def _serialize_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    return value
+
+
+def _properties(row: Mapping[Any, Any]) -> dict[str, Any]:
+    properties = {column: _serialize_value(row[column]) for column in EXPORT_COLUMNS}
+    properties["labels"] = list(row["labels"] or [])
+
+    return properties
+
+
+def _escape_formula(value: Any) -> Any:
+    """Prefixes text that a spreadsheet would run as a formula with a quote, so it is shown as text instead."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+
+    return value
+
+
+def _geometry(row: Mapping[Any, Any]) -> Any:
+    return None if row["geo_location"] is None else json.loads(row["geo_location"])
+
+
+class BaseMeldingExportSerializer(metaclass=ABCMeta):
+    """Serializes the rows of an export one at a time, so that the export never has to be held in memory."""
+
+    media_type: str
+    file_extension: str
+
+    @abstractmethod
+    def __call__(self, rows: AsyncIterable[Mapping[Any, Any]]) -> AsyncIterator[str]: ...
+
+
+class NDJSONMeldingExportSerializer(BaseMeldingExportSerializer):
+    media_type = "application/x-ndjson"
+    file_extension = "ndjson"
+
+    async def __call__(self, rows: AsyncIterable[Mapping[Any, Any]]) -> AsyncIterator[str]:
+        async for row in rows:
+            yield json.dumps({**_properties(row), "geo_location": _geometry(row)}, ensure_ascii=False) + "\n"
+
+
+class CSVMeldingExportSerializer(BaseMeldingExportSerializer):
+    """Writes the location as longitude and latitude columns, as spreadsheets can't do much with a geometry.
+
+    Free text in the export is written by citizens, free text that would run as a formula is escaped.
+    """
+
+    media_type = "text/csv"
+    file_extension = "csv"
+
+    async def __call__(self, rows: AsyncIterable[Mapping[Any, Any]]) -> AsyncIterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        writer.writerow((*EXPORT_COLUMNS, "longitude", "latitude"))
+        yield self._flush(buffer)
+
+        async for row in rows:
+            properties = _properties(row)
+            properties["labels"] = ", ".join(properties["labels"])
+
+            longitude = latitude = None
+            geometry = _geometry(row)
+            if geometry is not None and geometry["type"] == "Point":
+                longitude, latitude = geometry["coordinates"][:2]
+
+            values = (
+                _escape_formula(value) if column in FORMULA_ESCAPED_COLUMNS else value
+                for column, value in properties.items()
+            )
+            writer.writerow((*values, longitude, latitude))
+            yield self._flush(buffer)
+
+    @staticmethod
+    def _flush(buffer: io.StringIO) -> str:
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+        return value
+
+
+class GeoJSONMeldingExportSerializer(BaseMeldingExportSerializer):
+    """Writes a single FeatureCollection, of which the features are written as the rows come in."""
+
+    media_type = "application/geo+json"
+    file_extension = "geojson"
+
+    async def __call__(self, rows: AsyncIterable[Mapping[Any, Any]]) -> AsyncIterator[str]:
+        yield '{"type":"FeatureCollection","features":['
+
+        separator = ""
+        async for row in rows:
+            feature = {"type": "Feature", "id": row["id"], "geometry": _geometry(row), "properties": _properties(row)}
+            yield separator + json.dumps(feature, ensure_ascii=False)
+            separator = ","
+
+        yield "]}"
+
+
+EXPORT_SERIALIZERS: Mapping[ExportFormat, BaseMeldingExportSerializer] = {
+    ExportFormat.NDJSON: NDJSONMeldingExportSerializer(),
+    ExportFormat.CSV: CSVMeldingExportSerializer(),
+    ExportFormat.GEOJSON: GeoJSONMeldingExportSerializer(),
+}
+
+
+async def buffered(chunks: AsyncIterable[str], size: int = 64 * 1024) -> AsyncIterator[str]:
+    """Joins small chunks into chunks of about `size` characters, instead of sending every row on its own.
+
+    The first chunk is passed on as is, so the response starts right away.
+    """
+    buffer: list[str] = []
+    length = 0
+    first = True
+
+    async for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+
+        if first or length >= size:
+            yield "".join(buffer)
+            buffer.clear()
+            length = 0
+            first = False
+
+    if len(buffer) > 0:
+        yield "".join(buffer)
@@ -0,0 +1,45 @@
+from typing import Any, Sequence
+
+from geojson_pydantic import Feature
+from geojson_pydantic.geometries import Geometry
+from meldingen_core.filters import MeldingListFilters as BaseMeldingListFilters
+from meldingen_core.filters import NameListFilters as BaseNameListFilters
+from meldingen_core.statemachine import MeldingBackofficeStates, get_all_backoffice_states
+from pydantic import BaseModel
+
+
+class MeldingListFilters(BaseMeldingListFilters):
+    """The filters of meldingen_core, extended with a full-text search query on the text of the melding."""
+
+    q: str | None
+
+    def __init__(self, area: str | None = None, states: Sequence[str] | None = None, q: str | None = None):
+        super().__init__(area=area, states=states)
+        self.q = q
+
+
+class NameListFilters(BaseNameListFilters):
+    """The filters of meldingen_core, extended with a prefix mode that only matches names starting with the query."""
+
+    prefix: bool
+
+    def __init__(self, name_contains: str | None = None, prefix: bool = False):
+        super().__init__(name_contains=name_contains)
+        self.prefix = prefix
+
+
+def area_from_feature(in_area: str) -> str | None:
+    """Returns the geometry of a GeoJSON Feature as a GeoJSON string, raises a ValidationError on invalid GeoJSON."""
+    feature: Feature[Geometry, dict[str, Any] | BaseModel] = Feature.model_validate_json(in_area)
+    if feature.geometry is None:
+        return None
+
+    return feature.geometry.model_dump_json()
+
+
+def backoffice_states_from_param(state: str | None) -> Sequence[MeldingBackofficeStates]:
+    """Parses a comma-separated list of states, unknown states are ignored and no states means all backoffice states."""
+    if not state:
+        return get_all_backoffice_states()
+
+    return [MeldingBackofficeStates(s) for s in state.split(",") if s in MeldingBackofficeStates]
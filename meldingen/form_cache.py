@@ -0,0 +1,117 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+
+from opentelemetry import metrics
+
+meter = metrics.get_meter(__name__)
+
+form_cache_hits = meter.create_counter("form.output_cache.hits", description="Forms served from the output cache")
+form_cache_misses = meter.create_counter(
+    "form.output_cache.misses", description="Forms that had to be loaded and serialized"
+)
+form_cache_coalesced = meter.create_counter(
+    "form.output_cache.coalesced",
+    description="Misses that waited for the same form being serialized by another request",
+)
+
+
+class FormOutputCache:
+    """Bounded, process-wide cache of serialized form output, keyed by the version of the forms and a lookup key.
+
+    The version is bumped by every action that creates, changes or deletes a form, which makes all cached output
+    unreachable at once. Forms change rarely and one form can be looked up by both its own id and the id of its
+    classification, so that is simpler and safer than keeping track of every key a form was cached under. Writes
+    by other processes can't be seen, so entries also expire after `ttl` seconds.
+
+    Concurrent misses for the same key are coalesced, only the first one loads and serializes the form while the
+    others wait for its result.
+    """
+
+    _name: str
+    _max_size: int
+    _ttl: float
+    _version: int
+    _entries: OrderedDict[tuple[int, Hashable], tuple[bytes, float]]
+    _in_flight: dict[tuple[int, Hashable], asyncio.Future[bytes]]
+
+    def __init__(self, name: str, max_size: int, ttl: float) -> None:
+        self._name = name
+        self._max_size = max_size
+        self._ttl = ttl
+        self._version = 0
+        self._entries = OrderedDict()
+        self._in_flight = {}
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self) -> None:
+        self._version += 1
+        self._entries.clear()
+
+    async def get(self, key: Hashable, produce: Callable[[], Awaitable[bytes]]) -> bytes:
+        """Returns the cached output for the key, or the output of `produce` which is then cached.
+
+        Exceptions raised by `produce`, like a 404 for a form that does not exist, reach every waiting request
+        and are not cached.
+        """
+        attributes = {"cache": self._name}
+        versioned_key = (self._version, key)
+
+        entry = self._entries.get(versioned_key)
+        if entry is not None:
+            output, expires_at = entry
+            if time.monotonic() < expires_at:
+                self._entries.move_to_end(versioned_key)
+                form_cache_hits.add(1, attributes)
+                return output
+
+            del self._entries[versioned_key]
+
+        in_flight = self._in_flight.get(versioned_key)
+        if in_flight is not None:
+            form_cache_coalesced.add(1, attributes)
+            try:
+                return await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                # Only the request that was serializing the form got cancelled, this one can take over
+                if not in_flight.cancelled():
+                    raise
+
+                return await self.get(key, produce)
+
+        form_cache_misses.add(1, attributes)
+
+        future: asyncio.Future[bytes] = asyncio.get_running_loop().create_future()
+        self._in_flight[versioned_key] = future
+        try:
+            output = await produce()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exception:
+            future.set_exception(exception)
+            # Retrieves the exception, so it isn't logged as never retrieved when nobody was waiting for it
+            future.exception()
+            raise
+        else:
+            future.set_result(output)
+            self._put(versioned_key, output)
+        finally:
+            del self._in_flight[versioned_key]
+
+        return output
+
+    def _put(self, versioned_key: tuple[int, Hashable], output: bytes) -> None:
+        # The form was changed while it was being serialized, the output might already be outdated
+        if versioned_key[0] != self._version or self._max_size <= 0 or self._ttl <= 0:
+            return
+
+        self._entries[versioned_key] = (output, time.monotonic() + self._ttl)
+        self._entries.move_to_end(versioned_key)
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
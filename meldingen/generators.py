@@ -1,15 +1,106 @@
-import secrets
+import asyncio
+import hashlib
+import hmac
 import string
+from collections import deque
 
+from meldingen.repositories import MeldingRepository
 
-class PublicIdGenerator:
+PUBLIC_ID_ALPHABET = string.ascii_uppercase + string.digits
+PUBLIC_ID_LENGTH = 6
+
+
+class PublicIdPermutation:
+    """Maps every number below len(alphabet) ** length onto its own public id, in an order that can't be guessed
+    without the key.
+
+    The number is split in two halves that are shuffled by a keyed Feistel network, which is a permutation by
+    construction, so two numbers never get the same public id. The halves are both len(alphabet) ** (length / 2)
+    big, so the result always fits in `length` characters of the alphabet.
+    """
+
+    ROUNDS = 8
+
+    _key: bytes
     _alphabet: str
+    _length: int
+    _half: int
+
+    def __init__(self, key: str, alphabet: str = PUBLIC_ID_ALPHABET, length: int = PUBLIC_ID_LENGTH) -> None:
+        if length % 2 != 0:
+            raise ValueError("The length of a public id must be even")
+
+        self._key = key.encode()
+        self._alphabet = alphabet
+        self._length = length
+        self._half = len(alphabet) ** (length // 2)
+
+    @property
+    def size(self) -> int:
+        return self._half**2
+
+    def encode(self, number: int) -> str:
+        if not 0 <= number < self.size:
+            raise ValueError(f"Only numbers from 0 up to {self.size} can be encoded")
+
+        left, right = divmod(number, self._half)
+        for round_number in range(self.ROUNDS):
+            left, right = right, (left + self._round(round_number, right)) % self._half
+
+        number = left * self._half + right
+        characters = []
+        for _ in range(self._length):
+            number, index = divmod(number, len(self._alphabet))
+            characters.append(self._alphabet[index])
+
+        return "".join(reversed(characters))
+
+    def decode(self, public_id: str) -> int:
+        number = 0
+        for character in public_id:
+            number = number * len(self._alphabet) + self._alphabet.index(character)
+
+        left, right = divmod(number, self._half)
+        for round_number in reversed(range(self.ROUNDS)):
+            left, right = (right - self._round(round_number, left)) % self._half, left
+
+        return left * self._half + right
+
+    def _round(self, round_number: int, value: int) -> int:
+        digest = hmac.digest(self._key, f"{round_number}:{value}".encode(), hashlib.sha256)
+
+        return int.from_bytes(digest[:8]) % self._half
+
+
+class PublicIdAllocator:
+    """Hands out public ids that can't collide, by encoding numbers from a database sequence with a permutation.
+
+    Numbers are reserved from the sequence `block_size` at a time and kept in the process, so only one in
+    `block_size` meldingen needs a round trip to the database for its public id. Public ids that were handed out
+    at random before this allocator existed are left out of a block when it is reserved.
+    """
+
+    _permutation: PublicIdPermutation
+    _block_size: int
+    _public_ids: deque[str]
+    _lock: asyncio.Lock
+
+    def __init__(self, permutation: PublicIdPermutation, block_size: int) -> None:
+        self._permutation = permutation
+        self._block_size = block_size
+        self._public_ids = deque()
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, repository: MeldingRepository) -> str:
+        async with self._lock:
+            while len(self._public_ids) == 0:
+                await self._reserve(repository)
+
+            return self._public_ids.popleft()
 
-    def __init__(self, alphabet: str | None = None):
-        if alphabet is None:
-            self._alphabet = string.ascii_uppercase + string.digits
-        else:
-            self._alphabet = alphabet
+    async def _reserve(self, repository: MeldingRepository) -> None:
+        numbers = await repository.reserve_public_id_numbers(max(self._block_size, 1))
+        public_ids = [self._permutation.encode(number) for number in numbers]
+        taken = await repository.find_existing_public_ids(public_ids)
 
-    def __call__(self, length: int = 6) -> str:
-        return "".join(secrets.choice(self._alphabet) for _ in range(length))
+        self._public_ids.extend(public_id for public_id in public_ids if public_id not in taken)
@@ -1,4 +1,5 @@
 import json
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Any, Self
 
@@ -8,6 +9,19 @@ from jsonlogic.operators import operator_registry
 from jsonlogic.registry import UnkownOperator as UnknownOperator
 from jsonlogic.resolving import ReferenceParser
 from jsonlogic.typing import OperatorArgument
+from opentelemetry import metrics
+
+meter = metrics.get_meter(__name__)
+
+expression_cache_hits = meter.create_counter(
+    "jsonlogic.expression_cache.hits", description="JSONLogic rules evaluated with an already compiled operator tree"
+)
+expression_cache_misses = meter.create_counter(
+    "jsonlogic.expression_cache.misses", description="JSONLogic rules that had to be parsed and compiled"
+)
+expression_cache_size = meter.create_up_down_counter(
+    "jsonlogic.expression_cache.size", description="Compiled JSONLogic operator trees currently cached"
+)
 
 
 class JSONLogicValidationException(Exception):
@@ -17,20 +31,64 @@ class JSONLogicValidationException(Exception):
         self.input = input
 
 
+class JSONLogicExpressionCache:
+    """Bounded, process-wide cache of compiled operator trees, keyed by the JSONLogic rule as it is stored.
+
+    An operator tree only depends on the rule and is not changed by evaluating it, so it can be shared by all
+    requests. A changed rule is a different key, so nothing has to be invalidated. When the cache is full the
+    least recently used tree is evicted. Rules that fail to compile are not cached.
+    """
+
+    _max_size: int
+    _entries: OrderedDict[str, Operator]
+
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._entries = OrderedDict()
+
+    def get(self, tests: str) -> Operator:
+        if tests in self._entries:
+            self._entries.move_to_end(tests)
+            expression_cache_hits.add(1)
+            return self._entries[tests]
+
+        expression_cache_misses.add(1)
+
+        expression = JSONLogicExpression.from_json(json.loads(tests))
+        root_operator = expression.as_operator_tree(operator_registry)
+        self._put(tests, root_operator)
+
+        return root_operator
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _put(self, tests: str, root_operator: Operator) -> None:
+        if self._max_size <= 0:
+            return
+
+        self._entries[tests] = root_operator
+        expression_cache_size.add(1)
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            expression_cache_size.add(-1)
+
+
 class JSONLogicValidator:
     _reference_parser: ReferenceParser
+    _expression_cache: JSONLogicExpressionCache
 
-    def __init__(self, reference_parser: ReferenceParser) -> None:
+    def __init__(self, reference_parser: ReferenceParser, expression_cache: JSONLogicExpressionCache) -> None:
         self._reference_parser = reference_parser
+        self._expression_cache = expression_cache
         try:
             operator_registry.get("length")
         except UnknownOperator:
             operator_registry.register("length", LengthOperator)
 
     def __call__(self, tests: str, data: dict[str, Any]) -> None:
-        expression = JSONLogicExpression.from_json(json.loads(tests))
-
-        root_operator = expression.as_operator_tree(operator_registry)
+        root_operator = self._expression_cache.get(tests)
 
         result = evaluate(root_operator, data, data_schema=None, settings={"reference_parser": self._reference_parser})
 
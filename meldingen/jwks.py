@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import time
+from typing import Any
+
+from httpx import AsyncClient
+from jwt import PyJWK, PyJWKSet, get_unverified_header
+from opentelemetry import metrics
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+jwks_cache_hits = meter.create_counter(
+    "jwks.cache.hits", description="Signing key lookups answered from the in-memory key store"
+)
+jwks_cache_misses = meter.create_counter(
+    "jwks.cache.misses", description="Signing key lookups for a kid that was not in the in-memory key store"
+)
+jwks_refreshes = meter.create_counter("jwks.refreshes", description="Fetches of the JSON Web Key Set")
+
+
+class SigningKeyNotFoundException(Exception):
+    """Raised when no signing key matches the kid of a token, even after refreshing the key set."""
+
+
+class JWKSKeyStore:
+    """App-scoped, in-memory store of the signing keys published by the identity provider.
+
+    The key set is fetched asynchronously at startup and refreshed in the background once
+    it is older than `ttl` seconds. A token with an unknown kid (e.g. after a key rotation)
+    triggers an immediate refresh, but at most once every `min_refresh_interval` seconds so
+    tokens with made up kids can not be used to hammer the identity provider. While no keys
+    could be fetched at all every token is rejected, so then a refresh is retried after at most
+    `RETRY_INTERVAL_WITHOUT_KEYS` seconds instead.
+    """
+
+    RETRY_INTERVAL_WITHOUT_KEYS = 1.0
+
+    _url: str
+    _ttl: float
+    _min_refresh_interval: float
+    _timeout: float
+    _keys: dict[str, PyJWK]
+    _fetched_at: float | None
+    _last_refresh_attempt: float | None
+    _lock: asyncio.Lock
+    _refresh_task: asyncio.Task[None] | None
+
+    def __init__(self, url: str, ttl: float, min_refresh_interval: float, timeout: float) -> None:
+        self._url = url
+        self._ttl = ttl
+        self._min_refresh_interval = min_refresh_interval
+        self._timeout = timeout
+        self._keys = {}
+        self._fetched_at = None
+        self._last_refresh_attempt = None
+        self._lock = asyncio.Lock()
+        self._refresh_task = None
+
+    async def start(self) -> None:
+        """Prefetch the key set and start the background refresh.
+
+        A failing prefetch is not fatal, the keys will be fetched again on the first lookup.
+        """
+        try:
+            await self.refresh()
+        except Exception:
+            logger.exception("Failed to prefetch the JSON Web Key Set")
+
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self) -> None:
+        if self._refresh_task is None:
+            return
+
+        self._refresh_task.cancel()
+        try:
+            await self._refresh_task
+        except asyncio.CancelledError:
+            pass
+        self._refresh_task = None
+
+    async def get_signing_key_from_jwt(self, token: str) -> PyJWK:
+        header = get_unverified_header(token)
+        return await self.get_signing_key(header.get("kid"))
+
+    async def get_signing_key(self, kid: str | None) -> PyJWK:
+        if kid is None:
+            raise SigningKeyNotFoundException("Token does not specify a kid")
+
+        if self._is_stale():
+            await self._refresh_rate_limited()
+
+        key = self._find_key(kid)
+        if key is not None:
+            jwks_cache_hits.add(1)
+            return key
+
+        jwks_cache_misses.add(1)
+        await self._refresh_rate_limited()
+
+        key = self._find_key(kid)
+        if key is None:
+            raise SigningKeyNotFoundException(f"Unable to find a signing key that matches kid '{kid}'")
+
+        return key
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            await self._refresh()
+
+    async def _refresh(self) -> None:
+        self._last_refresh_attempt = time.monotonic()
+        try:
+            data = await self._fetch()
+            key_set = PyJWKSet.from_dict(data)
+        except Exception:
+            jwks_refreshes.add(1, {"result": "failure"})
+            raise
+
+        self._keys = {key.key_id: key for key in key_set.keys if key.key_id is not None}
+        self._fetched_at = time.monotonic()
+        jwks_refreshes.add(1, {"result": "success"})
+
+    async def _refresh_rate_limited(self) -> None:
+        async with self._lock:
+            # Another coroutine may have refreshed the keys while we were waiting for the lock
+            if not self._may_refresh():
+                return
+
+            try:
+                await self._refresh()
+            except Exception:
+                logger.exception("Failed to refresh the JSON Web Key Set")
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._ttl)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh the JSON Web Key Set")
+
+    async def _fetch(self) -> dict[str, Any]:
+        async with AsyncClient(timeout=self._timeout) as client:
+            response = await client.get(self._url)
+            response.raise_for_status()
+            data: dict[str, Any] = response.json()
+
+            return data
+
+    def _may_refresh(self) -> bool:
+        if self._last_refresh_attempt is None:
+            return True
+
+        interval = self._min_refresh_interval
+        if len(self._keys) == 0:
+            interval = min(interval, self.RETRY_INTERVAL_WITHOUT_KEYS)
+
+        return time.monotonic() - self._last_refresh_attempt >= interval
+
+    def _is_stale(self) -> bool:
+        return self._fetched_at is None or time.monotonic() - self._fetched_at >= self._ttl
+
+    def _find_key(self, kid: str) -> PyJWK | None:
+        return self._keys.get(kid)
@@ -1,4 +1,6 @@
+import logging
 from abc import ABCMeta, abstractmethod
+from collections.abc import Sequence
 
 from amsterdam_mail_service_client.api.default_api import DefaultApi
 from amsterdam_mail_service_client.exceptions import ApiException
@@ -9,6 +11,8 @@ from meldingen_core.mail import BaseMeldingCompleteMailer, BaseMeldingConfirmati
 
 from meldingen.models import Melding
 
+logger = logging.getLogger(__name__)
+
 
 class MailException(Exception): ...
 
@@ -165,3 +169,34 @@ class AmsterdamMailServiceMeldingCompleteMailer(BaseMeldingCompleteMailer[Meldin
 
     async def __call__(self, melding: Melding, mail_text: str) -> None:
         self._background_task_manager.add_task(self._send_completed_mail_task, melding=melding, body_text=mail_text)
+
+
+class AmsterdamMailServiceMeldingBulkCompleteMailer:
+    """Queues the completed mails of many meldingen as a single background task.
+
+    The mails are sent one after the other, a failing mail is logged and does not stop the others.
+    Meldingen without an email address are skipped.
+    """
+
+    _background_task_manager: BackgroundTasks
+    _send_completed_mail_task: SendCompletedMailTask
+
+    def __init__(
+        self, background_task_manager: BackgroundTasks, send_completed_mail_task: SendCompletedMailTask
+    ) -> None:
+        self._background_task_manager = background_task_manager
+        self._send_completed_mail_task = send_completed_mail_task
+
+    async def __call__(self, meldingen: Sequence[Melding], mail_text: str) -> None:
+        recipients = [melding for melding in meldingen if melding.email is not None]
+        if len(recipients) == 0:
+            return
+
+        self._background_task_manager.add_task(self._send_all, recipients, mail_text)
+
+    async def _send_all(self, meldingen: Sequence[Melding], mail_text: str) -> None:
+        for melding in meldingen:
+            try:
+                await self._send_completed_mail_task(melding=melding, body_text=mail_text)
+            except Exception:
+                logger.exception("Failed to send the completed mail of melding %d", melding.id)
@@ -1,6 +1,7 @@
 import logging
 import os
-from typing import Any
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
 
 from asgi_correlation_id import CorrelationIdMiddleware
 from fastapi import FastAPI
@@ -28,12 +29,34 @@ from starlette.status import HTTP_409_CONFLICT
 
 from meldingen.api.v1.api import api_router
 from meldingen.config import settings
+from meldingen.dependencies import (
+    database_engine,
+    database_session_manager,
+    jwks_key_store,
+    primary_form_snapshot,
+)
 from meldingen.middleware import ContentSizeLimitMiddleware
+from meldingen.repositories import StaticFormRepository
+
+
+@asynccontextmanager
+async def lifespan(application: FastAPI) -> AsyncIterator[None]:
+    key_store = jwks_key_store()
+    await key_store.start()
+
+    # The session connects on its first query, so a database that can't be reached doesn't stop the startup either
+    async with database_session_manager(database_engine()).session() as session:
+        await primary_form_snapshot().refresh(StaticFormRepository(session))
+
+    yield
+
+    await key_store.stop()
 
 
 def get_application() -> FastAPI:
     application = FastAPI(
         debug=settings.debug,
+        lifespan=lifespan,
         title=settings.project_name,
         prefix=settings.url_prefix,
         swagger_ui_init_oauth={
@@ -62,7 +85,7 @@ def get_application() -> FastAPI:
         allow_credentials=settings.cors_allow_credentials,
         allow_methods=settings.cors_allow_methods,
         allow_headers=settings.cors_allow_headers,
-        expose_headers=["Content-Range"],
+        expose_headers=["Content-Range", "Next-Cursor", "Prev-Cursor"],
     )
 
     return application
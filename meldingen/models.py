@@ -20,30 +20,48 @@ from mp_fsm.statemachine import StateAware
 from pydantic.alias_generators import to_snake
 from sqlalchemy import (
     JSON,
+    BigInteger,
     Boolean,
     CheckConstraint,
     Column,
+    Computed,
+    Connection,
+    Date,
     DateTime,
     Enum,
     ForeignKey,
     Index,
     Integer,
+    Sequence,
     String,
     Table,
     UniqueConstraint,
+    event,
     func,
     text,
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.ext.orderinglist import OrderingList, ordering_list
-from sqlalchemy.orm import DeclarativeBase, Mapped, MappedAsDataclass, declared_attr, mapped_column, relationship
+from sqlalchemy.orm import (
+    DeclarativeBase,
+    Mapped,
+    MappedAsDataclass,
+    Session,
+    UOWTransaction,
+    declared_attr,
+    mapped_column,
+    relationship,
+)
 
 
 class BaseDBModel(MappedAsDataclass, DeclarativeBase):
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
 
     created_at: Mapped[datetime] = mapped_column(init=False, default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(init=False, default=func.now(), onupdate=func.now())
+    # Changes get the time they were made, not the start of their transaction, otherwise a long transaction would
+    # commit changes that look older than the last change, see MeldingRepository.list_version
+    updated_at: Mapped[datetime] = mapped_column(init=False, default=func.now(), onupdate=func.clock_timestamp())
 
     @declared_attr.directive
     def __tablename__(cls) -> str:
@@ -78,6 +96,7 @@ class Classification(AsyncAttrs, BaseDBModel, BaseClassification):
             unique=True,
             postgresql_where=text("deleted_at IS NULL"),
         ),
+        Index("ix_classification_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
     )
 
     name: Mapped[str] = mapped_column(String)
@@ -100,6 +119,10 @@ asset_melding = Table(
 
 
 class Label(BaseDBModel, BaseLabel):
+    __table_args__ = (
+        Index("ix_label_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
+
     name: Mapped[str] = mapped_column(String, unique=True)
     meldingen: Mapped[list["Melding"]] = relationship(
         "Melding", secondary="label_melding", back_populates="labels", init=False
@@ -115,14 +138,29 @@ label_melding = Table(
 
 
 class Source(BaseDBModel, BaseSource):
+    __table_args__ = (
+        Index("ix_source_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
+
     name: Mapped[str] = mapped_column(String, unique=True)
 
 
 class Melding(AsyncAttrs, BaseDBModel, BaseMelding, StateAware):
-    __table_args__ = (CheckConstraint("urgency in (-1, 0, 1)", name="ck_melding_urgency"),)
+    __table_args__ = (
+        CheckConstraint("urgency in (-1, 0, 1)", name="ck_melding_urgency"),
+        Index("ix_melding_state_id", "state", "id"),
+        Index("ix_melding_state_created_at", "state", "created_at"),
+        Index("ix_melding_token_expires", "token_expires"),
+        Index("ix_melding_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_melding_updated_at", "updated_at"),
+    )
 
     public_id: Mapped[str] = mapped_column(String(), unique=True, init=False)
     text: Mapped[str] = mapped_column(String)
+    # Only used for filtering, deferred so it is never loaded along with the melding
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR, Computed("to_tsvector('dutch', text)", persisted=True), init=False, repr=False, deferred=True
+    )
     state: Mapped[str] = mapped_column(String, default=MeldingStates.NEW)
     urgency: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     classification_id: Mapped[int | None] = mapped_column(ForeignKey("classification.id"), default=None)
@@ -155,6 +193,127 @@ class Melding(AsyncAttrs, BaseDBModel, BaseMelding, StateAware):
     source: Mapped[Source | None] = relationship(default=None, lazy="joined")
 
 
+# Numbers that are turned into public ids by a keyed permutation, up to the number of public ids of six characters
+# out of the 36 letters and digits. Values are never handed out twice, so public ids can't collide.
+melding_public_id_sequence = Sequence(
+    "melding_public_id_seq", start=0, minvalue=0, maxvalue=36**6 - 1, metadata=BaseDBModel.metadata
+)
+
+
+@event.listens_for(Session, "before_flush")
+def _touch_meldingen_with_changed_collections(session: Session, flush_context: UOWTransaction, instances: Any) -> None:
+    """A melding of which only a collection changed, like its labels, isn't updated itself.
+
+    Its updated_at is set by hand, so it still tells when the melding was last changed.
+    """
+    for instance in session.dirty:
+        if (
+            isinstance(instance, Melding)
+            and session.is_modified(instance)
+            and not session.is_modified(instance, include_collections=False)
+        ):
+            instance.updated_at = func.clock_timestamp()
+
+
+# The number of meldingen per day of creation, state, classification and source. The triggers below add the changes
+# of every insert, update and delete of meldingen to it, so statistics can be read without scanning the melding table.
+# The table is a ledger, counts are summed when they are read. Triggers only ever insert rows, so concurrent writes to
+# meldingen never wait for each other on a shared row, and `meldingen compact-statistics` regularly sums the rows to
+# keep the table small.
+melding_statistics = Table(
+    "melding_statistics",
+    BaseDBModel.metadata,
+    Column("id", BigInteger, primary_key=True),
+    Column("day", Date, nullable=False),
+    Column("state", String, nullable=False),
+    Column("classification_id", Integer, ForeignKey("classification.id", ondelete="CASCADE"), nullable=True),
+    Column("source_id", Integer, ForeignKey("source.id", ondelete="CASCADE"), nullable=True),
+    Column("count", Integer, nullable=False),
+    Index("ix_melding_statistics_state_day", "state", "day"),
+)
+
+
+class MeldingStatisticsGroupEnum(enum.StrEnum):
+    DAY = "day"
+    STATE = "state"
+    CLASSIFICATION = "classification"
+    SOURCE = "source"
+
+
+# The triggers fire once per statement and add one row per group that changed, so a bulk transition of many meldingen
+# adds a handful of rows. Updates that don't change the groups of any melding, like most of them, add nothing.
+MELDING_STATISTICS_FUNCTIONS = (
+    """
+    CREATE OR REPLACE FUNCTION melding_statistics_insert() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO melding_statistics (day, state, classification_id, source_id, count)
+        SELECT created_at::date, state, classification_id, source_id, count(*)
+        FROM new_meldingen
+        GROUP BY created_at::date, state, classification_id, source_id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION melding_statistics_update() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO melding_statistics (day, state, classification_id, source_id, count)
+        SELECT day, state, classification_id, source_id, sum(count)
+        FROM (
+            SELECT created_at::date AS day, state, classification_id, source_id, -1 AS count FROM old_meldingen
+            UNION ALL
+            SELECT created_at::date, state, classification_id, source_id, 1 FROM new_meldingen
+        ) AS changes
+        GROUP BY day, state, classification_id, source_id
+        HAVING sum(count) <> 0;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION melding_statistics_delete() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO melding_statistics (day, state, classification_id, source_id, count)
+        SELECT created_at::date, state, classification_id, source_id, -count(*)
+        FROM old_meldingen
+        GROUP BY created_at::date, state, classification_id, source_id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+)
+
+MELDING_STATISTICS_TRIGGERS = (
+    """
+    CREATE TRIGGER melding_statistics_insert AFTER INSERT ON melding
+    REFERENCING NEW TABLE AS new_meldingen
+    FOR EACH STATEMENT EXECUTE FUNCTION melding_statistics_insert()
+    """,
+    """
+    CREATE TRIGGER melding_statistics_update AFTER UPDATE ON melding
+    REFERENCING OLD TABLE AS old_meldingen NEW TABLE AS new_meldingen
+    FOR EACH STATEMENT EXECUTE FUNCTION melding_statistics_update()
+    """,
+    """
+    CREATE TRIGGER melding_statistics_delete AFTER DELETE ON melding
+    REFERENCING OLD TABLE AS old_meldingen
+    FOR EACH STATEMENT EXECUTE FUNCTION melding_statistics_delete()
+    """,
+)
+
+
+@event.listens_for(Melding.__table__, "after_create")
+def _create_melding_statistics_triggers(target: Table, connection: Connection, **kwargs: Any) -> None:
+    for statement in (*MELDING_STATISTICS_FUNCTIONS, *MELDING_STATISTICS_TRIGGERS):
+        connection.execute(text(statement))
+
+
+@event.listens_for(Melding.__table__, "after_drop")
+def _drop_melding_statistics_functions(target: Table, connection: Connection, **kwargs: Any) -> None:
+    for operation in ("insert", "update", "delete"):
+        connection.execute(text(f"DROP FUNCTION IF EXISTS melding_statistics_{operation}()"))
+
+
 user_group = Table(
     "user_group",
     BaseDBModel.metadata,
@@ -649,3 +808,32 @@ class LlmEvalRun(BaseDBModel):
     created_by_user_id: Mapped[int | None] = mapped_column(
         ForeignKey("user.id", ondelete="SET NULL"), nullable=True, default=None
     )
+
+
+class ClassificationResult(BaseDBModel):
+    """A classification chosen by the LLM, reused for texts that are the same after normalization.
+
+    The key is a hash of the normalized text, the model, the reasoning effort and the set of classifications that
+    was offered, so a result is never reused when any of those changed.
+    """
+
+    key: Mapped[str] = mapped_column(String, unique=True)
+    text: Mapped[str] = mapped_column(String)
+    model: Mapped[str] = mapped_column(String)
+    reasoning_effort: Mapped[str | None] = mapped_column(String, nullable=True)
+    classification_set: Mapped[str] = mapped_column(String)
+    classification: Mapped[str] = mapped_column(String)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, index=True)
+
+
+class ClassificationResultHit(BaseDBModel):
+    """A classification that was taken from the cache instead of the LLM, kept to audit the reused results."""
+
+    result_id: Mapped[int | None] = mapped_column(
+        ForeignKey(ClassificationResult.id, ondelete="SET NULL"), index=True, nullable=True
+    )
+    melding_id: Mapped[int | None] = mapped_column(
+        ForeignKey(Melding.id, ondelete="SET NULL"), index=True, nullable=True
+    )
+    text: Mapped[str] = mapped_column(String)
+    classification: Mapped[str] = mapped_column(String)
@@ -0,0 +1,117 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass, replace
+from datetime import date, datetime
+from typing import Any
+
+from meldingen_core import SortingDirection
+
+
+class InvalidCursorException(Exception):
+    message: str
+
+    def __init__(self, message: str):
+        self.message = message
+
+
+@dataclass(frozen=True)
+class KeysetCursor:
+    """A position in a list that is paginated on the sort attribute plus the id as tie-breaker.
+
+    A cursor without an `id` points to the start of the list. A `backwards` cursor selects the
+    page before the position instead of the page after it.
+    """
+
+    sort_attribute_name: str
+    sort_direction: SortingDirection
+    value: Any = None
+    id: int | None = None
+    backwards: bool = False
+
+    def is_first_page(self) -> bool:
+        return self.id is None
+
+    def after(self, item: Any) -> "KeysetCursor":
+        return replace(self, value=getattr(item, self.sort_attribute_name), id=item.id, backwards=False)
+
+    def before(self, item: Any) -> "KeysetCursor":
+        return replace(self, value=getattr(item, self.sort_attribute_name), id=item.id, backwards=True)
+
+    def check_value(self, python_type: type[Any], timezone: bool = False) -> None:
+        """Raises when the value can't be compared with the sort attribute, which has values of `python_type`.
+
+        The value comes from the client, so a tampered cursor or one made for another sort order could hold anything.
+        """
+        if self.value is None or _is_value_of_type(self.value, python_type, timezone):
+            return
+
+        raise InvalidCursorException("Invalid cursor")
+
+    def encode(self) -> str:
+        payload = {
+            "s": self.sort_attribute_name,
+            "d": str(self.sort_direction),
+            "v": _encode_value(self.value),
+            "i": self.id,
+            "b": self.backwards,
+        }
+
+        return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str) -> "KeysetCursor":
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+
+            return cls(
+                sort_attribute_name=str(payload["s"]),
+                sort_direction=SortingDirection(payload["d"]),
+                value=_decode_value(payload["v"]),
+                id=None if payload["i"] is None else int(payload["i"]),
+                backwards=bool(payload["b"]),
+            )
+        except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+            raise InvalidCursorException("Invalid cursor")
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"datetime": value.isoformat()}
+
+    if isinstance(value, date):
+        return {"date": value.isoformat()}
+
+    return value
+
+
+def _is_value_of_type(value: Any, python_type: type[Any], timezone: bool) -> bool:
+    if issubclass(python_type, datetime):
+        return isinstance(value, datetime) and (value.tzinfo is not None) == timezone
+
+    if issubclass(python_type, date):
+        return isinstance(value, date) and not isinstance(value, datetime)
+
+    if issubclass(python_type, bool):
+        return isinstance(value, bool)
+
+    if issubclass(python_type, int):
+        return isinstance(value, int) and not isinstance(value, bool)
+
+    if issubclass(python_type, str):
+        return isinstance(value, str)
+
+    return False
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "datetime" in value:
+            return datetime.fromisoformat(value["datetime"])
+
+        if "date" in value:
+            return date.fromisoformat(value["date"])
+
+        raise ValueError("Unknown cursor value")
+
+    return value
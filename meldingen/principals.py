@@ -0,0 +1,104 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+from opentelemetry import metrics
+
+from meldingen.models import User
+
+meter = metrics.get_meter(__name__)
+
+principal_cache_hits = meter.create_counter(
+    "auth.principal_cache.hits", description="Authenticated requests answered from the verified-principal cache"
+)
+principal_cache_misses = meter.create_counter(
+    "auth.principal_cache.misses", description="Authenticated requests that had to look up the user in the database"
+)
+
+
+@dataclass(frozen=True)
+class GroupSnapshot:
+    id: int
+    name: str
+    created_at: datetime
+    updated_at: datetime
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """A lightweight, session independent copy of a user and its groups."""
+
+    id: int
+    email: str
+    username: str
+    created_at: datetime
+    updated_at: datetime
+    groups: tuple[GroupSnapshot, ...]
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+            groups=tuple(
+                GroupSnapshot(id=group.id, name=group.name, created_at=group.created_at, updated_at=group.updated_at)
+                for group in user.groups
+            ),
+        )
+
+
+class VerifiedPrincipalCache:
+    """Bounded, process-wide cache from the identifier claim of a verified token to a user snapshot.
+
+    Entries expire after `ttl` seconds, or earlier when the token they were created for expires.
+    When the cache is full the least recently used entry is evicted.
+    """
+
+    _max_size: int
+    _ttl: float
+    _entries: OrderedDict[str, tuple[UserSnapshot, float]]
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries = OrderedDict()
+
+    def get(self, identifier: str) -> UserSnapshot | None:
+        entry = self._entries.get(identifier)
+        if entry is None:
+            principal_cache_misses.add(1)
+            return None
+
+        snapshot, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[identifier]
+            principal_cache_misses.add(1)
+            return None
+
+        self._entries.move_to_end(identifier)
+        principal_cache_hits.add(1)
+
+        return snapshot
+
+    def put(self, identifier: str, snapshot: UserSnapshot, token_expires_at: float) -> None:
+        """Store the snapshot, `token_expires_at` is the `exp` claim of the token as a unix timestamp."""
+        ttl = min(self._ttl, token_expires_at - time.time())
+        if ttl <= 0 or self._max_size <= 0:
+            return
+
+        self._entries[identifier] = (snapshot, time.monotonic() + ttl)
+        self._entries.move_to_end(identifier)
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        for identifier in [key for key, (snapshot, _) in self._entries.items() if snapshot.id == user_id]:
+            del self._entries[identifier]
+
+    def clear(self) -> None:
+        self._entries.clear()
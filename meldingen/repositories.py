@@ -1,10 +1,11 @@
+import json
 from abc import ABCMeta, abstractmethod
-from collections.abc import Sequence
-from typing import Any, List, TypeVar
+from collections.abc import AsyncIterator, Sequence
+from datetime import date, datetime, timedelta
+from typing import Any, List, Literal, TypeVar, cast
 
 from meldingen_core import SortingDirection
 from meldingen_core.exceptions import NotFoundException
-from meldingen_core.filters import MeldingListFilters, NameListFilters
 from meldingen_core.repositories import (
     BaseAnswerRepository,
     BaseAssetRepository,
@@ -20,12 +21,45 @@ from meldingen_core.repositories import (
     BaseSourceRepository,
     BaseUserRepository,
 )
-from sqlalchemy import ColumnExpressionArgument, Select, delete, desc, select
+from sqlalchemy import (
+    ColumnElement,
+    ColumnExpressionArgument,
+    CursorResult,
+    Float,
+    RowMapping,
+    ScalarSelect,
+    Select,
+    and_,
+    delete,
+    desc,
+    extract,
+    literal_column,
+    or_,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
 from sqlalchemy.exc import IntegrityError, NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Relationship, selectinload
+from sqlalchemy.orm import (
+    ColumnProperty,
+    InstrumentedAttribute,
+    MapperProperty,
+    Relationship,
+    joinedload,
+    make_transient_to_detached,
+    selectinload,
+    with_polymorphic,
+)
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.interfaces import ORMOption
+from sqlalchemy.orm.strategy_options import _AbstractLoad
+from sqlalchemy.orm.util import AliasedClass
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeEngine
 
+from meldingen.filters import MeldingListFilters, NameListFilters
 from meldingen.models import (
     Answer,
     Asset,
@@ -33,18 +67,53 @@ from meldingen.models import (
     Attachment,
     BaseDBModel,
     Classification,
+    ClassificationResult,
+    ClassificationResultHit,
     Form,
+    FormIoComponent,
     FormIoQuestionComponent,
+    FormIoSelectComponentData,
     Group,
     Label,
     Melding,
+    MeldingStatisticsGroupEnum,
     Note,
     Question,
     Source,
     StaticForm,
     StaticFormTypeEnum,
     User,
+    label_melding,
+    melding_public_id_sequence,
+    melding_statistics,
 )
+from meldingen.pagination import KeysetCursor
+from meldingen.principals import UserSnapshot
+from meldingen.tiles import TILE_BUFFER, TILE_EXTENT, tile_buffer_in_meters
+
+# Pseudo sort attribute that orders search results on relevance
+SEARCH_RANK = "rank"
+
+
+def name_filter_expressions(
+    name: InstrumentedAttribute[str], filters: NameListFilters | None
+) -> List[ColumnExpressionArgument[bool]]:
+    """Matches the name case-insensitively anywhere, or only at the start in prefix mode.
+
+    Both forms are answered by the pg_trgm GIN indexes on the name columns, LIKE wildcards in the query match literally.
+    """
+    if filters is None or filters.name_contains is None:
+        return []
+
+    pattern = _escape_like(filters.name_contains) + "%"
+    if not filters.prefix:
+        pattern = "%" + pattern
+
+    return [name.ilike(pattern, escape="\\")]
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
 
 class AttributeNotFoundException(Exception):
@@ -57,6 +126,23 @@ class AttributeNotFoundException(Exception):
 T = TypeVar("T", bound=BaseDBModel)
 
 
+def _cursor_column_type(sort_property: MapperProperty[Any]) -> TypeEngine[Any] | None:
+    """A cursor holds the sort value as JSON, so only columns with values of these types can be paginated on.
+
+    Returns the type of the column, or None when it can't be paginated on with a cursor.
+    """
+    if not isinstance(sort_property, ColumnProperty):
+        return None
+
+    column_type: TypeEngine[Any] = sort_property.columns[0].type
+    try:
+        python_type = column_type.python_type
+    except NotImplementedError:
+        return None
+
+    return column_type if issubclass(python_type, (int, str, date, datetime)) else None
+
+
 class BaseSQLAlchemyRepository(BaseRepository[T], metaclass=ABCMeta):
     """Base repository for SqlAlchemy based repositories."""
 
@@ -91,6 +177,13 @@ class BaseSQLAlchemyRepository(BaseRepository[T], metaclass=ABCMeta):
     async def flush(self) -> None:
         await self._session.flush()
 
+    async def commit(self) -> None:
+        try:
+            await self._session.commit()
+        except IntegrityError as integrity_error:
+            await self._session.rollback()
+            raise integrity_error
+
     async def list(
         self,
         limit: int | None = None,
@@ -99,7 +192,9 @@ class BaseSQLAlchemyRepository(BaseRepository[T], metaclass=ABCMeta):
         sort_direction: SortingDirection | None = None,
         filters: NameListFilters | None = None,
         apply_visibility_filters: bool = True,
+        cursor: KeysetCursor | None = None,
     ) -> Sequence[T]:
+        """When a cursor is given the list is paginated on the cursor instead of the offset and sorting parameters."""
         _type = self.get_model_type()
         statement = select(_type)
 
@@ -107,20 +202,30 @@ class BaseSQLAlchemyRepository(BaseRepository[T], metaclass=ABCMeta):
             for visibility_filter in self._visibility_filters():
                 statement = statement.where(visibility_filter)
 
-        if filters is not None and filters.name_contains is not None:
-            statement = statement.where(_type.name.ilike(f"%{filters.name_contains}%"))
+        if filters is not None:
+            statement = statement.where(*name_filter_expressions(_type.name, filters))
 
-        statement = self._handle_sorting(_type, statement, sort_attribute_name, sort_direction)
+        if cursor is not None:
+            statement = self._handle_keyset_pagination(_type, statement, cursor)
+        else:
+            if sort_attribute_name == SEARCH_RANK:
+                statement = self._handle_name_similarity_sorting(_type, statement, filters, sort_direction)
+            else:
+                statement = self._handle_sorting(_type, statement, sort_attribute_name, sort_direction)
+
+            if offset:
+                statement = statement.offset(offset)
 
         if limit:
             statement = statement.limit(limit)
 
-        if offset:
-            statement = statement.offset(offset)
-
         results = await self._session.execute(statement)
+        items = results.scalars().unique().all()
 
-        return results.scalars().unique().all()
+        if cursor is not None and cursor.backwards:
+            return items[::-1]
+
+        return items
 
     async def retrieve(self, pk: int) -> T | None:
         _type = self.get_model_type()
@@ -160,6 +265,41 @@ class BaseSQLAlchemyRepository(BaseRepository[T], metaclass=ABCMeta):
 
         return result.scalars().one()
 
+    async def estimate_count(
+        self,
+        filters: List[ColumnExpressionArgument[bool]] | None = None,
+        apply_visibility_filters: bool = True,
+    ) -> int:
+        """Returns the number of rows the query planner expects, without executing the query."""
+        _type = self.get_model_type()
+        statement = select(_type.id)
+
+        if apply_visibility_filters:
+            for visibility_filter in self._visibility_filters():
+                statement = statement.where(visibility_filter)
+
+        if filters is not None:
+            for filter_condition in filters:
+                statement = statement.where(filter_condition)
+
+        connection = await self._session.connection()
+        # Compiled for the driver it is sent to, other drivers escape the values differently
+        compiled = statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+        # Sent as is, text() would take a ":word" in an inlined search query for a bind parameter
+        result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    async def compile_filters(self, filters: List[ColumnExpressionArgument[bool]]) -> str:
+        """Returns the filters as SQL with their values inlined, compiled for the session's connection."""
+        connection = await self._session.connection()
+
+        return str(and_(*filters).compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+
     def _handle_sorting(
         self,
         _type: type[Any],
@@ -168,13 +308,7 @@ class BaseSQLAlchemyRepository(BaseRepository[T], metaclass=ABCMeta):
         sort_direction: SortingDirection | None = None,
     ) -> Select[Any]:
         if sort_attribute_name is not None:
-            sort_attribute = _type.__mapper__.attrs.get(sort_attribute_name)
-
-            if sort_attribute is None:
-                raise AttributeNotFoundException(f"Attribute {sort_attribute_name} not found")
-
-            if isinstance(sort_attribute, Relationship):
-                raise AttributeNotFoundException(f"Cannot sort on relationship {sort_attribute_name}")
+            sort_attribute = self._get_sort_attribute(_type, sort_attribute_name)
 
             if sort_direction is None or sort_direction == SortingDirection.ASC:
                 statement = statement.order_by(sort_attribute)
@@ -183,6 +317,97 @@ class BaseSQLAlchemyRepository(BaseRepository[T], metaclass=ABCMeta):
 
         return statement
 
+    def _handle_keyset_pagination(self, _type: type[Any], statement: Select[Any], cursor: KeysetCursor) -> Select[Any]:
+        """Orders on the sort attribute and id, and only selects the rows after (or before) the cursor.
+
+        Postgres puts NULL values last when sorting ascending and first when sorting descending,
+        the conditions below follow that ordering.
+        """
+        sort_property = self._get_sort_attribute(_type, cursor.sort_attribute_name)
+        column_type = _cursor_column_type(sort_property)
+        if column_type is None:
+            raise AttributeNotFoundException(f"Cannot paginate on {cursor.sort_attribute_name} with a cursor")
+
+        cursor.check_value(column_type.python_type, getattr(column_type, "timezone", False))
+
+        sort_attribute = sort_property.class_attribute
+        ascending = (cursor.sort_direction == SortingDirection.ASC) != cursor.backwards
+
+        if ascending:
+            statement = statement.order_by(sort_attribute, _type.id)
+        else:
+            statement = statement.order_by(desc(sort_attribute), desc(_type.id))
+
+        if cursor.is_first_page():
+            return statement
+
+        if ascending:
+            if cursor.value is None:
+                condition = and_(sort_attribute.is_(None), _type.id > cursor.id)
+            else:
+                condition = or_(
+                    sort_attribute > cursor.value,
+                    and_(sort_attribute == cursor.value, _type.id > cursor.id),
+                    sort_attribute.is_(None),
+                )
+        else:
+            if cursor.value is None:
+                condition = or_(and_(sort_attribute.is_(None), _type.id < cursor.id), sort_attribute.is_not(None))
+            else:
+                condition = or_(
+                    sort_attribute < cursor.value,
+                    and_(sort_attribute == cursor.value, _type.id < cursor.id),
+                )
+
+        return statement.where(condition)
+
+    def _handle_name_similarity_sorting(
+        self,
+        _type: type[Any],
+        statement: Select[Any],
+        filters: NameListFilters | None,
+        sort_direction: SortingDirection | None,
+    ) -> Select[Any]:
+        """Best matches first, word_similarity scores how well the query matches the closest part of the name."""
+        if filters is None or filters.name_contains is None:
+            raise AttributeNotFoundException(f"Sorting on {SEARCH_RANK} requires a search query")
+
+        similarity = func.word_similarity(filters.name_contains, _type.name)
+        if sort_direction == SortingDirection.ASC:
+            return statement.order_by(similarity, _type.id)
+
+        return statement.order_by(desc(similarity), _type.id)
+
+    def _get_sort_attribute(self, _type: type[Any], sort_attribute_name: str) -> MapperProperty[Any]:
+        sort_attribute: MapperProperty[Any] | None = _type.__mapper__.attrs.get(sort_attribute_name)
+
+        if sort_attribute is None:
+            raise AttributeNotFoundException(f"Attribute {sort_attribute_name} not found")
+
+        if isinstance(sort_attribute, Relationship):
+            raise AttributeNotFoundException(f"Cannot sort on relationship {sort_attribute_name}")
+
+        return sort_attribute
+
+
+MeldingLoaderProfile = Literal["backoffice_list", "detail"]
+
+MELDING_LOADER_PROFILES: dict[MeldingLoaderProfile, Sequence[ORMOption]] = {
+    # Eagerly loads exactly the relationships MeldingOutputFactory touches. Collections are loaded with a
+    # separate SELECT ... IN query, so a page costs a constant number of queries and LIMIT still applies to meldingen.
+    "backoffice_list": (
+        joinedload(Melding.classification).joinedload(Classification.asset_type),
+        joinedload(Melding.source),
+        selectinload(Melding.labels),
+    ),
+    # A single melding, so everything can be joined into one query.
+    "detail": (
+        joinedload(Melding.classification).joinedload(Classification.asset_type),
+        joinedload(Melding.source),
+        joinedload(Melding.labels),
+    ),
+}
+
 
 class MeldingRepository(BaseSQLAlchemyRepository[Melding], BaseMeldingRepository[Melding]):
     """Repository for Melding model."""
@@ -190,16 +415,363 @@ class MeldingRepository(BaseSQLAlchemyRepository[Melding], BaseMeldingRepository
     def get_model_type(self) -> type[Melding]:
         return Melding
 
-    async def delete_with_expired_token_and_in_states(self, states: Sequence[str]) -> Sequence[Melding]:
-        _type = self.get_model_type()
+    async def retrieve(self, pk: int, loader_profile: MeldingLoaderProfile | None = None) -> Melding | None:
+        statement = select(Melding).where(Melding.id == pk)
+
+        for visibility_filter in self._visibility_filters():
+            statement = statement.where(visibility_filter)
+
+        if loader_profile is not None:
+            statement = statement.options(*MELDING_LOADER_PROFILES[loader_profile])
+
+        results = await self._session.execute(statement)
+        return results.scalars().unique().one_or_none()
+
+    async def reserve_public_id_numbers(self, count: int) -> Sequence[int]:
+        """Takes `count` numbers from the public id sequence, in a single round trip."""
+        statement = select(melding_public_id_sequence.next_value()).select_from(func.generate_series(1, count))
+
+        result = await self._session.execute(statement)
+        return result.scalars().all()
 
-        statement = delete(_type).where(_type.token_expires < func.now(), _type.state.in_(states)).returning(_type)
+    async def find_existing_public_ids(self, public_ids: Sequence[str]) -> set[str]:
+        statement = select(Melding.public_id).where(Melding.public_id.in_(public_ids))
+
+        result = await self._session.execute(statement)
+        return set(result.scalars())
+
+    async def delete_batch_with_expired_token_and_in_states(
+        self, states: Sequence[str], batch_size: int
+    ) -> Sequence[int]:
+        """Deletes at most `batch_size` meldingen and commits, returning only their ids.
+
+        Rows that are locked by another transaction are skipped instead of waited for,
+        so the purge can run alongside live traffic and simply picks them up in a later batch.
+        """
+        ids = (
+            select(Melding.id)
+            .where(Melding.token_expires < func.now(), Melding.state.in_(states))
+            .order_by(Melding.token_expires)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        statement = delete(Melding).where(Melding.id.in_(ids.scalar_subquery())).returning(Melding.id)
 
         result = await self._session.execute(statement)
         await self._session.commit()
 
+        return result.scalars().all()
+
+    async def find_ids(self, filters: MeldingListFilters, limit: int) -> Sequence[int]:
+        """Returns the ids of at most `limit` meldingen matching the filters, in id order."""
+        statement = (
+            select(Melding.id)
+            .where(*(self.filter_input_to_expression_arguments(filters) or ()))
+            .order_by(Melding.id)
+            .limit(limit)
+        )
+
+        result = await self._session.execute(statement)
+
+        return result.scalars().all()
+
+    async def list_by_ids_for_update(self, ids: Sequence[int]) -> Sequence[Melding]:
+        """Loads the meldingen in one query and locks their rows until the transaction ends.
+
+        The rows are locked in id order, so bulk requests over overlapping ids wait for each other
+        instead of deadlocking. Only the melding rows are locked, not the joined relations.
+        """
+        statement = select(Melding).where(Melding.id.in_(ids)).order_by(Melding.id).with_for_update(of=Melding)
+
+        for visibility_filter in self._visibility_filters():
+            statement = statement.where(visibility_filter)
+
+        result = await self._session.execute(statement)
+
         return result.scalars().unique().all()
 
+    async def stream_export_rows(
+        self, filters: MeldingListFilters | None, batch_size: int
+    ) -> AsyncIterator[RowMapping]:
+        """Streams the flat columns of the export from a server-side cursor, fetching `batch_size` rows at a time.
+
+        No ORM objects are built, the classification, source and labels are selected by name.
+        """
+        labels = (
+            select(func.array_agg(aggregate_order_by(Label.name, Label.name)))
+            .select_from(label_melding.join(Label))
+            .where(label_melding.c.melding_id == Melding.id)
+            .scalar_subquery()
+        )
+        statement = (
+            select(
+                Melding.id,
+                Melding.public_id,
+                Melding.text,
+                Melding.state,
+                Melding.urgency,
+                Classification.name.label("classification"),
+                Source.name.label("source"),
+                labels.label("labels"),
+                Melding.street,
+                Melding.house_number,
+                Melding.house_number_addition,
+                Melding.postal_code,
+                Melding.city,
+                Melding.email,
+                Melding.phone,
+                Melding.created_at,
+                Melding.updated_at,
+                func.ST_AsGeoJSON(Melding.geo_location).label("geo_location"),
+            )
+            .outerjoin(Classification, Melding.classification_id == Classification.id)
+            .outerjoin(Source, Melding.source_id == Source.id)
+            .where(*(self.filter_input_to_expression_arguments(filters) or ()))
+            .order_by(Melding.id)
+            .execution_options(yield_per=batch_size)
+        )
+
+        result = await self._session.stream(statement)
+        async for row in result.mappings():
+            yield row
+
+    async def vector_tile(self, z: int, x: int, y: int, states: Sequence[str]) -> bytes:
+        """Builds a Mapbox Vector Tile of the locations of the meldingen in the tile, with compact properties."""
+        envelope = func.ST_TileEnvelope(z, x, y)
+        features = (
+            select(
+                func.ST_AsMVTGeom(
+                    func.ST_Transform(Melding.geo_location, 3857), envelope, TILE_EXTENT, TILE_BUFFER
+                ).label("geom"),
+                Melding.id,
+                Melding.state,
+                Melding.classification_id,
+                Melding.urgency,
+            )
+            .where(
+                # Transforming the tile instead of the locations lets the GiST index on geo_location answer this
+                Melding.geo_location.op("&&")(
+                    func.ST_Transform(func.ST_Expand(envelope, tile_buffer_in_meters(z)), 4326)
+                ),
+                Melding.state.in_(states),
+            )
+            .subquery("meldingen")
+        )
+        statement = select(func.ST_AsMVT(features.table_valued(), "meldingen", TILE_EXTENT, "geom"))
+
+        tile = await self._session.scalar(statement)
+
+        return b"" if tile is None else bytes(tile)
+
+    async def cluster(
+        self,
+        bbox: tuple[float, float, float, float],
+        cell_size: tuple[float, float],
+        filters: MeldingListFilters | None = None,
+    ) -> Sequence[tuple[float, float, str, int | None, int, float, float]]:
+        """Counts the meldingen within the bounding box per grid cell, state and classification.
+
+        Every row holds the corner of the cell, the state, the classification id, the count and
+        the average longitude and latitude of those meldingen. The rows are ordered by cell.
+        """
+        cell = func.ST_SnapToGrid(Melding.geo_location, 0, 0, *cell_size)
+        locations = (
+            select(
+                func.ST_X(cell).label("cell_x"),
+                func.ST_Y(cell).label("cell_y"),
+                Melding.state,
+                Melding.classification_id,
+                func.ST_X(Melding.geo_location).label("longitude"),
+                func.ST_Y(Melding.geo_location).label("latitude"),
+            )
+            .where(
+                Melding.geo_location.op("&&")(func.ST_MakeEnvelope(*bbox, 4326)),
+                *(self.filter_input_to_expression_arguments(filters) or ()),
+            )
+            .subquery("locations")
+        )
+        group = (locations.c.cell_x, locations.c.cell_y, locations.c.state, locations.c.classification_id)
+        statement = (
+            select(
+                *group,
+                func.count().label("count"),
+                func.avg(locations.c.longitude).label("longitude"),
+                func.avg(locations.c.latitude).label("latitude"),
+            )
+            .group_by(*group)
+            .order_by(locations.c.cell_x, locations.c.cell_y)
+        )
+
+        result = await self._session.execute(statement)
+
+        return result.tuples().all()
+
+    async def statistics(
+        self,
+        group_by: Sequence[MeldingStatisticsGroupEnum],
+        states: Sequence[str],
+        since: date | None = None,
+        until: date | None = None,
+    ) -> Sequence[RowMapping]:
+        """Counts the meldingen in the given states that were created between `since` and `until`, both inclusive.
+
+        The counts are summed from the statistics table, which holds a row per day, state, classification and source,
+        and are grouped by the given columns only. Every row holds those columns and the count.
+        """
+        columns = {
+            MeldingStatisticsGroupEnum.DAY: melding_statistics.c.day,
+            MeldingStatisticsGroupEnum.STATE: melding_statistics.c.state,
+            MeldingStatisticsGroupEnum.CLASSIFICATION: melding_statistics.c.classification_id,
+            MeldingStatisticsGroupEnum.SOURCE: melding_statistics.c.source_id,
+        }
+        group = [columns[name].label(name) for name in dict.fromkeys(group_by)]
+        total = func.sum(melding_statistics.c.count)
+
+        statement = (
+            select(*group, total.label("count"))
+            .where(melding_statistics.c.state.in_(states))
+            .group_by(*group)
+            .having(total > 0)
+            .order_by(*group)
+        )
+        if since is not None:
+            statement = statement.where(melding_statistics.c.day >= since)
+        if until is not None:
+            statement = statement.where(melding_statistics.c.day <= until)
+
+        result = await self._session.execute(statement)
+
+        return result.mappings().all()
+
+    async def rebuild_statistics(self) -> int:
+        """Counts all meldingen again and replaces the statistics table with the result, returning the number of rows.
+
+        The table is kept up to date by triggers on the melding table, this only repairs it when it got out of step.
+        Use `compact_statistics` to keep it small.
+        Writes to meldingen have to wait until the rebuild is committed.
+        """
+        day = func.date(Melding.created_at)
+        counts = select(day, Melding.state, Melding.classification_id, Melding.source_id, func.count()).group_by(
+            day, Melding.state, Melding.classification_id, Melding.source_id
+        )
+
+        await self._session.execute(text("LOCK TABLE melding IN SHARE MODE"))
+        await self._session.execute(delete(melding_statistics))
+        result = await self._session.execute(
+            insert(melding_statistics).from_select(["day", "state", "classification_id", "source_id", "count"], counts)
+        )
+        await self._session.commit()
+
+        return cast(CursorResult[Any], result).rowcount
+
+    async def compact_statistics(self) -> int:
+        """Sums the rows of the statistics table into a single row per group and commits, returning the number of rows.
+
+        Only the rows this transaction can see are replaced, rows added by concurrent writes to meldingen are left for
+        the next run, so writes don't have to wait. Groups that add up to zero are dropped.
+        """
+        deleted = delete(melding_statistics).returning(*melding_statistics.c).cte("deleted")
+        group = [deleted.c.day, deleted.c.state, deleted.c.classification_id, deleted.c.source_id]
+        total = func.sum(deleted.c.count)
+        counts = select(*group, total).group_by(*group).having(total != 0)
+
+        result = await self._session.execute(
+            insert(melding_statistics).from_select(["day", "state", "classification_id", "source_id", "count"], counts)
+        )
+        await self._session.commit()
+
+        return cast(CursorResult[Any], result).rowcount
+
+    async def add_labels(self, melding_ids: Sequence[int], label_ids: Sequence[int]) -> int:
+        """Links every label to every melding in a single statement and returns the number of links added.
+
+        Links that already exist are left alone, as are ids of meldingen or labels that do not exist.
+        """
+        statement = (
+            insert(label_melding)
+            .from_select(
+                ["label_id", "melding_id"],
+                select(Label.id, Melding.id).where(Label.id.in_(label_ids), Melding.id.in_(melding_ids)),
+            )
+            .on_conflict_do_nothing()
+            .returning(label_melding.c.melding_id)
+        )
+
+        changed = (await self._session.execute(statement)).scalars().all()
+        await self._touch(changed)
+
+        return len(changed)
+
+    async def remove_labels(self, melding_ids: Sequence[int], label_ids: Sequence[int]) -> int:
+        """Unlinks the labels from the meldingen in a single statement and returns the number of links removed."""
+        statement = (
+            delete(label_melding)
+            .where(label_melding.c.label_id.in_(label_ids), label_melding.c.melding_id.in_(melding_ids))
+            .returning(label_melding.c.melding_id)
+        )
+
+        changed = (await self._session.execute(statement)).scalars().all()
+        await self._touch(changed)
+
+        return len(changed)
+
+    async def _touch(self, melding_ids: Sequence[int]) -> None:
+        """Sets updated_at of meldingen of which only the labels changed, the melding rows themselves weren't."""
+        if len(melding_ids) == 0:
+            return
+
+        await self._session.execute(
+            update(Melding)
+            .where(Melding.id.in_(set(melding_ids)))
+            .values(updated_at=func.clock_timestamp())
+            .execution_options(synchronize_session=False)
+        )
+
+    def _related_updated_at(self) -> ScalarSelect[datetime | None]:
+        """When the last classification, asset type, label or source was changed, as those are shown along with the
+        meldingen. Asset types are shown as part of the classification."""
+        return select(
+            func.greatest(
+                select(func.max(Classification.updated_at)).scalar_subquery(),
+                select(func.max(AssetType.updated_at)).scalar_subquery(),
+                select(func.max(Label.updated_at)).scalar_subquery(),
+                select(func.max(Source.updated_at)).scalar_subquery(),
+            )
+        ).scalar_subquery()
+
+    async def list_version(self) -> tuple[int, datetime | None, datetime | None]:
+        """The number of meldingen and when the last of them was changed, followed by when the last classification,
+        asset type, label or source was changed. The list can only have changed when one of these did.
+
+        The number is summed from the statistics and the last change is read from the end of an index on updated_at,
+        so this doesn't get slower as the number of meldingen grows. Every process sees the same version. The sum does
+        scan every statistics row written since the last `meldingen compact-statistics`, so that command has to be
+        scheduled to keep this cheap.
+        """
+        statement = select(
+            select(func.coalesce(func.sum(melding_statistics.c.count), 0)).scalar_subquery(),
+            func.max(Melding.updated_at),
+            self._related_updated_at(),
+        )
+
+        result = await self._session.execute(statement)
+
+        return cast(tuple[int, datetime | None, datetime | None], result.tuples().one())
+
+    async def retrieve_version(self, pk: int) -> tuple[datetime, datetime | None] | None:
+        """When the melding was last changed, followed by when the last classification, asset type, label or
+        source was changed.
+
+        Returns None when the melding does not exist.
+        """
+        statement = select(Melding.updated_at, self._related_updated_at()).where(
+            Melding.id == pk, *self._visibility_filters()
+        )
+
+        result = await self._session.execute(statement)
+
+        return result.tuples().one_or_none()
+
     async def list_meldingen(
         self,
         *,
@@ -208,27 +780,100 @@ class MeldingRepository(BaseSQLAlchemyRepository[Melding], BaseMeldingRepository
         sort_attribute_name: str | None = None,
         sort_direction: SortingDirection | None = None,
         filters: MeldingListFilters | None = None,
+        loader_profile: MeldingLoaderProfile | None = None,
+        cursor: KeysetCursor | None = None,
     ) -> Sequence[Melding]:
+        statement = self._list_meldingen_statement(
+            limit, offset, sort_attribute_name, sort_direction, filters, loader_profile, cursor
+        )
+
+        results = await self._session.execute(statement)
+        meldingen = results.scalars().unique().all()
+
+        if cursor is not None and cursor.backwards:
+            return meldingen[::-1]
+
+        return meldingen
+
+    async def list_meldingen_with_total(
+        self,
+        *,
+        limit: int | None = None,
+        offset: int | None = None,
+        sort_attribute_name: str | None = None,
+        sort_direction: SortingDirection | None = None,
+        filters: MeldingListFilters | None = None,
+        loader_profile: MeldingLoaderProfile | None = None,
+    ) -> tuple[Sequence[Melding], int | None]:
+        """Like `list_meldingen`, but also counts all matching meldingen in the same query using a window function.
+
+        The total is None when the page is empty, as there is no row to read it from.
+        """
+        statement = self._list_meldingen_statement(
+            limit, offset, sort_attribute_name, sort_direction, filters, loader_profile
+        ).add_columns(func.count().over().label("total"))
+
+        results = (await self._session.execute(statement)).unique().all()
+        if len(results) == 0:
+            return [], None
+
+        return [melding for melding, _ in results], results[0].total
+
+    def _list_meldingen_statement(
+        self,
+        limit: int | None = None,
+        offset: int | None = None,
+        sort_attribute_name: str | None = None,
+        sort_direction: SortingDirection | None = None,
+        filters: MeldingListFilters | None = None,
+        loader_profile: MeldingLoaderProfile | None = None,
+        cursor: KeysetCursor | None = None,
+    ) -> Select[Any]:
         _type = self.get_model_type()
         statement = select(_type)
 
+        if loader_profile is not None:
+            statement = statement.options(*MELDING_LOADER_PROFILES[loader_profile])
+
         expression_arguments = self.filter_input_to_expression_arguments(filters)
 
         if expression_arguments is not None:
             for expression in expression_arguments:
                 statement = statement.filter(expression)
 
-        statement = self._handle_sorting(_type, statement, sort_attribute_name, sort_direction)
+        if cursor is not None:
+            statement = self._handle_keyset_pagination(_type, statement, cursor)
+        else:
+            if sort_attribute_name == SEARCH_RANK:
+                statement = self._handle_search_rank_sorting(statement, filters, sort_direction)
+            else:
+                statement = self._handle_sorting(_type, statement, sort_attribute_name, sort_direction)
+
+            if offset:
+                statement = statement.offset(offset)
 
         if limit:
             statement = statement.limit(limit)
 
-        if offset:
-            statement = statement.offset(offset)
+        return statement
 
-        results = await self._session.execute(statement)
+    def _handle_search_rank_sorting(
+        self, statement: Select[Any], filters: MeldingListFilters | None, sort_direction: SortingDirection | None
+    ) -> Select[Any]:
+        q = None if filters is None else filters.q
+        if q is None:
+            raise AttributeNotFoundException(f"Sorting on {SEARCH_RANK} requires a search query")
 
-        return results.scalars().unique().all()
+        rank = func.ts_rank_cd(Melding.search_vector, self._search_query(q))
+        if sort_direction == SortingDirection.ASC:
+            return statement.order_by(rank, Melding.id)
+
+        return statement.order_by(desc(rank), Melding.id)
+
+    @staticmethod
+    def _search_query(q: str) -> ColumnElement[Any]:
+        """Parses the query like a web search engine would: quoted phrases, "or" and a leading "-" to exclude words."""
+        return func.websearch_to_tsquery(literal_column("'dutch'::regconfig"), q)
 
     async def delete_assets_from_melding(self, melding: Melding) -> None:
         await melding.awaitable_attrs.assets
@@ -248,11 +893,20 @@ class MeldingRepository(BaseSQLAlchemyRepository[Melding], BaseMeldingRepository
         states = None if filters is None else filters.states
 
         if area is not None:
-            expressions.append(func.ST_Contains(func.ST_GeomFromGeoJSON(area), Melding.geo_location))
+            # Both conditions share the same geometry, ST_GeomFromGeoJSON is immutable so Postgres parses the
+            # GeoJSON once while planning. The && bounding box test is answered by the GiST index on geo_location,
+            # ST_Contains then only has to check the candidates.
+            area_geometry = func.ST_GeomFromGeoJSON(area)
+            expressions.append(Melding.geo_location.op("&&")(area_geometry))
+            expressions.append(func.ST_Contains(area_geometry, Melding.geo_location))
 
         if states is not None:
             expressions.append(Melding.state.in_(states))
 
+        if filters.q is not None:
+            # Answered by the GIN index on the generated search_vector column
+            expressions.append(Melding.search_vector.bool_op("@@")(self._search_query(filters.q)))
+
         return expressions
 
 
@@ -273,13 +927,46 @@ class UserRepository(BaseSQLAlchemyRepository[User], BaseUserRepository):
         results = await self._session.execute(statement)
 
         user = results.scalars().unique().one_or_none()
+        if user is not None:
+            return user
+
+        insert_statement = (
+            insert(User)
+            .values(email=email, username=email)
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User)
+        )
+        user = (await self._session.scalars(insert_statement)).one_or_none()
+        await self._session.commit()
 
         if user is None:
-            user = User(email=email, username=email, groups=[])
-            await self.save(user)
+            # The user was created by a concurrent request
+            return await self.find_by_email(email)
+
+        # A newly created user does not belong to any group yet
+        set_committed_value(user, "groups", [])
 
         return user
 
+    async def merge_snapshot(self, snapshot: UserSnapshot) -> User:
+        """Attach a cached snapshot to the session as a persistent user, without querying the database."""
+        groups = []
+        for group_snapshot in snapshot.groups:
+            group = Group(name=group_snapshot.name)
+            group.id = group_snapshot.id
+            group.created_at = group_snapshot.created_at
+            group.updated_at = group_snapshot.updated_at
+            make_transient_to_detached(group)
+            groups.append(group)
+
+        user = User(email=snapshot.email, username=snapshot.username, groups=groups)
+        user.id = snapshot.id
+        user.created_at = snapshot.created_at
+        user.updated_at = snapshot.updated_at
+        make_transient_to_detached(user)
+
+        return await self._session.merge(user, load=False)
+
 
 class GroupRepository(BaseSQLAlchemyRepository[Group]):
     def get_model_type(self) -> type[Group]:
@@ -327,14 +1014,156 @@ class ClassificationRepository(BaseSQLAlchemyRepository[Classification], BaseCla
         await self.save(classification)
 
 
+class ClassificationResultRepository(BaseSQLAlchemyRepository[ClassificationResult]):
+    def get_model_type(self) -> type[ClassificationResult]:
+        return ClassificationResult
+
+    async def find_unexpired(self, key: str) -> tuple[int, str, float] | None:
+        """The id and classification of the unexpired result with the key, followed by the seconds until it expires."""
+        statement = select(ClassificationResult.id, ClassificationResult.classification, self._expires_in()).where(
+            ClassificationResult.key == key, ClassificationResult.expires_at > func.now()
+        )
+
+        result = await self._session.execute(statement)
+        return result.tuples().one_or_none()
+
+    async def store(
+        self,
+        key: str,
+        text: str,
+        model: str,
+        reasoning_effort: str | None,
+        classification_set: str,
+        classification: str,
+        ttl: float,
+    ) -> tuple[int, str, float] | None:
+        """Inserts the result, or replaces an expired result with the same key, in one statement.
+
+        An unexpired result with the same key, stored by another request in the meantime, is kept. Returns the
+        result that is stored under the key like `find_unexpired` does.
+        """
+        values = {
+            "text": text,
+            "model": model,
+            "reasoning_effort": reasoning_effort,
+            "classification_set": classification_set,
+            "classification": classification,
+            "expires_at": func.now() + timedelta(seconds=ttl),
+        }
+        statement = (
+            insert(ClassificationResult)
+            .values(key=key, **values)
+            .on_conflict_do_update(
+                index_elements=[ClassificationResult.key],
+                set_={**values, "updated_at": func.now()},
+                where=ClassificationResult.expires_at <= func.now(),
+            )
+            .returning(ClassificationResult.id, ClassificationResult.classification, self._expires_in())
+        )
+
+        result = await self._session.execute(statement)
+        stored = result.tuples().one_or_none()
+        if stored is None:
+            return await self.find_unexpired(key)
+
+        return stored
+
+    async def record_hits(self, melding_id: int, hits: Sequence[tuple[int, str, str]]) -> None:
+        """Records that the cached results, given as their id, text and classification, classified the melding.
+
+        The hits are inserted in a savepoint and committed, so a failing insert leaves the rest of the transaction
+        intact. A result that was deleted after it was used is recorded without a reference to it.
+        """
+        async with self._session.begin_nested():
+            for result_id, hit_text, classification in hits:
+                await self._session.execute(
+                    insert(ClassificationResultHit).values(
+                        result_id=select(ClassificationResult.id)
+                        .where(ClassificationResult.id == result_id)
+                        .scalar_subquery(),
+                        melding_id=melding_id,
+                        text=hit_text,
+                        classification=classification,
+                    )
+                )
+
+        await self._session.commit()
+
+    @staticmethod
+    def _expires_in() -> ColumnElement[float]:
+        return extract("epoch", ClassificationResult.expires_at - func.now()).cast(Float)
+
+    async def delete_batch_expired(self, batch_size: int) -> int:
+        """Deletes at most `batch_size` expired results and commits, returning the number of deleted results.
+
+        The hits of a deleted result are kept for the audit, without a reference to the result.
+        """
+        ids = (
+            select(ClassificationResult.id)
+            .where(ClassificationResult.expires_at < func.now())
+            .order_by(ClassificationResult.expires_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        statement = (
+            delete(ClassificationResult)
+            .where(ClassificationResult.id.in_(ids.scalar_subquery()))
+            .returning(ClassificationResult.id)
+        )
+
+        result = await self._session.execute(statement)
+        await self._session.commit()
+
+        return len(result.scalars().all())
+
+
+def _component_loader_options(component: AliasedClass[FormIoComponent]) -> Sequence[_AbstractLoad]:
+    return (
+        selectinload(component.FormIoQuestionComponent.question),
+        selectinload(component.BaseFormIoValuesComponent.values),
+        selectinload(component.FormIoSelectComponent.data).selectinload(FormIoSelectComponentData.values),
+    )
+
+
+def component_tree_loader_option(components: InstrumentedAttribute[Any]) -> _AbstractLoad:
+    """Eagerly loads the component tree of a form or static form, so it can be turned into output without any
+    further queries.
+
+    The components are loaded with the columns of all their subclasses, every level of the tree and every
+    relationship is loaded with a single SELECT ... IN query. Panels can't contain panels, so the tree is at
+    most two levels deep and a whole form costs a fixed number of queries, no matter how many components it has.
+    """
+    component = with_polymorphic(FormIoComponent, "*")
+    child = with_polymorphic(FormIoComponent, "*")
+
+    return selectinload(components.of_type(component)).options(
+        *_component_loader_options(component),
+        selectinload(component.FormIoPanelComponent.components.of_type(child)).options(
+            *_component_loader_options(child)
+        ),
+    )
+
+
 class FormRepository(BaseSQLAlchemyRepository[Form], BaseFormRepository):
     def get_model_type(self) -> type[Form]:
         return Form
 
-    async def find_by_classification_id(self, classification_id: int) -> Form:
+    async def retrieve(self, pk: int, with_components: bool = False) -> Form | None:
+        statement = select(Form).where(Form.id == pk)
+
+        if with_components:
+            statement = statement.options(component_tree_loader_option(Form.components))
+
+        results = await self._session.execute(statement)
+        return results.scalars().unique().one_or_none()
+
+    async def find_by_classification_id(self, classification_id: int, with_components: bool = False) -> Form:
         _type = self.get_model_type()
         statement = select(_type).where(_type.classification_id == classification_id)
 
+        if with_components:
+            statement = statement.options(component_tree_loader_option(_type.components))
+
         result = await self._session.execute(statement)
         try:
             return result.scalars().one()
@@ -346,9 +1175,21 @@ class StaticFormRepository(BaseSQLAlchemyRepository[StaticForm]):
     def get_model_type(self) -> type[StaticForm]:
         return StaticForm
 
-    async def find_by_type(self, _type: StaticFormTypeEnum) -> StaticForm:
+    async def retrieve(self, pk: int, with_components: bool = False) -> StaticForm | None:
+        statement = select(StaticForm).where(StaticForm.id == pk)
+
+        if with_components:
+            statement = statement.options(component_tree_loader_option(StaticForm.components))
+
+        results = await self._session.execute(statement)
+        return results.scalars().unique().one_or_none()
+
+    async def find_by_type(self, _type: StaticFormTypeEnum, with_components: bool = False) -> StaticForm:
         statement = select(StaticForm).where(StaticForm.type == _type)
 
+        if with_components:
+            statement = statement.options(component_tree_loader_option(StaticForm.components))
+
         result = await self._session.execute(statement)
         try:
             return result.scalars().one()
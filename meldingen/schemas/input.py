@@ -1,5 +1,8 @@
 from typing import Annotated, Any, Literal, Union
 
+from geojson_pydantic import Feature
+from geojson_pydantic.geometries import Geometry
+from meldingen_core.statemachine import MeldingBackofficeStates, MeldingTransitions
 from pydantic import (
     AfterValidator,
     AliasGenerator,
@@ -10,6 +13,7 @@ from pydantic import (
     Field,
     StringConstraints,
     Tag,
+    model_validator,
 )
 from pydantic.alias_generators import to_camel
 from pydantic_jsonlogic import JSONLogic
@@ -280,6 +284,61 @@ class CompleteMeldingInput(BaseModel):
     mail_body: str
 
 
+class MeldingBulkFilterInput(BaseModel):
+    in_area: Feature[Geometry, dict[str, Any] | BaseModel] | None = Field(
+        default=None, description="Geometry which the melding location should reside in."
+    )
+    state: list[MeldingBackofficeStates] | None = Field(
+        default=None,
+        description="States that the melding should have. If left empty, meldingen will be filtered by backoffice states.",
+    )
+    q: str | None = Field(default=None, description="Full-text search on the text of the melding.")
+
+
+class MeldingBulkInput(BaseModel):
+    """Selects the meldingen of a bulk operation, either by id or by the filters of the melding list."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    ids: list[Annotated[int, Field(ge=1)]] | None = Field(default=None, min_length=1)
+    filter: MeldingBulkFilterInput | None = None
+
+    @model_validator(mode="after")
+    def validate_ids_or_filter(self) -> "MeldingBulkInput":
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Either ids or filter must be given")
+
+        return self
+
+
+class MeldingBulkTransitionInput(MeldingBulkInput):
+    transition: Literal[
+        MeldingTransitions.REQUEST_PROCESSING,
+        MeldingTransitions.PROCESS,
+        MeldingTransitions.PLAN,
+        MeldingTransitions.COMPLETE,
+        MeldingTransitions.CANCEL,
+        MeldingTransitions.REQUEST_REOPEN,
+        MeldingTransitions.REOPEN,
+    ]
+    mail_body: str | None = Field(default=None, description="Mailed to the melders when the transition is complete.")
+
+
+class MeldingBulkLabelInput(MeldingBulkInput):
+    add: list[Annotated[int, Field(ge=1)]] = Field(default_factory=list, description="Ids of the labels to add.")
+    remove: list[Annotated[int, Field(ge=1)]] = Field(default_factory=list, description="Ids of the labels to remove.")
+
+    @model_validator(mode="after")
+    def validate_add_or_remove(self) -> "MeldingBulkLabelInput":
+        if len(self.add) == 0 and len(self.remove) == 0:
+            raise ValueError("At least one label must be added or removed")
+
+        if not set(self.add).isdisjoint(self.remove):
+            raise ValueError("A label can not be added and removed at the same time")
+
+        return self
+
+
 class AssetTypeInput(BaseModel):
     name: str
     class_name: str
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Annotated, Any, Literal, Union, final
 
 from pydantic import AliasGenerator, BaseModel, ConfigDict, EmailStr, Field, field_serializer
@@ -336,3 +336,33 @@ class AssetOutput(BaseOutputModel):
 
 class StatesOutput(BaseModel):
     states: list[str]
+
+
+class MeldingBulkTransitionResultOutput(BaseModel):
+    id: int
+    status: Literal["transitioned", "not_found", "transition_not_allowed"]
+    state: str | None
+
+
+class MeldingBulkLabelOutput(BaseModel):
+    meldingen: int
+    added: int
+    removed: int
+
+
+class MeldingClusterOutput(BaseModel):
+    longitude: float
+    latitude: float
+    count: int
+    states: dict[str, int]
+    classifications: dict[int, int]
+
+
+class MeldingStatisticsOutput(BaseModel):
+    """The number of meldingen per combination of the grouped columns, the columns that are not grouped by are null."""
+
+    day: date | None = None
+    state: str | None = None
+    classification: int | None = None
+    source: int | None = None
+    count: int
@@ -0,0 +1,112 @@
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+
+from meldingen_core.statemachine import get_all_backoffice_states
+from opentelemetry import metrics
+from sqlalchemy import inspect
+
+from meldingen.database import invalidate_after_commit
+from meldingen.models import Melding
+
+meter = metrics.get_meter(__name__)
+
+tile_cache_hits = meter.create_counter("melding.tile_cache.hits", description="Vector tiles served from the cache")
+tile_cache_misses = meter.create_counter(
+    "melding.tile_cache.misses", description="Vector tiles that had to be built by the database"
+)
+
+# Vector tiles use a grid of 4096 by 4096 units, geometries are kept up to 256 units outside the tile,
+# so markers on the edge of a tile are not cut off
+TILE_EXTENT = 4096
+TILE_BUFFER = 256
+# Half the width of the world in Web Mercator (EPSG:3857), in meters
+WEB_MERCATOR_HALF_WIDTH = 20037508.342789244
+
+TileKey = tuple[tuple[str, ...], int, int, int]
+
+# Tiles only ever show meldingen in these states, see backoffice_states_from_param
+_TILE_STATES = frozenset(get_all_backoffice_states())
+
+
+# Clusters are a grid of 4 by 4 cells per tile, 64 pixels square on a map with 256 pixel tiles
+CLUSTER_CELLS_PER_TILE = 4
+
+
+def tile_buffer_in_meters(z: int) -> float:
+    return 2 * WEB_MERCATOR_HALF_WIDTH / 2.0**z * TILE_BUFFER / TILE_EXTENT
+
+
+def cluster_cell_size(zoom: int, latitude: float) -> tuple[float, float]:
+    """The width and height in degrees of a cluster cell that is square on the map around the given latitude.
+
+    The grid is laid out in longitude and latitude, so the locations don't have to be transformed to Web Mercator.
+    """
+    width = 360 / 2**zoom / CLUSTER_CELLS_PER_TILE
+
+    return width, width * math.cos(math.radians(latitude))
+
+
+class VectorTileCache:
+    """Bounded, process-wide cache of vector tiles, keyed by the state filter and the tile coordinates.
+
+    Every commit through the ORM that inserts, updates or deletes a melding that is, or was, in a state shown on the
+    tiles empties the cache. Drafts are never shown, so melders filling in their melding keep the cache. Writes by
+    other processes can't be seen, so entries also expire after `ttl` seconds. When the cache is full the least
+    recently used tile is evicted.
+    """
+
+    _max_size: int
+    _ttl: float
+    _entries: OrderedDict[TileKey, tuple[bytes, float]]
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key(states: Sequence[str], z: int, x: int, y: int) -> TileKey:
+        return tuple(sorted(set(states))), z, x, y
+
+    def get(self, key: TileKey) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            tile_cache_misses.add(1)
+            return None
+
+        tile, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            tile_cache_misses.add(1)
+            return None
+
+        self._entries.move_to_end(key)
+        tile_cache_hits.add(1)
+
+        return tile
+
+    def put(self, key: TileKey, tile: bytes) -> None:
+        if self._max_size <= 0 or self._ttl <= 0:
+            return
+
+        self._entries[key] = (tile, time.monotonic() + self._ttl)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def invalidate_on_melding_writes(self) -> None:
+        """Empties the cache after every commit that changed a melding shown on the tiles."""
+        invalidate_after_commit((Melding,), self.clear, _is_shown_on_tiles)
+
+
+def _is_shown_on_tiles(melding: Melding) -> bool:
+    """Whether the melding is, or was before the flush, in a state shown on the tiles."""
+    states = {melding.state, *inspect(melding).attrs.state.history.deleted}
+
+    return not _TILE_STATES.isdisjoint(states)
@@ -1,4 +1,6 @@
+import asyncio
 import logging
+import time
 from typing import Any, Callable
 
 import magic
@@ -15,8 +17,9 @@ from meldingen_core.validators import (
 from pydantic_media_type import MediaType
 from starlette.status import HTTP_422_UNPROCESSABLE_CONTENT
 
+from meldingen.database import invalidate_after_commit
 from meldingen.jsonlogic import JSONLogicValidationException, JSONLogicValidator
-from meldingen.models import Melding, StaticFormTypeEnum
+from meldingen.models import FormIoComponent, Melding, StaticForm, StaticFormTypeEnum
 from meldingen.repositories import StaticFormRepository
 
 logger = logging.getLogger(__name__)
@@ -111,26 +114,87 @@ class BackofficeAttachmentLimitValidator(BaseAttachmentLimitValidator[Melding]):
             raise AttachmentLimitReachedException(f"Too many attachments. Maximum allowed is {self._max_attachments}.")
 
 
+class PrimaryFormSnapshot:
+    """Process-wide copy of the validation rule of the primary form, so creating a melding doesn't have to query it.
+
+    The snapshot is loaded at startup and reloaded by the action that updates the primary form. It is also emptied
+    after every commit that changed a static form or a component, and then loaded again on the next use. Changes
+    made by other processes can't be seen, so a snapshot older than `max_age` seconds is loaded again as well.
+    """
+
+    _max_age: float
+    _jsonlogic: str | None
+    _loaded_at: float | None
+    _lock: asyncio.Lock
+
+    def __init__(self, max_age: float) -> None:
+        self._max_age = max_age
+        self._jsonlogic = None
+        self._loaded_at = None
+        self._lock = asyncio.Lock()
+
+    async def jsonlogic(self, repository: StaticFormRepository) -> str | None:
+        """The JSONLogic rule of the primary form, or None when it has none or when the primary form is missing."""
+        if self._is_stale():
+            async with self._lock:
+                if self._is_stale():
+                    await self.load(repository)
+
+        return self._jsonlogic
+
+    async def load(self, repository: StaticFormRepository) -> None:
+        try:
+            primary_form = await repository.find_by_type(StaticFormTypeEnum.primary, with_components=True)
+        except NotFoundException:
+            logger.warning("The primary form seems to be missing!")
+            jsonlogic = None
+        else:
+            components = await primary_form.awaitable_attrs.components
+            assert len(components) == 1
+            jsonlogic = await components[0].awaitable_attrs.jsonlogic
+
+        self._jsonlogic = jsonlogic
+        self._loaded_at = time.monotonic()
+
+    async def refresh(self, repository: StaticFormRepository) -> None:
+        """Loads the snapshot ahead of its use. A failing load is not fatal, it is tried again on the next use."""
+        try:
+            await self.load(repository)
+        except Exception:
+            logger.exception("Failed to load the primary form")
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+    def invalidate_on_static_form_writes(self) -> None:
+        """Empties the snapshot after every commit that changed a static form or a component."""
+        invalidate_after_commit((StaticForm, FormIoComponent), self.invalidate)
+
+    def _is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self._max_age
+
+
 class MeldingPrimaryFormValidator:
     _static_form_repository: StaticFormRepository
+    _primary_form_snapshot: PrimaryFormSnapshot
     _validate_using_jsonlogic: JSONLogicValidator
 
-    def __init__(self, static_form_repository: StaticFormRepository, jsonlogic_validator: JSONLogicValidator) -> None:
+    def __init__(
+        self,
+        static_form_repository: StaticFormRepository,
+        primary_form_snapshot: PrimaryFormSnapshot,
+        jsonlogic_validator: JSONLogicValidator,
+    ) -> None:
         self._static_form_repository = static_form_repository
+        self._primary_form_snapshot = primary_form_snapshot
         self._validate_using_jsonlogic = jsonlogic_validator
 
     async def __call__(self, melding_dict: dict[str, Any]) -> None:
         try:
-            primary_form = await self._static_form_repository.find_by_type(StaticFormTypeEnum.primary)
-            components = await primary_form.awaitable_attrs.components
-            assert len(components) == 1
-            component = components[0]
-            jsonlogic = await component.awaitable_attrs.jsonlogic
+            jsonlogic = await self._primary_form_snapshot.jsonlogic(self._static_form_repository)
 
             if jsonlogic is not None:
                 self._validate_using_jsonlogic(jsonlogic, melding_dict)
-        except NotFoundException:
-            logger.warning("The primary form seems to be missing!")
         except JSONLogicValidationException as e:
             raise HTTPException(
                 status_code=HTTP_422_UNPROCESSABLE_CONTENT,
@@ -0,0 +1,29 @@
+"""melding state indexes
+
+Revision ID: 3e8b1d5f7a20
+Revises: 75ab04c1868a
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+
+from typing import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3e8b1d5f7a20"
+down_revision: str | None = "75ab04c1868a"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # The backoffice list always filters on state and sorts on id by default, or on created_at.
+    # geo_location already has a GiST index (idx_melding_geo_location).
+    op.create_index("ix_melding_state_id", "melding", ["state", "id"])
+    op.create_index("ix_melding_state_created_at", "melding", ["state", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_melding_state_created_at", table_name="melding")
+    op.drop_index("ix_melding_state_id", table_name="melding")
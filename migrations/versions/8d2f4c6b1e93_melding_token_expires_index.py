@@ -0,0 +1,26 @@
+"""melding token expires index
+
+Revision ID: 8d2f4c6b1e93
+Revises: 3e8b1d5f7a20
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+
+from typing import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8d2f4c6b1e93"
+down_revision: str | None = "3e8b1d5f7a20"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Used by the expired draft purge (`meldingen delete-expired-drafts`)
+    op.create_index("ix_melding_token_expires", "melding", ["token_expires"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_melding_token_expires", table_name="melding")
@@ -0,0 +1,37 @@
+"""melding search vector
+
+Revision ID: b71e5a9c3d42
+Revises: 8d2f4c6b1e93
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "b71e5a9c3d42"
+down_revision: str | None = "8d2f4c6b1e93"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "melding",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('dutch', text)", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index("ix_melding_search_vector", "melding", ["search_vector"], unique=False, postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_melding_search_vector", table_name="melding", postgresql_using="gin")
+    op.drop_column("melding", "search_vector")
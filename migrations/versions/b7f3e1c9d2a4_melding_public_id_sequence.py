@@ -0,0 +1,25 @@
+"""melding public id sequence
+
+Revision ID: b7f3e1c9d2a4
+Revises: e2d8b4a6c913
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+
+from typing import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7f3e1c9d2a4"
+down_revision: str | None = "e2d8b4a6c913"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE melding_public_id_seq MINVALUE 0 MAXVALUE 2176782335 START WITH 0")
+
+
+def downgrade() -> None:
+    op.execute("DROP SEQUENCE melding_public_id_seq")
@@ -0,0 +1,65 @@
+"""classification result cache
+
+Revision ID: c4a8e2f61b07
+Revises: b7f3e1c9d2a4
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4a8e2f61b07"
+down_revision: str | None = "b7f3e1c9d2a4"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "classification_result",
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("text", sa.String(), nullable=False),
+        sa.Column("model", sa.String(), nullable=False),
+        sa.Column("reasoning_effort", sa.String(), nullable=True),
+        sa.Column("classification_set", sa.String(), nullable=False),
+        sa.Column("classification", sa.String(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("key"),
+    )
+    # Used by the purge of expired results (`classifications delete-expired-results`)
+    op.create_index(op.f("ix_classification_result_expires_at"), "classification_result", ["expires_at"], unique=False)
+    op.create_table(
+        "classification_result_hit",
+        sa.Column("result_id", sa.Integer(), nullable=True),
+        sa.Column("melding_id", sa.Integer(), nullable=True),
+        sa.Column("text", sa.String(), nullable=False),
+        sa.Column("classification", sa.String(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["melding_id"], ["melding.id"], ondelete="SET NULL"),
+        sa.ForeignKeyConstraint(["result_id"], ["classification_result.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_classification_result_hit_melding_id"), "classification_result_hit", ["melding_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_classification_result_hit_result_id"), "classification_result_hit", ["result_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_classification_result_hit_result_id"), table_name="classification_result_hit")
+    op.drop_index(op.f("ix_classification_result_hit_melding_id"), table_name="classification_result_hit")
+    op.drop_table("classification_result_hit")
+    op.drop_index(op.f("ix_classification_result_expires_at"), table_name="classification_result")
+    op.drop_table("classification_result")
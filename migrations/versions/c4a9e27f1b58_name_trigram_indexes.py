@@ -0,0 +1,36 @@
+"""name trigram indexes
+
+Revision ID: c4a9e27f1b58
+Revises: b71e5a9c3d42
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+
+from typing import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4a9e27f1b58"
+down_revision: str | None = "b71e5a9c3d42"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for table in ("label", "source", "classification"):
+        op.create_index(
+            f"ix_{table}_name_trgm",
+            table,
+            ["name"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    for table in ("label", "source", "classification"):
+        op.drop_index(f"ix_{table}_name_trgm", table_name=table, postgresql_using="gin")
@@ -0,0 +1,109 @@
+"""melding statistics
+
+Revision ID: e2d8b4a6c913
+Revises: c4a9e27f1b58
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2d8b4a6c913"
+down_revision: str | None = "c4a9e27f1b58"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "melding_statistics",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("state", sa.String(), nullable=False),
+        sa.Column("classification_id", sa.Integer(), nullable=True),
+        sa.Column("source_id", sa.Integer(), nullable=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["classification_id"], ["classification.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["source_id"], ["source.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_melding_statistics_state_day", "melding_statistics", ["state", "day"], unique=False)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION melding_statistics_insert() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO melding_statistics (day, state, classification_id, source_id, count)
+            SELECT created_at::date, state, classification_id, source_id, count(*)
+            FROM new_meldingen
+            GROUP BY created_at::date, state, classification_id, source_id;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION melding_statistics_update() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO melding_statistics (day, state, classification_id, source_id, count)
+            SELECT day, state, classification_id, source_id, sum(count)
+            FROM (
+                SELECT created_at::date AS day, state, classification_id, source_id, -1 AS count FROM old_meldingen
+                UNION ALL
+                SELECT created_at::date, state, classification_id, source_id, 1 FROM new_meldingen
+            ) AS changes
+            GROUP BY day, state, classification_id, source_id
+            HAVING sum(count) <> 0;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION melding_statistics_delete() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO melding_statistics (day, state, classification_id, source_id, count)
+            SELECT created_at::date, state, classification_id, source_id, -count(*)
+            FROM old_meldingen
+            GROUP BY created_at::date, state, classification_id, source_id;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """)
+
+    # Writes to melding have to wait until the triggers are in place and the existing meldingen are counted,
+    # otherwise they would either be counted twice or not at all
+    op.execute("LOCK TABLE melding IN SHARE MODE")
+    op.execute("""
+        CREATE TRIGGER melding_statistics_insert AFTER INSERT ON melding
+        REFERENCING NEW TABLE AS new_meldingen
+        FOR EACH STATEMENT EXECUTE FUNCTION melding_statistics_insert()
+        """)
+    op.execute("""
+        CREATE TRIGGER melding_statistics_update AFTER UPDATE ON melding
+        REFERENCING OLD TABLE AS old_meldingen NEW TABLE AS new_meldingen
+        FOR EACH STATEMENT EXECUTE FUNCTION melding_statistics_update()
+        """)
+    op.execute("""
+        CREATE TRIGGER melding_statistics_delete AFTER DELETE ON melding
+        REFERENCING OLD TABLE AS old_meldingen
+        FOR EACH STATEMENT EXECUTE FUNCTION melding_statistics_delete()
+        """)
+    op.execute("""
+        INSERT INTO melding_statistics (day, state, classification_id, source_id, count)
+        SELECT created_at::date, state, classification_id, source_id, count(*)
+        FROM melding
+        GROUP BY created_at::date, state, classification_id, source_id
+        """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS melding_statistics_delete ON melding")
+    op.execute("DROP TRIGGER IF EXISTS melding_statistics_update ON melding")
+    op.execute("DROP TRIGGER IF EXISTS melding_statistics_insert ON melding")
+    op.execute("DROP FUNCTION IF EXISTS melding_statistics_delete()")
+    op.execute("DROP FUNCTION IF EXISTS melding_statistics_update()")
+    op.execute("DROP FUNCTION IF EXISTS melding_statistics_insert()")
+    op.drop_index("ix_melding_statistics_state_day", table_name="melding_statistics")
+    op.drop_table("melding_statistics")
@@ -0,0 +1,26 @@
+"""melding updated at index
+
+Revision ID: e7b2c9d4a1f6
+Revises: c4a8e2f61b07
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from typing import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e7b2c9d4a1f6"
+down_revision: str | None = "c4a8e2f61b07"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Used by the ETag of the melding list, which reads the last updated_at on every request
+    op.create_index("ix_melding_updated_at", "melding", ["updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_melding_updated_at", table_name="melding")
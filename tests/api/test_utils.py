@@ -1,7 +1,26 @@
+from datetime import date, datetime, timezone
+from typing import Any
+from unittest.mock import Mock
+
 import pytest
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
+from meldingen_core import SortingDirection
 
-from meldingen.api.utils import pagination_params, sort_param
+from meldingen.api.utils import (
+    ContentRangeHeaderAdder,
+    CountCache,
+    CountStrategy,
+    CursorHeaderAdder,
+    bbox_param,
+    check_etag,
+    cursor_param,
+    pagination_params,
+    sort_param,
+    weak_etag,
+)
+from meldingen.models import Label
+from meldingen.pagination import InvalidCursorException, KeysetCursor
+from meldingen.repositories import LabelRepository
 
 
 @pytest.mark.parametrize(
@@ -36,3 +55,193 @@ def test_sort_param(attribute: str, direction: str) -> None:
 def test_sort_param_invalid_input() -> None:
     with pytest.raises(HTTPException):
         sort_param("asdf")
+
+
+def test_cursor_param_not_given() -> None:
+    assert cursor_param(sort_param('["id","ASC"]')) is None
+
+
+def test_cursor_param_empty_starts_at_first_page() -> None:
+    cursor = cursor_param(sort_param('["created_at","DESC"]'), "")
+
+    assert cursor is not None
+    assert cursor.is_first_page()
+    assert cursor.sort_attribute_name == "created_at"
+    assert cursor.sort_direction == SortingDirection.DESC
+
+
+def test_cursor_param_round_trip() -> None:
+    created_at = datetime(2025, 1, 1, 12, 30)
+    encoded = KeysetCursor("created_at", SortingDirection.DESC, created_at, 42, backwards=True).encode()
+
+    cursor = cursor_param(sort_param('["created_at","DESC"]'), encoded)
+
+    assert cursor == KeysetCursor("created_at", SortingDirection.DESC, created_at, 42, backwards=True)
+
+
+@pytest.mark.parametrize("cursor", ["asdf", KeysetCursor("id", SortingDirection.DESC, 1, 1).encode()])
+def test_cursor_param_invalid_input(cursor: str) -> None:
+    with pytest.raises(HTTPException):
+        cursor_param(sort_param('["id","ASC"]'), cursor)
+
+
+@pytest.mark.parametrize(
+    "value, python_type",
+    [(1, int), ("abc", str), (datetime(2025, 1, 1), datetime), (None, datetime), (True, bool)],
+)
+def test_cursor_check_value(value: Any, python_type: type[Any]) -> None:
+    KeysetCursor("attribute", SortingDirection.ASC, value, 1).check_value(python_type)
+
+
+@pytest.mark.parametrize(
+    "value, python_type",
+    [("abc", int), (True, int), (1, str), ("2025-01-01", datetime), (datetime(2025, 1, 1), date), ({}, str)],
+)
+def test_cursor_check_value_invalid(value: Any, python_type: type[Any]) -> None:
+    with pytest.raises(InvalidCursorException):
+        KeysetCursor("attribute", SortingDirection.ASC, value, 1).check_value(python_type)
+
+
+def test_cursor_check_value_time_zone() -> None:
+    cursor = KeysetCursor("created_at", SortingDirection.ASC, datetime(2025, 1, 1, tzinfo=timezone.utc), 1)
+
+    cursor.check_value(datetime, timezone=True)
+    with pytest.raises(InvalidCursorException):
+        cursor.check_value(datetime)
+
+
+def test_cursor_header_adder_first_page() -> None:
+    response = Response()
+    items = [Label(name=f"label {i}") for i in range(3)]
+    for i, item in enumerate(items):
+        item.id = i + 1
+
+    page = CursorHeaderAdder[Label]()(response, items, KeysetCursor("id", SortingDirection.ASC), 2)
+
+    assert page == items[:2]
+    assert KeysetCursor.decode(response.headers["Next-Cursor"]) == KeysetCursor("id", SortingDirection.ASC, 2, 2)
+    assert "Prev-Cursor" not in response.headers
+
+
+def test_cursor_header_adder_last_page() -> None:
+    response = Response()
+    items = [Label(name=f"label {i}") for i in range(2)]
+    for i, item in enumerate(items):
+        item.id = i + 3
+
+    page = CursorHeaderAdder[Label]()(response, items, KeysetCursor("id", SortingDirection.ASC, 2, 2), 2)
+
+    assert page == items
+    assert "Next-Cursor" not in response.headers
+    assert KeysetCursor.decode(response.headers["Prev-Cursor"]) == KeysetCursor(
+        "id", SortingDirection.ASC, 3, 3, backwards=True
+    )
+
+
+def test_cursor_header_adder_without_cursor() -> None:
+    response = Response()
+    items = [Label(name=f"label {i}") for i in range(3)]
+
+    assert CursorHeaderAdder[Label]()(response, items, None, 2) == items
+    assert "Next-Cursor" not in response.headers
+
+
+@pytest.mark.anyio
+async def test_content_range_header_adder_exact() -> None:
+    repository = Mock(LabelRepository)
+    repository.count.return_value = 12
+    response = Response()
+
+    await ContentRangeHeaderAdder(repository, "label")(response, {"limit": 10, "offset": 0})
+
+    assert response.headers["Content-Range"] == "label 0-9/12"
+
+
+@pytest.mark.anyio
+async def test_content_range_header_adder_window_total() -> None:
+    repository = Mock(LabelRepository)
+    response = Response()
+
+    await ContentRangeHeaderAdder(repository, "label", CountStrategy.WINDOW)(
+        response, {"limit": 10, "offset": 10}, total=15
+    )
+
+    assert response.headers["Content-Range"] == "label 10-19/15"
+    repository.count.assert_not_called()
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("estimate, expected", [(500_000, "label 0-9/~500000"), (50, "label 0-9/42")])
+async def test_content_range_header_adder_estimate(estimate: int, expected: str) -> None:
+    repository = Mock(LabelRepository)
+    repository.estimate_count.return_value = estimate
+    repository.count.return_value = 42
+    response = Response()
+
+    await ContentRangeHeaderAdder(repository, "label", CountStrategy.ESTIMATE, estimate_threshold=100_000)(
+        response, {"limit": 10, "offset": 0}
+    )
+
+    assert response.headers["Content-Range"] == expected
+
+
+@pytest.mark.anyio
+async def test_content_range_header_adder_cached() -> None:
+    repository = Mock(LabelRepository)
+    repository.count.return_value = 7
+    repository.compile_filters.side_effect = lambda filters: str(filters[0].right.value)
+    adder: ContentRangeHeaderAdder[Label] = ContentRangeHeaderAdder(
+        repository, "label", CountStrategy.CACHED, CountCache(60)
+    )
+
+    for _ in range(2):
+        response = Response()
+        await adder(response, {"limit": 10, "offset": 0}, [Label.name.ilike("%a%")])
+
+        assert response.headers["Content-Range"] == "label 0-9/7"
+
+    repository.count.assert_awaited_once()
+
+    await adder(Response(), {"limit": 10, "offset": 0}, [Label.name.ilike("%b%")])
+
+    assert repository.count.await_count == 2
+
+
+def test_bbox_param() -> None:
+    assert bbox_param("4.7,52.3,5.0,52.45") == (4.7, 52.3, 5.0, 52.45)
+
+
+@pytest.mark.parametrize("bbox", ["4.7,52.3,5.0", "5.0,52.3,4.7,52.45", "4.7,52.3,5.0,nan", "-181,0,0,1"])
+def test_bbox_param_invalid(bbox: str) -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        bbox_param(bbox)
+
+    assert exc_info.value.status_code == 422
+
+
+def test_weak_etag() -> None:
+    etag = weak_etag([("limit", "4")], 10, datetime(2025, 1, 1))
+
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert etag == weak_etag([("limit", "4")], 10, datetime(2025, 1, 1))
+    assert etag != weak_etag([("limit", "4")], 11, datetime(2025, 1, 1))
+
+
+@pytest.mark.parametrize("if_none_match", ['W/"abc"', '"abc"', '"other", W/"abc"', "*"])
+def test_check_etag_not_modified(if_none_match: str) -> None:
+    request = Mock(headers={"If-None-Match": if_none_match})
+
+    with pytest.raises(HTTPException) as exc_info:
+        check_etag(request, Response(), 'W/"abc"')
+
+    assert exc_info.value.status_code == 304
+    assert exc_info.value.headers == {"ETag": 'W/"abc"'}
+
+
+@pytest.mark.parametrize("headers", [{}, {"If-None-Match": 'W/"other"'}])
+def test_check_etag_modified(headers: dict[str, str]) -> None:
+    response = Response()
+
+    check_etag(Mock(headers=headers), response, 'W/"abc"')
+
+    assert response.headers["ETag"] == 'W/"abc"'
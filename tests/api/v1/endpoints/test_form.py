@@ -4,6 +4,8 @@ import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient
 from meldingen_core import SortingDirection
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from starlette.status import (
     HTTP_200_OK,
     HTTP_201_CREATED,
@@ -13,6 +15,7 @@ from starlette.status import (
     HTTP_422_UNPROCESSABLE_CONTENT,
 )
 
+from meldingen.dependencies import form_output_cache, static_form_output_cache
 from meldingen.models import (
     Classification,
     Form,
@@ -23,14 +26,23 @@ from meldingen.models import (
     FormIoPanelComponent,
     FormIoQuestionComponent,
     FormIoRadioComponent,
+    FormIoSelectComponent,
+    FormIoSelectComponentData,
+    FormIoSelectComponentValue,
     FormIoTextAreaComponent,
     FormIoTimeComponent,
     Melding,
+    Question,
 )
 from tests.api.v1.endpoints.base import BasePaginationParamsTest, BaseSortParamsTest, BaseUnauthorizedTest
 
 
 class BaseFormTest:
+    @pytest.fixture(autouse=True)
+    def clear_form_output_caches(self) -> None:
+        form_output_cache().invalidate()
+        static_form_output_cache().invalidate()
+
     async def _assert_components(
         self,
         data: list[dict[str, Any]],
@@ -375,6 +387,87 @@ class TestFormRetrieve(BaseFormTest):
         assert len(data.get("components")) == len(await form_with_classification.awaitable_attrs.components)
         assert data.get("classification") == form_with_classification.classification_id
 
+    @pytest.mark.anyio
+    async def test_retrieve_form_is_served_from_the_cache(
+        self, app: FastAPI, client: AsyncClient, db_session: AsyncSession, form: Form
+    ) -> None:
+        response = await client.get(app.url_path_for(self.ROUTE_NAME, form_id=form.id))
+
+        assert response.status_code == HTTP_200_OK
+        title = response.json().get("title")
+
+        # Changed behind the back of the update action, so the cached form is still served
+        form.title = "Changed"
+        await db_session.commit()
+
+        response = await client.get(app.url_path_for(self.ROUTE_NAME, form_id=form.id))
+
+        assert response.status_code == HTTP_200_OK
+        assert response.json().get("title") == title
+
+    async def _create_form_with_panels(self, db_session: AsyncSession, number_of_panels: int) -> Form:
+        form = Form(title=f"Form with {number_of_panels} panels")
+        components = await form.awaitable_attrs.components
+
+        for i in range(number_of_panels):
+            panel = FormIoPanelComponent(
+                label=f"Page {i}", key=f"page{i}", type=FormIoComponentTypeEnum.panel, input=False, title=f"Page {i}"
+            )
+            components.append(panel)
+
+            text_area = FormIoTextAreaComponent(label="Tekst", key=f"tekst{i}", jsonlogic='{"==": [1, 1]}')
+            radio = FormIoRadioComponent(label="Keuze", key=f"keuze{i}", type=FormIoComponentTypeEnum.radio)
+            radio.values.append(FormIoComponentValue(label="Ja", value="ja"))
+            radio.values.append(FormIoComponentValue(label="Nee", value="nee"))
+            select = FormIoSelectComponent(
+                label="Kies een optie",
+                key=f"kies{i}",
+                type=FormIoComponentTypeEnum.select,
+                data=FormIoSelectComponentData(),
+            )
+            select.data.values.append(FormIoSelectComponentValue(label="Optie", value="optie"))
+
+            for question_component in (text_area, radio, select):
+                panel.components.append(question_component)
+                question_component.question = Question(text=question_component.label, form=form)
+
+        db_session.add(form)
+        await db_session.commit()
+        db_session.expunge_all()
+
+        return form
+
+    @pytest.mark.anyio
+    async def test_retrieve_form_loads_the_component_tree_in_a_fixed_number_of_queries(
+        self, app: FastAPI, client: AsyncClient, db_session: AsyncSession, db_engine: AsyncEngine
+    ) -> None:
+        forms = [await self._create_form_with_panels(db_session, number_of_panels) for number_of_panels in (1, 5)]
+
+        statements: list[str] = []
+
+        def count_statement(*args: Any) -> None:
+            statements.append(args[2])
+
+        event.listen(db_engine.sync_engine, "before_cursor_execute", count_statement)
+        try:
+            statement_counts = []
+            for form in forms:
+                statements.clear()
+                response = await client.get(app.url_path_for(self.ROUTE_NAME, form_id=form.id))
+
+                assert response.status_code == HTTP_200_OK
+                panels = response.json()["components"]
+                assert len(panels) == len(form.components)
+                assert [component["type"] for component in panels[-1]["components"]] == ["textarea", "radio", "select"]
+                assert len(panels[-1]["components"][1]["values"]) == 2
+                assert len(panels[-1]["components"][2]["data"]["values"]) == 1
+
+                statement_counts.append(len([s for s in statements if s.lstrip().upper().startswith("SELECT")]))
+        finally:
+            event.remove(db_engine.sync_engine, "before_cursor_execute", count_statement)
+
+        assert statement_counts[0] == statement_counts[1]
+
     @pytest.mark.anyio
     async def test_retrieve_form_does_not_exists(self, app: FastAPI, client: AsyncClient) -> None:
         response = await client.get(app.url_path_for(self.ROUTE_NAME, form_id=1))
@@ -529,6 +622,32 @@ class TestFormUpdate(BaseUnauthorizedTest, BaseFormTest):
         components = await form.awaitable_attrs.components
         await self._assert_components(data.get("components"), components)
 
+    @pytest.mark.anyio
+    async def test_update_form_invalidates_the_cached_form(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, form_with_classification: Form
+    ) -> None:
+        classification_id = form_with_classification.classification_id
+        assert classification_id is not None
+
+        response = await client.get(app.url_path_for("form:classification", classification_id=classification_id))
+        assert response.status_code == HTTP_200_OK
+
+        response = await client.put(
+            app.url_path_for(self.ROUTE_NAME, form_id=form_with_classification.id),
+            json={
+                "title": "Nieuwe titel",
+                "display": "form",
+                "classification": classification_id,
+                "components": [],
+            },
+        )
+        assert response.status_code == HTTP_200_OK
+
+        response = await client.get(app.url_path_for("form:classification", classification_id=classification_id))
+
+        assert response.status_code == HTTP_200_OK
+        assert response.json().get("title") == "Nieuwe titel"
+
     @pytest.mark.anyio
     async def test_update_form_does_not_recreate_components_and_keeps_answers_working(
         self,
@@ -80,3 +80,35 @@ class TestLabelList(BaseUnauthorizedTest, BasePaginationParamsTest, BaseSortPara
         assert len(data) == 1
         assert data[0]["name"] == "Klacht"
         assert response.headers.get("content-range") == "label 0-49/1"
+
+    @pytest.mark.anyio
+    async def test_list_labels_filtered_by_q_best_match_first(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, initial_labels: list[Label]
+    ) -> None:
+        response = await client.get(app.url_path_for(self.get_route_name()), params={"filter": '{"q": "vraag"}'})
+
+        assert response.status_code == HTTP_200_OK
+        assert [item["name"] for item in response.json()] == ["Vraag", "Aanvraag"]
+        assert response.headers.get("content-range") == "label 0-49/2"
+
+    @pytest.mark.anyio
+    async def test_list_labels_filtered_by_q_prefix(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, initial_labels: list[Label]
+    ) -> None:
+        response = await client.get(
+            app.url_path_for(self.get_route_name()), params={"filter": '{"q": "vra", "prefix": true}'}
+        )
+
+        assert response.status_code == HTTP_200_OK
+        assert [item["name"] for item in response.json()] == ["Vraag"]
+        assert response.headers.get("content-range") == "label 0-49/1"
+
+    @pytest.mark.anyio
+    async def test_list_labels_filtered_by_q_matches_wildcards_literally(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, initial_labels: list[Label]
+    ) -> None:
+        response = await client.get(app.url_path_for(self.get_route_name()), params={"filter": '{"q": "%"}'})
+
+        assert response.status_code == HTTP_200_OK
+        assert response.json() == []
+        assert response.headers.get("content-range") == "label 0-49/0"
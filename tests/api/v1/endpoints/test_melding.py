@@ -1,4 +1,8 @@
+import csv
+import io
+import json
 from abc import ABCMeta, abstractmethod
+from datetime import datetime
 from os import path
 from typing import Any, Final, override
 from unittest.mock import Mock
@@ -18,11 +22,12 @@ from meldingen_core.statemachine import (
     MeldingStates,
     get_all_backoffice_states,
 )
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from starlette.status import (
     HTTP_200_OK,
     HTTP_201_CREATED,
+    HTTP_304_NOT_MODIFIED,
     HTTP_400_BAD_REQUEST,
     HTTP_401_UNAUTHORIZED,
     HTTP_404_NOT_FOUND,
@@ -32,6 +37,7 @@ from starlette.status import (
 
 from meldingen.actions.melding import MeldingGetPossibleNextStatesAction
 from meldingen.config import settings
+from meldingen.dependencies import vector_tile_cache
 from meldingen.models import (
     Answer,
     AnswerTypeEnum,
@@ -51,7 +57,9 @@ from meldingen.models import (
     TimeAnswer,
     User,
     ValueLabelAnswer,
+    label_melding,
 )
+from meldingen.pagination import KeysetCursor
 from meldingen.repositories import MeldingRepository
 from meldingen.statemachine import Process
 from tests.api.v1.endpoints.base import BasePaginationParamsTest, BaseSortParamsTest, BaseUnauthorizedTest
@@ -80,23 +88,18 @@ class TestMeldingCreate:
         assert len(public_id) == 6
 
     @pytest.mark.anyio
-    async def test_create_melding_with_duplicate_public_id(
-        self, app: FastAPI, client: AsyncClient, melding: Melding, public_id_generator_override: None
-    ) -> None:
-        response = await client.post(app.url_path_for(self.ROUTE_NAME_CREATE), json={"text": "This is a test melding."})
+    async def test_create_meldingen_get_different_public_ids(self, app: FastAPI, client: AsyncClient) -> None:
+        public_ids = set()
+        for _ in range(3):
+            response = await client.post(
+                app.url_path_for(self.ROUTE_NAME_CREATE), json={"text": "This is a test melding."}
+            )
 
-        assert response.status_code == HTTP_201_CREATED
+            assert response.status_code == HTTP_201_CREATED
+            public_ids.add(response.json().get("public_id"))
 
-        data = response.json()
-        assert data.get("id") > 0
-        assert data.get("text") == "This is a test melding."
-        assert data.get("state") == MeldingStates.NEW
-        assert data.get("urgency") == 0
-        assert data.get("classification") is None
-        assert data.get("token") is not None
-        assert data.get("created_at") is not None
-        assert data.get("updated_at") is not None
-        assert data.get("public_id") == "MELPUB"
+        assert len(public_ids) == 3
+        assert all(len(public_id) == 6 for public_id in public_ids)
 
     @pytest.mark.anyio
     async def test_create_melding_ignores_urgency(self, app: FastAPI, client: AsyncClient) -> None:
@@ -723,57 +726,685 @@ class TestMeldingList(BaseUnauthorizedTest, BasePaginationParamsTest, BaseSortPa
             )
         ],
     )
-    async def test_list_states_filter_returns_nothing_with_unknown_states(
+    async def test_list_states_filter_returns_nothing_with_unknown_states(
+        self,
+        app: FastAPI,
+        client: AsyncClient,
+        auth_user: None,
+        meldingen_with_different_states: list[Melding],
+    ) -> None:
+        filter_states: list[MeldingStates] = [MeldingStates.LOCATION_SUBMITTED]
+        response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"state": ",".join(filter_states)})
+
+        assert response.status_code == 200
+
+        body = response.json()
+
+        assert len(body) == 0
+
+        for new_melding in body:
+            state = new_melding.get("state")
+            assert state in get_all_backoffice_states()
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize(
+        "melding_states",
+        [
+            (
+                MeldingFormStates.NEW,
+                MeldingFormStates.LOCATION_SUBMITTED,
+                MeldingFormStates.CLASSIFIED,
+                MeldingFormStates.QUESTIONS_ANSWERED,
+                MeldingFormStates.ATTACHMENTS_ADDED,
+            )
+        ],
+    )
+    async def test_list_states_filter_does_not_return_non_backoffice_states(
+        self,
+        app: FastAPI,
+        client: AsyncClient,
+        auth_user: None,
+        meldingen_with_different_states: list[Melding],
+    ) -> None:
+        response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"state": ""})
+
+        assert response.status_code == 200
+
+        body = response.json()
+
+        assert len(body) == 0
+
+        for new_melding in body:
+            state = new_melding.get("state")
+            assert state in get_all_backoffice_states()
+
+    async def _add_meldingen_with_texts(self, db_session: AsyncSession, texts: list[str]) -> list[Melding]:
+        meldingen = []
+        for i, text in enumerate(texts):
+            melding = Melding(text=text)
+            melding.public_id = f"SRCH{i}"
+            melding.state = MeldingStates.PROCESSING
+            db_session.add(melding)
+            meldingen.append(melding)
+
+        await db_session.commit()
+
+        return meldingen
+
+    @pytest.mark.anyio
+    async def test_list_search_ranks_on_relevance(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, db_session: AsyncSession
+    ) -> None:
+        await self._add_meldingen_with_texts(
+            db_session,
+            [
+                "Er ligt afval naast de container",
+                "De lantaarnpaal is kapot, de lantaarnpaal brandt niet meer",
+                "Een lantaarnpaal staat scheef",
+            ],
+        )
+
+        response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"q": "lantaarnpaal"})
+
+        assert response.status_code == HTTP_200_OK
+        assert response.headers.get("content-range") == "melding 0-49/2"
+        assert [melding["text"] for melding in response.json()] == [
+            "De lantaarnpaal is kapot, de lantaarnpaal brandt niet meer",
+            "Een lantaarnpaal staat scheef",
+        ]
+
+    @pytest.mark.anyio
+    async def test_list_search_with_sort_and_state_filter(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, db_session: AsyncSession
+    ) -> None:
+        meldingen = await self._add_meldingen_with_texts(
+            db_session,
+            [
+                "De lantaarnpaal is kapot, de lantaarnpaal brandt niet meer",
+                "Een lantaarnpaal staat scheef",
+                "Lantaarnpaal op de stoep",
+            ],
+        )
+        meldingen[2].state = MeldingStates.COMPLETED
+        await db_session.commit()
+
+        response = await client.get(
+            app.url_path_for(self.ROUTE_NAME),
+            params={
+                "q": "lantaarnpaal",
+                "state": MeldingStates.PROCESSING,
+                "sort": f'["id","{SortingDirection.DESC}"]',
+            },
+        )
+
+        assert response.status_code == HTTP_200_OK
+        assert [melding["id"] for melding in response.json()] == [meldingen[1].id, meldingen[0].id]
+
+    @pytest.mark.anyio
+    async def test_list_sort_on_rank_without_search(self, app: FastAPI, client: AsyncClient, auth_user: None) -> None:
+        response = await client.get(
+            app.url_path_for(self.ROUTE_NAME), params={"sort": f'["rank","{SortingDirection.DESC}"]'}
+        )
+
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("direction", [SortingDirection.ASC, SortingDirection.DESC])
+    async def test_list_meldingen_cursor_pagination(
+        self,
+        app: FastAPI,
+        client: AsyncClient,
+        auth_user: None,
+        meldingen: list[Melding],
+        direction: SortingDirection,
+    ) -> None:
+        sort = f'["text","{direction}"]'
+        texts: list[str] = []
+        pages: list[list[str]] = []
+        cursor = ""
+        while True:
+            response = await client.get(
+                app.url_path_for(self.ROUTE_NAME), params={"limit": 4, "sort": sort, "cursor": cursor}
+            )
+
+            assert response.status_code == HTTP_200_OK
+            assert response.headers.get("content-range") == "melding 0-3/10"
+            page = [melding["text"] for melding in response.json()]
+            pages.append(page)
+            texts.extend(page)
+
+            if "next-cursor" not in response.headers:
+                break
+            cursor = response.headers["next-cursor"]
+
+        assert [len(page) for page in pages] == [4, 4, 2]
+        assert texts == sorted(texts, reverse=direction == SortingDirection.DESC)
+        assert len(set(texts)) == 10
+
+        response = await client.get(
+            app.url_path_for(self.ROUTE_NAME),
+            params={"limit": 4, "sort": sort, "cursor": response.headers["prev-cursor"]},
+        )
+
+        assert response.status_code == HTTP_200_OK
+        assert [melding["text"] for melding in response.json()] == pages[1]
+        assert "prev-cursor" in response.headers
+        assert "next-cursor" in response.headers
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("strategy", ["exact", "window", "cached"])
+    async def test_list_meldingen_count_strategy(
+        self,
+        app: FastAPI,
+        client: AsyncClient,
+        auth_user: None,
+        meldingen: list[Melding],
+        strategy: str,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(settings, "melding_list_count_strategy", strategy)
+
+        response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"limit": 4, "offset": 4})
+
+        assert response.status_code == HTTP_200_OK
+        assert len(response.json()) == 4
+        assert response.headers.get("content-range") == "melding 4-7/10"
+
+    @pytest.mark.anyio
+    async def test_list_meldingen_estimated_count_is_marked_approximate(
+        self,
+        app: FastAPI,
+        client: AsyncClient,
+        auth_user: None,
+        meldingen: list[Melding],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(settings, "melding_list_count_strategy", "estimate")
+        monkeypatch.setattr(settings, "list_count_estimate_threshold", -1)
+
+        response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"limit": 4})
+
+        assert response.status_code == HTTP_200_OK
+        assert response.headers.get("content-range", "").startswith("melding 0-3/~")
+
+    @pytest.mark.anyio
+    async def test_list_meldingen_estimated_count_with_colon_in_search_query(
+        self,
+        app: FastAPI,
+        client: AsyncClient,
+        auth_user: None,
+        meldingen: list[Melding],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(settings, "melding_list_count_strategy", "estimate")
+        monkeypatch.setattr(settings, "list_count_estimate_threshold", -1)
+
+        response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"q": "afval :container"})
+
+        assert response.status_code == HTTP_200_OK
+        assert response.headers.get("content-range", "").startswith("melding ")
+
+    @pytest.mark.anyio
+    async def test_list_meldingen_not_modified(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, db_session: AsyncSession, meldingen: list[Melding]
+    ) -> None:
+        response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"limit": 4})
+
+        assert response.status_code == HTTP_200_OK
+        etag = response.headers["etag"]
+        assert etag.startswith('W/"')
+
+        response = await client.get(
+            app.url_path_for(self.ROUTE_NAME), params={"limit": 4}, headers={"If-None-Match": etag}
+        )
+
+        assert response.status_code == HTTP_304_NOT_MODIFIED
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+
+        response = await client.get(
+            app.url_path_for(self.ROUTE_NAME), params={"limit": 5}, headers={"If-None-Match": etag}
+        )
+
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["etag"] != etag
+
+        melding = Melding(text="Nieuwe melding")
+        melding.public_id = "MELDNEW"
+        melding.state = MeldingBackofficeStates.PROCESSING
+        db_session.add(melding)
+        await db_session.commit()
+
+        response = await client.get(
+            app.url_path_for(self.ROUTE_NAME), params={"limit": 4}, headers={"If-None-Match": etag}
+        )
+
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["etag"] != etag
+        assert response.headers.get("content-range") == "melding 0-3/11"
+
+    @pytest.mark.anyio
+    async def test_list_meldingen_modified_after_asset_type_change(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, db_session: AsyncSession, meldingen: list[Melding]
+    ) -> None:
+        asset_type = AssetType(name="container", class_name="test", arguments={}, max_assets=1)
+        meldingen[0].classification = Classification(name="classification", asset_type=asset_type)
+        await db_session.commit()
+
+        response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"limit": 4})
+        etag = response.headers["etag"]
+
+        # now() is the same throughout the transaction of the test, so a later change is simulated
+        asset_type.updated_at = datetime(2099, 1, 1)
+        await db_session.commit()
+
+        response = await client.get(
+            app.url_path_for(self.ROUTE_NAME), params={"limit": 4}, headers={"If-None-Match": etag}
+        )
+
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["etag"] != etag
+
+    @pytest.mark.anyio
+    async def test_list_meldingen_modified_after_delete(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, db_session: AsyncSession, meldingen: list[Melding]
+    ) -> None:
+        response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"limit": 4})
+        etag = response.headers["etag"]
+
+        await db_session.delete(meldingen[-1])
+        await db_session.commit()
+
+        response = await client.get(
+            app.url_path_for(self.ROUTE_NAME), params={"limit": 4}, headers={"If-None-Match": etag}
+        )
+
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["etag"] != etag
+
+    @pytest.mark.anyio
+    async def test_list_meldingen_cursor_does_not_match_sort(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, meldingen: list[Melding]
+    ) -> None:
+        response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"limit": 4, "cursor": ""})
+        cursor = response.headers["next-cursor"]
+
+        response = await client.get(
+            app.url_path_for(self.ROUTE_NAME), params={"limit": 4, "cursor": cursor, "sort": '["text","ASC"]'}
+        )
+
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize(
+        "sort, value",
+        [("id", "MELDI1"), ("created_at", 1), ("created_at", "2025-01-01"), ("text", {"date": "2025-01-01"})],
+    )
+    async def test_list_meldingen_cursor_with_value_of_another_type(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, meldingen: list[Melding], sort: str, value: Any
+    ) -> None:
+        cursor = KeysetCursor(sort, SortingDirection.ASC, value, 1).encode()
+
+        response = await client.get(
+            app.url_path_for(self.ROUTE_NAME), params={"limit": 4, "cursor": cursor, "sort": f'["{sort}","ASC"]'}
+        )
+
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+        assert response.json()["detail"][0]["type"] == "invalid_cursor"
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("attribute", ["geo_location", "search_vector"])
+    async def test_list_meldingen_cursor_on_unsupported_attribute(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, meldingen: list[Melding], attribute: str
+    ) -> None:
+        response = await client.get(
+            app.url_path_for(self.ROUTE_NAME), params={"limit": 4, "cursor": "", "sort": f'["{attribute}","ASC"]'}
+        )
+
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+        assert response.json()["detail"][0]["type"] == "attribute_not_found"
+
+    @pytest.mark.anyio
+    async def test_list_meldingen_query_count_does_not_depend_on_page_size(
+        self,
+        app: FastAPI,
+        client: AsyncClient,
+        auth_user: None,
+        db_session: AsyncSession,
+        db_engine: AsyncEngine,
+    ) -> None:
+        asset_type = AssetType(name="container", class_name="test", arguments={}, max_assets=1)
+        classification = Classification(name="classification", asset_type=asset_type)
+        source = Source(name="source")
+        for i in range(10):
+            melding = Melding(text=f"melding {i}", classification=classification, source=source)
+            melding.public_id = f"MELDI{i}"
+            melding.state = MeldingBackofficeStates.PROCESSING
+            melding.labels = [Label(name=f"label {i}")]
+            db_session.add(melding)
+        await db_session.commit()
+        db_session.expunge_all()
+
+        statements: list[str] = []
+
+        def count_statement(*args: Any) -> None:
+            statements.append(args[2])
+
+        event.listen(db_engine.sync_engine, "before_cursor_execute", count_statement)
+        try:
+            statement_counts = []
+            for limit in (2, 10):
+                statements.clear()
+                response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"limit": limit})
+
+                assert response.status_code == HTTP_200_OK
+                body = response.json()
+                assert len(body) == limit
+                assert len(body[0]["labels"]) == 1
+                assert body[0]["classification"]["asset_type"]["name"] == "container"
+
+                statement_counts.append(len([s for s in statements if s.lstrip().upper().startswith("SELECT")]))
+        finally:
+            event.remove(db_engine.sync_engine, "before_cursor_execute", count_statement)
+
+        assert statement_counts[0] == statement_counts[1]
+
+
+class TestMeldingExport(BaseUnauthorizedTest):
+    ROUTE_NAME: Final[str] = "melding:export"
+
+    def get_route_name(self) -> str:
+        return self.ROUTE_NAME
+
+    def get_method(self) -> str:
+        return "GET"
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("melding_text", ["Er ligt poep op de stoep."])
+    async def test_export_ndjson(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, meldingen: list[Melding]
+    ) -> None:
+        response = await client.get(app.url_path_for(self.ROUTE_NAME))
+
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert response.headers["content-disposition"] == 'attachment; filename="meldingen.ndjson"'
+
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["id"] for row in rows] == [melding.id for melding in meldingen]
+        assert rows[0]["public_id"] == meldingen[0].public_id
+        assert rows[0]["labels"] == []
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("melding_text", ["Er ligt poep op de stoep."])
+    async def test_export_csv(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, meldingen: list[Melding]
+    ) -> None:
+        response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"format": "csv"})
+
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/csv")
+
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == len(meldingen)
+        assert rows[0]["text"] == meldingen[0].text
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("melding_text", ["Er ligt poep op de stoep."])
+    async def test_export_geojson(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, meldingen: list[Melding]
+    ) -> None:
+        response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"format": "geojson"})
+
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["content-type"] == "application/geo+json"
+
+        collection = response.json()
+        assert collection["type"] == "FeatureCollection"
+        assert len(collection["features"]) == len(meldingen)
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("melding_text", ["Er ligt poep op de stoep."])
+    async def test_export_state_filter(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, meldingen: list[Melding]
+    ) -> None:
+        response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"state": MeldingStates.SUBMITTED})
+
+        assert response.status_code == HTTP_200_OK
+        assert response.text == ""
+
+    @pytest.mark.anyio
+    async def test_export_invalid_area(self, app: FastAPI, client: AsyncClient, auth_user: None) -> None:
+        response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"in_area": "not_geo_json"})
+
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
+
+class TestMeldingVectorTile(BaseUnauthorizedTest):
+    ROUTE_NAME: Final[str] = "melding:tile"
+
+    def get_route_name(self) -> str:
+        return self.ROUTE_NAME
+
+    def get_method(self) -> str:
+        return "GET"
+
+    def get_path_params(self) -> dict[str, Any]:
+        return {"z": 10, "x": 525, "y": 336}
+
+    @pytest.fixture(autouse=True)
+    def clear_tile_cache(self) -> None:
+        vector_tile_cache().clear()
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize(
+        "melding_locations",
+        [("POINT(4.898451690545197 52.37256509259712)", "POINT(4.938320969227033 52.40152495315581)")],
+    )
+    async def test_tile(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, meldingen_with_location: list[Melding]
+    ) -> None:
+        response = await client.get(app.url_path_for(self.ROUTE_NAME, **self.get_path_params()))
+
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["content-type"] == "application/vnd.mapbox-vector-tile"
+        assert len(response.content) > 0
+
+        response = await client.get(app.url_path_for(self.ROUTE_NAME, z=10, x=0, y=0))
+
+        assert response.status_code == HTTP_200_OK
+        assert response.content == b""
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("melding_locations", [("POINT(4.898451690545197 52.37256509259712)",)])
+    async def test_tile_is_invalidated_on_melding_writes(
+        self,
+        app: FastAPI,
+        client: AsyncClient,
+        auth_user: None,
+        db_session: AsyncSession,
+        meldingen_with_location: list[Melding],
+    ) -> None:
+        url = app.url_path_for(self.ROUTE_NAME, **self.get_path_params())
+
+        response = await client.get(url, params={"state": MeldingStates.PROCESSING})
+        assert len(response.content) > 0
+
+        meldingen_with_location[0].state = MeldingStates.COMPLETED
+        await db_session.commit()
+
+        response = await client.get(url, params={"state": MeldingStates.PROCESSING})
+        assert response.content == b""
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize(
+        ["z", "x", "y", "status_code"],
+        [(1, 2, 0, HTTP_404_NOT_FOUND), (1, 0, 2, HTTP_404_NOT_FOUND), (25, 0, 0, HTTP_422_UNPROCESSABLE_CONTENT)],
+    )
+    async def test_tile_out_of_range(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, z: int, x: int, y: int, status_code: int
+    ) -> None:
+        response = await client.get(app.url_path_for(self.ROUTE_NAME, z=z, x=x, y=y))
+
+        assert response.status_code == status_code
+
+
+class TestMeldingClusters(BaseUnauthorizedTest):
+    ROUTE_NAME: Final[str] = "melding:clusters"
+    AMSTERDAM: Final[str] = "4.7,52.3,5.0,52.45"
+
+    def get_route_name(self) -> str:
+        return self.ROUTE_NAME
+
+    def get_method(self) -> str:
+        return "GET"
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize(
+        ["melding_locations", "zoom", "counts"],
+        [
+            (
+                (
+                    "POINT(4.898451690545197 52.37256509259712)",  # Barndesteeg 1B, Stadsdeel: Centrum
+                    "POINT(4.938320969227033 52.40152495315581)",  # Bakkerswaal 30, Stadsdeel: Noord
+                    "POINT(4.872746743968191 52.3341878625198)",  # Ennemaborg 7, Stadsdeel: Zuid
+                ),
+                0,
+                [3],
+            ),
+            (
+                (
+                    "POINT(4.898451690545197 52.37256509259712)",
+                    "POINT(4.938320969227033 52.40152495315581)",
+                    "POINT(4.872746743968191 52.3341878625198)",
+                ),
+                18,
+                [1, 1, 1],
+            ),
+        ],
+        indirect=["melding_locations"],
+    )
+    async def test_clusters(
         self,
         app: FastAPI,
         client: AsyncClient,
         auth_user: None,
-        meldingen_with_different_states: list[Melding],
+        meldingen_with_location: list[Melding],
+        zoom: int,
+        counts: list[int],
     ) -> None:
-        filter_states: list[MeldingStates] = [MeldingStates.LOCATION_SUBMITTED]
-        response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"state": ",".join(filter_states)})
+        response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"bbox": self.AMSTERDAM, "zoom": zoom})
 
-        assert response.status_code == 200
+        assert response.status_code == HTTP_200_OK
 
         body = response.json()
+        assert [cluster["count"] for cluster in body] == counts
+        assert all(cluster["states"] == {MeldingStates.PROCESSING: cluster["count"]} for cluster in body)
+        assert all(52.3 < cluster["latitude"] < 52.45 for cluster in body)
 
-        assert len(body) == 0
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("melding_locations", [("POINT(4.898451690545197 52.37256509259712)",)])
+    async def test_clusters_outside_bbox_and_state_filter(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, meldingen_with_location: list[Melding]
+    ) -> None:
+        response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"bbox": "5,52,6,53", "zoom": 10})
 
-        for new_melding in body:
-            state = new_melding.get("state")
-            assert state in get_all_backoffice_states()
+        assert response.status_code == HTTP_200_OK
+        assert response.json() == []
+
+        response = await client.get(
+            app.url_path_for(self.ROUTE_NAME),
+            params={"bbox": self.AMSTERDAM, "zoom": 10, "state": MeldingStates.SUBMITTED},
+        )
+
+        assert response.status_code == HTTP_200_OK
+        assert response.json() == []
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("bbox", ["4.7,52.3,5.0", "5.0,52.3,4.7,52.45", "a,b,c,d", "4.7,52.3,5.0,100"])
+    async def test_clusters_invalid_bbox(self, app: FastAPI, client: AsyncClient, auth_user: None, bbox: str) -> None:
+        response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"bbox": bbox, "zoom": 10})
+
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
+
+class TestMeldingStatistics(BaseUnauthorizedTest):
+    ROUTE_NAME: Final[str] = "melding:statistics"
+
+    def get_route_name(self) -> str:
+        return self.ROUTE_NAME
+
+    def get_method(self) -> str:
+        return "GET"
 
     @pytest.mark.anyio
     @pytest.mark.parametrize(
         "melding_states",
-        [
-            (
-                MeldingFormStates.NEW,
-                MeldingFormStates.LOCATION_SUBMITTED,
-                MeldingFormStates.CLASSIFIED,
-                MeldingFormStates.QUESTIONS_ANSWERED,
-                MeldingFormStates.ATTACHMENTS_ADDED,
-            )
-        ],
+        [[MeldingStates.PROCESSING, MeldingStates.COMPLETED, MeldingStates.PROCESSING, MeldingStates.NEW]],
+        indirect=True,
     )
-    async def test_list_states_filter_does_not_return_non_backoffice_states(
+    async def test_statistics_by_state(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, meldingen_with_different_states: list[Melding]
+    ) -> None:
+        response = await client.get(app.url_path_for(self.ROUTE_NAME))
+
+        assert response.status_code == HTTP_200_OK
+        assert response.json() == [
+            {"day": None, "state": MeldingStates.COMPLETED, "classification": None, "source": None, "count": 1},
+            {"day": None, "state": MeldingStates.PROCESSING, "classification": None, "source": None, "count": 2},
+        ]
+
+    @pytest.mark.anyio
+    async def test_statistics_follow_changes_to_meldingen(
         self,
         app: FastAPI,
         client: AsyncClient,
         auth_user: None,
-        meldingen_with_different_states: list[Melding],
+        db_session: AsyncSession,
+        meldingen: list[Melding],
+        classification: Classification,
     ) -> None:
-        response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"state": ""})
+        meldingen[0].classification = classification
+        meldingen[1].classification = classification
+        meldingen[1].state = MeldingStates.COMPLETED
+        await db_session.delete(meldingen[2])
+        await db_session.commit()
 
-        assert response.status_code == 200
+        response = await client.get(
+            app.url_path_for(self.ROUTE_NAME), params=[("group_by", "state"), ("group_by", "classification")]
+        )
 
-        body = response.json()
+        assert response.status_code == HTTP_200_OK
+        assert [(row["state"], row["classification"], row["count"]) for row in response.json()] == [
+            (MeldingStates.COMPLETED, classification.id, 1),
+            (MeldingStates.PROCESSING, classification.id, 1),
+            (MeldingStates.PROCESSING, None, 7),
+        ]
 
-        assert len(body) == 0
+    @pytest.mark.anyio
+    async def test_statistics_by_day(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, meldingen: list[Melding]
+    ) -> None:
+        response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"group_by": "day"})
 
-        for new_melding in body:
-            state = new_melding.get("state")
-            assert state in get_all_backoffice_states()
+        assert response.status_code == HTTP_200_OK
+        [row] = response.json()
+        assert row["day"] is not None
+        assert row["state"] is None
+        assert row["count"] == 10
+
+        response = await client.get(
+            app.url_path_for(self.ROUTE_NAME), params={"group_by": "day", "since": "2999-01-01"}
+        )
+
+        assert response.status_code == HTTP_200_OK
+        assert response.json() == []
+
+    @pytest.mark.anyio
+    async def test_statistics_invalid_group(self, app: FastAPI, client: AsyncClient, auth_user: None) -> None:
+        response = await client.get(app.url_path_for(self.ROUTE_NAME), params={"group_by": "urgency"})
+
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
 
 
 class TestMeldingRetrieve(BaseUnauthorizedTest):
@@ -840,6 +1471,55 @@ class TestMeldingRetrieve(BaseUnauthorizedTest):
         body = response.json()
         assert body.get("detail") == "Not Found"
 
+    @pytest.mark.anyio
+    async def test_retrieve_melding_not_modified(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, db_session: AsyncSession, melding: Melding
+    ) -> None:
+        response = await client.get(app.url_path_for(self.ROUTE_NAME, melding_id=melding.id))
+
+        assert response.status_code == HTTP_200_OK
+        etag = response.headers["etag"]
+
+        response = await client.get(
+            app.url_path_for(self.ROUTE_NAME, melding_id=melding.id), headers={"If-None-Match": f'"x", {etag}'}
+        )
+
+        assert response.status_code == HTTP_304_NOT_MODIFIED
+        assert response.headers["etag"] == etag
+
+        # now() is the same throughout the transaction of the test, so a later change is simulated
+        melding.updated_at = datetime(2099, 1, 1)
+        await db_session.commit()
+
+        response = await client.get(
+            app.url_path_for(self.ROUTE_NAME, melding_id=melding.id), headers={"If-None-Match": etag}
+        )
+
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["etag"] != etag
+
+    @pytest.mark.anyio
+    async def test_retrieve_melding_modified_after_asset_type_change(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, db_session: AsyncSession, melding: Melding
+    ) -> None:
+        asset_type = AssetType(name="container", class_name="test", arguments={}, max_assets=1)
+        melding.classification = Classification(name="classification", asset_type=asset_type)
+        await db_session.commit()
+
+        response = await client.get(app.url_path_for(self.ROUTE_NAME, melding_id=melding.id))
+        etag = response.headers["etag"]
+
+        # now() is the same throughout the transaction of the test, so a later change is simulated
+        asset_type.updated_at = datetime(2099, 1, 1)
+        await db_session.commit()
+
+        response = await client.get(
+            app.url_path_for(self.ROUTE_NAME, melding_id=melding.id), headers={"If-None-Match": etag}
+        )
+
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["etag"] != etag
+
 
 class BaseTokenAuthenticationTest(metaclass=ABCMeta):
     @abstractmethod
@@ -2089,6 +2769,227 @@ class TestMeldingComplete(BaseUnauthorizedTest):
         assert body.get("detail") == "Transition not allowed from current state"
 
 
+class TestMeldingBulkTransition(BaseUnauthorizedTest):
+    ROUTE_NAME: Final[str] = "melding:bulk-transition"
+
+    def get_route_name(self) -> str:
+        return self.ROUTE_NAME
+
+    def get_method(self) -> str:
+        return "POST"
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("melding_states", [(MeldingStates.SUBMITTED, MeldingStates.PROCESSING, MeldingStates.NEW)])
+    async def test_bulk_transition_ids(
+        self,
+        app: FastAPI,
+        client: AsyncClient,
+        auth_user: None,
+        meldingen_with_different_states: list[Melding],
+    ) -> None:
+        ids = [melding.id for melding in meldingen_with_different_states]
+
+        response = await client.post(
+            app.url_path_for(self.ROUTE_NAME), json={"transition": "complete", "ids": [*ids, 404]}
+        )
+
+        assert response.status_code == HTTP_200_OK
+        assert response.json() == [
+            {"id": ids[0], "status": "transitioned", "state": MeldingStates.COMPLETED},
+            {"id": ids[1], "status": "transitioned", "state": MeldingStates.COMPLETED},
+            {"id": ids[2], "status": "transition_not_allowed", "state": MeldingStates.NEW},
+            {"id": 404, "status": "not_found", "state": None},
+        ]
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize(
+        "melding_states", [(MeldingStates.SUBMITTED, MeldingStates.PROCESSING, MeldingStates.SUBMITTED)]
+    )
+    async def test_bulk_transition_filter(
+        self,
+        app: FastAPI,
+        client: AsyncClient,
+        auth_user: None,
+        db_session: AsyncSession,
+        meldingen_with_different_states: list[Melding],
+    ) -> None:
+        response = await client.post(
+            app.url_path_for(self.ROUTE_NAME),
+            json={"transition": "complete", "filter": {"state": [MeldingStates.SUBMITTED]}},
+        )
+
+        assert response.status_code == HTTP_200_OK
+
+        body = response.json()
+        assert [result["id"] for result in body] == [
+            meldingen_with_different_states[0].id,
+            meldingen_with_different_states[2].id,
+        ]
+        assert all(result["status"] == "transitioned" for result in body)
+
+        states = (await db_session.execute(select(Melding.state).order_by(Melding.id))).scalars().all()
+        assert states == [MeldingStates.COMPLETED, MeldingStates.PROCESSING, MeldingStates.COMPLETED]
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize(
+        "melding_states", [(MeldingStates.SUBMITTED, MeldingStates.SUBMITTED, MeldingStates.SUBMITTED)]
+    )
+    async def test_bulk_transition_in_chunks(
+        self,
+        app: FastAPI,
+        client: AsyncClient,
+        auth_user: None,
+        monkeypatch: pytest.MonkeyPatch,
+        meldingen_with_different_states: list[Melding],
+    ) -> None:
+        monkeypatch.setattr(settings, "melding_bulk_chunk_size", 2)
+
+        response = await client.post(
+            app.url_path_for(self.ROUTE_NAME),
+            json={"transition": "process", "ids": [melding.id for melding in meldingen_with_different_states]},
+        )
+
+        assert response.status_code == HTTP_200_OK
+        assert [(result["status"], result["state"]) for result in response.json()] == [
+            ("transitioned", MeldingStates.PROCESSING)
+        ] * 3
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize(
+        "melding_states", [(MeldingStates.SUBMITTED, MeldingStates.SUBMITTED, MeldingStates.SUBMITTED)]
+    )
+    async def test_bulk_transition_limit_exceeded(
+        self,
+        app: FastAPI,
+        client: AsyncClient,
+        auth_user: None,
+        monkeypatch: pytest.MonkeyPatch,
+        meldingen_with_different_states: list[Melding],
+    ) -> None:
+        monkeypatch.setattr(settings, "melding_bulk_limit", 2)
+
+        response = await client.post(app.url_path_for(self.ROUTE_NAME), json={"transition": "complete", "filter": {}})
+
+        assert response.status_code == HTTP_400_BAD_REQUEST
+        assert response.json().get("detail") == "A bulk operation can change at most 2 meldingen"
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize(
+        "json",
+        [
+            {"transition": "complete"},
+            {"transition": "complete", "ids": [1], "filter": {}},
+            {"transition": "submit", "ids": [1]},
+        ],
+    )
+    async def test_bulk_transition_invalid_input(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, json: dict[str, Any]
+    ) -> None:
+        response = await client.post(app.url_path_for(self.ROUTE_NAME), json=json)
+
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
+
+class TestMeldingBulkLabels(BaseUnauthorizedTest):
+    ROUTE_NAME: Final[str] = "melding:bulk-labels"
+
+    def get_route_name(self) -> str:
+        return self.ROUTE_NAME
+
+    def get_method(self) -> str:
+        return "POST"
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("melding_text", ["Er ligt poep op de stoep."])
+    async def test_bulk_add_labels(
+        self,
+        app: FastAPI,
+        client: AsyncClient,
+        auth_user: None,
+        db_session: AsyncSession,
+        meldingen: list[Melding],
+        initial_labels: list[Label],
+    ) -> None:
+        json = {"ids": [melding.id for melding in meldingen[:3]], "add": [initial_labels[0].id, initial_labels[1].id]}
+
+        response = await client.post(app.url_path_for(self.ROUTE_NAME), json=json)
+
+        assert response.status_code == HTTP_200_OK
+        assert response.json() == {"meldingen": 3, "added": 6, "removed": 0}
+
+        # Existing links are left alone
+        response = await client.post(app.url_path_for(self.ROUTE_NAME), json=json)
+
+        assert response.status_code == HTTP_200_OK
+        assert response.json() == {"meldingen": 3, "added": 0, "removed": 0}
+
+        links = (await db_session.execute(select(label_melding))).all()
+        assert len(links) == 6
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("melding_text", ["Er ligt poep op de stoep."])
+    async def test_bulk_add_and_remove_labels_with_filter(
+        self,
+        app: FastAPI,
+        client: AsyncClient,
+        auth_user: None,
+        db_session: AsyncSession,
+        meldingen: list[Melding],
+        initial_labels: list[Label],
+    ) -> None:
+        await db_session.execute(
+            label_melding.insert().values(
+                [{"label_id": initial_labels[0].id, "melding_id": melding.id} for melding in meldingen[:4]]
+            )
+        )
+        await db_session.commit()
+
+        response = await client.post(
+            app.url_path_for(self.ROUTE_NAME),
+            json={"filter": {}, "add": [initial_labels[1].id], "remove": [initial_labels[0].id]},
+        )
+
+        assert response.status_code == HTTP_200_OK
+        assert response.json() == {"meldingen": 10, "added": 10, "removed": 4}
+
+        label_ids = (await db_session.execute(select(label_melding.c.label_id).distinct())).scalars().all()
+        assert label_ids == [initial_labels[1].id]
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("melding_text", ["Er ligt poep op de stoep."])
+    async def test_bulk_labels_unknown_label(
+        self,
+        app: FastAPI,
+        client: AsyncClient,
+        auth_user: None,
+        meldingen: list[Melding],
+        initial_labels: list[Label],
+    ) -> None:
+        response = await client.post(
+            app.url_path_for(self.ROUTE_NAME),
+            json={"ids": [meldingen[0].id], "add": [initial_labels[0].id, 999]},
+        )
+
+        assert response.status_code == HTTP_404_NOT_FOUND
+        assert response.json().get("detail") == "Can't find labels with id's: [999]"
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize(
+        "json",
+        [
+            {"ids": [1]},
+            {"ids": [1], "add": [1], "remove": [1]},
+            {"add": [1]},
+        ],
+    )
+    async def test_bulk_labels_invalid_input(
+        self, app: FastAPI, client: AsyncClient, auth_user: None, json: dict[str, Any]
+    ) -> None:
+        response = await client.post(app.url_path_for(self.ROUTE_NAME), json=json)
+
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
+
 class TestMeldingQuestionAnswer:
     ROUTE_NAME_CREATE: Final[str] = "melding:answer-question"
 
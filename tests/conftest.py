@@ -7,9 +7,11 @@ from _pytest.tmpdir import TempPathFactory
 from asgi_lifespan import LifespanManager
 from azure.core.exceptions import ResourceNotFoundError
 from azure.storage.blob.aio import ContainerClient
+from cryptography.hazmat.primitives.asymmetric import rsa
 from fastapi import FastAPI
 from filelock import FileLock
 from httpx import ASGITransport, AsyncClient
+from jwt.algorithms import RSAAlgorithm
 from meldingen_core.malware import BaseMalwareScanner
 from pdok_api_client.api.locatieserver_api import LocatieserverApi as PDOKApiInstance
 from pytest import FixtureRequest
@@ -25,14 +27,16 @@ from meldingen.database import DatabaseSessionManager as BaseDatabaseSessionMana
 from meldingen.dependencies import (
     address_api_instance,
     azure_container_client,
+    classification_prompt_cache,
     database_engine,
     database_session,
     database_session_manager,
+    jwks_key_store,
     malware_scanner,
-    public_id_generator,
+    primary_form_snapshot,
+    read_only_database_session,
     wfs_provider_validator,
 )
-from meldingen.generators import PublicIdGenerator
 from meldingen.main import get_application
 from meldingen.models import BaseDBModel, User
 
@@ -136,9 +140,35 @@ def app() -> FastAPI:
     return get_application()
 
 
+@pytest.fixture(scope="session")
+def jwk_set() -> dict[str, Any]:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk: dict[str, Any] = RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    jwk["kid"] = "test-key"
+    jwk["use"] = "sig"
+
+    return {"keys": [jwk]}
+
+
+@pytest.fixture
+def jwks_fetch(jwk_set: dict[str, Any], monkeypatch: pytest.MonkeyPatch) -> AsyncMock:
+    """The key set is fetched at startup, this keeps the tests from reaching out to the identity provider."""
+    fetch = AsyncMock(return_value=jwk_set)
+    monkeypatch.setattr(jwks_key_store(), "_fetch", fetch)
+
+    return fetch
+
+
 @pytest.fixture
-async def client(app: FastAPI, test_database: None, override_dependencies: None) -> AsyncGenerator[AsyncClient, None]:
+async def client(
+    app: FastAPI, test_database: None, override_dependencies: None, jwks_fetch: AsyncMock
+) -> AsyncGenerator[AsyncClient, None]:
     async with LifespanManager(app):
+        # These are kept for the whole process, the snapshot is even loaded at startup from the configured database,
+        # while the tests read their own data that is rolled back after every test
+        primary_form_snapshot().invalidate()
+        classification_prompt_cache().invalidate()
+
         async with AsyncClient(
             transport=ASGITransport(app=app, raise_app_exceptions=False),
             base_url="http://testserver",
@@ -215,6 +245,7 @@ async def override_dependencies(
     app.dependency_overrides.update(
         {
             database_session: db_session_override,
+            read_only_database_session: db_session_override,
             database_engine: db_engine_override,
             database_session_manager: db_manager_override,
             wfs_provider_validator: mock_wfs_validator,
@@ -278,17 +309,6 @@ def malware_scanner_override(app: FastAPI) -> None:
     app.dependency_overrides[malware_scanner] = test_malware_scanner
 
 
-@pytest.fixture
-def public_id_generator_override(app: FastAPI) -> None:
-    generator = Mock(PublicIdGenerator)
-    generator.side_effect = ["PUBMEL", "MELPUB"]
-
-    def test_public_id_generator() -> PublicIdGenerator:
-        return generator
-
-    app.dependency_overrides[public_id_generator] = test_public_id_generator
-
-
 @pytest.fixture(scope="session")
 def anyio_backend() -> str:
     return "asyncio"
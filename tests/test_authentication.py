@@ -1,3 +1,5 @@
+import time
+from datetime import datetime
 from unittest.mock import Mock
 
 import pytest
@@ -7,7 +9,6 @@ from jwt import (
     InvalidAudienceError,
     InvalidIssuerError,
     MissingRequiredClaimError,
-    PyJWKClient,
     PyJWT,
 )
 from sqlalchemy.exc import NoResultFound
@@ -18,7 +19,9 @@ from meldingen.authentication import (
     UnauthenticatedException,
     authenticate_user,
 )
+from meldingen.jwks import JWKSKeyStore, SigningKeyNotFoundException
 from meldingen.models import User
+from meldingen.principals import UserSnapshot, VerifiedPrincipalCache
 from meldingen.repositories import UserRepository
 
 
@@ -28,7 +31,9 @@ async def test_get_user_token_expired(app: FastAPI) -> None:
     py_jwt_mock.decode.side_effect = ExpiredSignatureError()
 
     with pytest.raises(InvalidTokenException) as exc_info:
-        await authenticate_user("123456789", Mock(PyJWKClient), py_jwt_mock, Mock(UserRepository))
+        await authenticate_user(
+            "123456789", Mock(JWKSKeyStore), py_jwt_mock, Mock(UserRepository), Mock(VerifiedPrincipalCache)
+        )
 
     assert exc_info.value.detail == "invalid_token"
 
@@ -39,7 +44,9 @@ async def test_get_user_token_invalid_issuer(app: FastAPI) -> None:
     py_jwt_mock.decode.side_effect = InvalidIssuerError()
 
     with pytest.raises(InvalidTokenException) as exc_info:
-        await authenticate_user("123456789", Mock(PyJWKClient), py_jwt_mock, Mock(UserRepository))
+        await authenticate_user(
+            "123456789", Mock(JWKSKeyStore), py_jwt_mock, Mock(UserRepository), Mock(VerifiedPrincipalCache)
+        )
 
     assert exc_info.value.detail == "invalid_token"
 
@@ -50,7 +57,9 @@ async def test_get_user_token_invalid_audience(app: FastAPI) -> None:
     py_jwt_mock.decode.side_effect = InvalidAudienceError()
 
     with pytest.raises(InvalidTokenException) as exc_info:
-        await authenticate_user("123456789", Mock(PyJWKClient), py_jwt_mock, Mock(UserRepository))
+        await authenticate_user(
+            "123456789", Mock(JWKSKeyStore), py_jwt_mock, Mock(UserRepository), Mock(VerifiedPrincipalCache)
+        )
 
     assert exc_info.value.detail == "invalid_token"
 
@@ -61,7 +70,9 @@ async def test_get_user_token_missing_claim(app: FastAPI) -> None:
     py_jwt_mock.decode.side_effect = MissingRequiredClaimError(claim="email")
 
     with pytest.raises(InvalidRequestException) as exc_info:
-        await authenticate_user("123456789", Mock(PyJWKClient), py_jwt_mock, Mock(UserRepository))
+        await authenticate_user(
+            "123456789", Mock(JWKSKeyStore), py_jwt_mock, Mock(UserRepository), Mock(VerifiedPrincipalCache)
+        )
 
     assert exc_info.value.detail == "invalid_request"
 
@@ -69,13 +80,53 @@ async def test_get_user_token_missing_claim(app: FastAPI) -> None:
 @pytest.mark.anyio
 async def test_get_user(app: FastAPI) -> None:
     py_jwt_mock = Mock(PyJWT)
-    py_jwt_mock.decode.return_value = {"email": "user@example.com"}
+    py_jwt_mock.decode.return_value = {"email": "user@example.com", "exp": time.time() + 300}
 
     test_user = User(email="user@example.com", username="user")
+    test_user.id = 1
+    test_user.created_at = test_user.updated_at = datetime.now()
 
     user_repository = Mock(UserRepository)
     user_repository.find_by_email_or_create.return_value = test_user
+    principal_cache = VerifiedPrincipalCache(10, 60)
 
-    user = await authenticate_user("123456789", Mock(PyJWKClient), py_jwt_mock, user_repository)
+    user = await authenticate_user("123456789", Mock(JWKSKeyStore), py_jwt_mock, user_repository, principal_cache)
 
     assert user == test_user
+    snapshot = principal_cache.get("user@example.com")
+    assert snapshot is not None
+    assert snapshot.id == 1
+
+
+@pytest.mark.anyio
+async def test_get_user_from_principal_cache(app: FastAPI) -> None:
+    py_jwt_mock = Mock(PyJWT)
+    py_jwt_mock.decode.return_value = {"email": "user@example.com", "exp": time.time() + 300}
+
+    now = datetime.now()
+    snapshot = UserSnapshot(id=1, email="user@example.com", username="user", created_at=now, updated_at=now, groups=())
+    principal_cache = VerifiedPrincipalCache(10, 60)
+    principal_cache.put("user@example.com", snapshot, time.time() + 300)
+
+    test_user = User(email="user@example.com", username="user")
+    user_repository = Mock(UserRepository)
+    user_repository.merge_snapshot.return_value = test_user
+
+    user = await authenticate_user("123456789", Mock(JWKSKeyStore), py_jwt_mock, user_repository, principal_cache)
+
+    assert user == test_user
+    user_repository.merge_snapshot.assert_awaited_once_with(snapshot)
+    user_repository.find_by_email_or_create.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_get_user_signing_key_not_found(app: FastAPI) -> None:
+    jwks_key_store = Mock(JWKSKeyStore)
+    jwks_key_store.get_signing_key_from_jwt.side_effect = SigningKeyNotFoundException()
+
+    with pytest.raises(InvalidTokenException) as exc_info:
+        await authenticate_user(
+            "123456789", jwks_key_store, Mock(PyJWT), Mock(UserRepository), Mock(VerifiedPrincipalCache)
+        )
+
+    assert exc_info.value.detail == "invalid_token"
@@ -1,9 +1,18 @@
+import time
 from unittest.mock import AsyncMock, Mock
 
 import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from meldingen.classification import build_classification_prompt, build_dynamic_classification_response_model
-from meldingen.repositories import ClassificationRepository
+from meldingen.classification import (
+    ClassificationPrompt,
+    ClassificationPromptCache,
+    ClassificationResultCache,
+    ClassificationResultHits,
+)
+from meldingen.models import ClassificationResultHit, Melding
+from meldingen.repositories import ClassificationRepository, ClassificationResultRepository
 
 
 def _make_classification(name: str, instructions: str | None = None) -> Mock:
@@ -14,7 +23,7 @@ def _make_classification(name: str, instructions: str | None = None) -> Mock:
 
 
 @pytest.mark.anyio
-async def test_build_classification_prompt_with_instructions() -> None:
+async def test_classification_prompt_text_with_instructions() -> None:
     repository = Mock(ClassificationRepository)
     repository.list = AsyncMock(
         return_value=[
@@ -23,14 +32,14 @@ async def test_build_classification_prompt_with_instructions() -> None:
         ]
     )
 
-    prompt = await build_classification_prompt(repository)
+    prompt = (await ClassificationPrompt.build(repository)).text
 
     assert "- **Zwerfvuil**: Meldingen over rondslingerend afval" in prompt
     assert "- **Straatverlichting**: Kapotte of niet werkende lantaarns" in prompt
 
 
 @pytest.mark.anyio
-async def test_build_classification_prompt_without_instructions() -> None:
+async def test_classification_prompt_text_without_instructions() -> None:
     repository = Mock(ClassificationRepository)
     repository.list = AsyncMock(
         return_value=[
@@ -38,14 +47,14 @@ async def test_build_classification_prompt_without_instructions() -> None:
         ]
     )
 
-    prompt = await build_classification_prompt(repository)
+    prompt = (await ClassificationPrompt.build(repository)).text
 
     assert "- **Groenvoorziening**" in prompt
     assert "- **Groenvoorziening**:" not in prompt
 
 
 @pytest.mark.anyio
-async def test_build_classification_prompt_mixed() -> None:
+async def test_classification_prompt_text_mixed() -> None:
     repository = Mock(ClassificationRepository)
     repository.list = AsyncMock(
         return_value=[
@@ -54,7 +63,7 @@ async def test_build_classification_prompt_mixed() -> None:
         ]
     )
 
-    prompt = await build_classification_prompt(repository)
+    prompt = (await ClassificationPrompt.build(repository)).text
 
     assert "- **Zwerfvuil**: Rondslingerend afval" in prompt
     assert "- **Groenvoorziening**" in prompt
@@ -62,7 +71,7 @@ async def test_build_classification_prompt_mixed() -> None:
 
 
 @pytest.mark.anyio
-async def test_build_dynamic_classification_response_model_accepts_valid_name() -> None:
+async def test_classification_prompt_response_model_accepts_valid_name() -> None:
     repository = Mock(ClassificationRepository)
     repository.list = AsyncMock(
         return_value=[
@@ -71,14 +80,14 @@ async def test_build_dynamic_classification_response_model_accepts_valid_name()
         ]
     )
 
-    model = await build_dynamic_classification_response_model(repository)
+    model = (await ClassificationPrompt.build(repository)).response_model
     instance = model(classification="Zwerfvuil")
 
     assert getattr(instance, "classification") == "Zwerfvuil"
 
 
 @pytest.mark.anyio
-async def test_build_dynamic_classification_response_model_rejects_invalid_name() -> None:
+async def test_classification_prompt_response_model_rejects_invalid_name() -> None:
     repository = Mock(ClassificationRepository)
     repository.list = AsyncMock(
         return_value=[
@@ -87,7 +96,206 @@ async def test_build_dynamic_classification_response_model_rejects_invalid_name(
         ]
     )
 
-    model = await build_dynamic_classification_response_model(repository)
+    model = (await ClassificationPrompt.build(repository)).response_model
 
     with pytest.raises(Exception):
         model(classification="Onbekend")
+
+
+def _repository(*names: str) -> Mock:
+    repository = Mock(ClassificationRepository)
+    repository.list = AsyncMock(return_value=[_make_classification(name) for name in names])
+    return repository
+
+
+@pytest.mark.anyio
+async def test_classification_prompt_cache_builds_the_prompt_once() -> None:
+    cache = ClassificationPromptCache(max_age=60)
+    repository = _repository("Zwerfvuil", "Straatverlichting")
+
+    first = await cache.get(repository)
+    second = await cache.get(repository)
+
+    assert first is second
+    assert "- **Zwerfvuil**" in first.text
+    assert first.response_model(classification="Straatverlichting")
+    assert repository.list.await_count == 1
+
+
+@pytest.mark.anyio
+async def test_classification_prompt_cache_invalidate() -> None:
+    cache = ClassificationPromptCache(max_age=60)
+    repository = _repository("Zwerfvuil")
+
+    await cache.get(repository)
+    cache.invalidate()
+    repository.list.return_value = [_make_classification("Groenvoorziening")]
+    prompt = await cache.get(repository)
+
+    assert "- **Groenvoorziening**" in prompt.text
+    assert "Zwerfvuil" not in prompt.text
+    assert cache.version == 1
+    assert repository.list.await_count == 2
+
+
+@pytest.mark.anyio
+async def test_classification_prompt_cache_disabled() -> None:
+    cache = ClassificationPromptCache(max_age=0)
+    repository = _repository("Zwerfvuil")
+
+    await cache.get(repository)
+    await cache.get(repository)
+
+    assert repository.list.await_count == 2
+
+
+@pytest.mark.parametrize("text", ["Grofvuil", "  grofvuil.", "GROFVUIL!", "grofvuil\n"])
+def test_classification_result_cache_normalize(text: str) -> None:
+    assert ClassificationResultCache.normalize(text) == "grofvuil"
+
+
+@pytest.mark.anyio
+async def test_classification_result_cache_key() -> None:
+    prompt = await ClassificationPrompt.build(_repository("Zwerfvuil"))
+    other_prompt = await ClassificationPrompt.build(_repository("Zwerfvuil", "Grofvuil"))
+
+    key = ClassificationResultCache.key("grofvuil", "gpt-5-mini", "low", prompt)
+
+    assert key == ClassificationResultCache.key("grofvuil", "gpt-5-mini", "low", prompt)
+    assert key != ClassificationResultCache.key("grofvuil", "gpt-5-mini", "high", prompt)
+    assert key != ClassificationResultCache.key("grofvuil", "gpt-4o", None, prompt)
+    assert key != ClassificationResultCache.key("grofvuil", "gpt-5-mini", "low", other_prompt)
+
+
+@pytest.fixture
+def result_repository() -> Mock:
+    repository = Mock(ClassificationResultRepository)
+    repository.find_unexpired = AsyncMock(return_value=None)
+    repository.store = AsyncMock(return_value=(1, "Grofvuil", 60.0))
+    repository.record_hits = AsyncMock()
+    return repository
+
+
+@pytest.mark.anyio
+async def test_classification_result_cache_miss(result_repository: Mock) -> None:
+    cache = ClassificationResultCache(max_size=10, ttl=60)
+
+    assert await cache.get(result_repository, "key") is None
+
+
+@pytest.mark.anyio
+async def test_classification_result_cache_reuses_stored_result_without_query(result_repository: Mock) -> None:
+    cache = ClassificationResultCache(max_size=10, ttl=60)
+    prompt = await ClassificationPrompt.build(_repository("Grofvuil"))
+
+    await cache.put(result_repository, "key", "grofvuil", "gpt-5-mini", "low", prompt, "Grofvuil")
+
+    assert await cache.get(result_repository, "key") == (1, "Grofvuil")
+    result_repository.find_unexpired.assert_not_awaited()
+
+
+@pytest.mark.anyio
+async def test_classification_result_cache_keeps_the_result_stored_by_another_request(
+    result_repository: Mock,
+) -> None:
+    result_repository.store = AsyncMock(return_value=(3, "Zwerfvuil", 60.0))
+    cache = ClassificationResultCache(max_size=10, ttl=60)
+    prompt = await ClassificationPrompt.build(_repository("Grofvuil", "Zwerfvuil"))
+
+    await cache.put(result_repository, "key", "grofvuil", "gpt-5-mini", "low", prompt, "Grofvuil")
+
+    assert await cache.get(result_repository, "key") == (3, "Zwerfvuil")
+
+
+@pytest.mark.anyio
+async def test_classification_result_cache_reuses_result_from_the_database(result_repository: Mock) -> None:
+    result_repository.find_unexpired = AsyncMock(return_value=(7, "Grofvuil", 60.0))
+    cache = ClassificationResultCache(max_size=10, ttl=60)
+
+    assert await cache.get(result_repository, "key") == (7, "Grofvuil")
+    assert await cache.get(result_repository, "key") == (7, "Grofvuil")
+
+    result_repository.find_unexpired.assert_awaited_once_with("key")
+
+
+@pytest.mark.anyio
+async def test_classification_result_cache_expires_with_the_result_in_the_database(
+    result_repository: Mock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    result_repository.find_unexpired = AsyncMock(return_value=(7, "Grofvuil", 5.0))
+    cache = ClassificationResultCache(max_size=10, ttl=60)
+
+    await cache.get(result_repository, "key")
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+    await cache.get(result_repository, "key")
+
+    assert result_repository.find_unexpired.await_count == 2
+
+
+@pytest.mark.anyio
+async def test_classification_result_cache_disabled(result_repository: Mock) -> None:
+    cache = ClassificationResultCache(max_size=10, ttl=0)
+    prompt = await ClassificationPrompt.build(_repository("Grofvuil"))
+
+    await cache.put(result_repository, "key", "grofvuil", "gpt-5-mini", "low", prompt, "Grofvuil")
+
+    assert await cache.get(result_repository, "key") is None
+    result_repository.store.assert_not_awaited()
+    result_repository.find_unexpired.assert_not_awaited()
+
+
+@pytest.mark.anyio
+async def test_classification_result_hits_are_recorded_once(result_repository: Mock) -> None:
+    hits = ClassificationResultHits(result_repository)
+    hits.add(1, "grofvuil", "Grofvuil")
+
+    await hits.record(42)
+    await hits.record(42)
+
+    result_repository.record_hits.assert_awaited_once_with(42, [(1, "grofvuil", "Grofvuil")])
+
+
+@pytest.mark.anyio
+async def test_classification_result_hits_failing_to_record_does_not_raise(result_repository: Mock) -> None:
+    result_repository.record_hits = AsyncMock(side_effect=Exception("Connection lost"))
+    hits = ClassificationResultHits(result_repository)
+    hits.add(1, "grofvuil", "Grofvuil")
+
+    await hits.record(42)
+
+
+@pytest.mark.anyio
+async def test_classification_result_store_keeps_an_unexpired_result(
+    db_session: AsyncSession, test_database: None
+) -> None:
+    repository = ClassificationResultRepository(db_session)
+
+    stored = await repository.store("key", "grofvuil", "gpt-5-mini", None, "set", "Grofvuil", 60)
+    assert stored is not None
+
+    result = await repository.store("key", "grofvuil", "gpt-5-mini", None, "set", "Zwerfvuil", 60)
+
+    assert result == stored
+    assert result[1] == "Grofvuil"
+    assert result[2] == pytest.approx(60)
+
+
+@pytest.mark.anyio
+async def test_classification_result_hits_of_a_deleted_result_are_recorded(
+    db_session: AsyncSession, test_database: None
+) -> None:
+    repository = ClassificationResultRepository(db_session)
+    melding = Melding(text="Er ligt grofvuil")
+    melding.public_id = "HIT001"
+    db_session.add(melding)
+    await db_session.commit()
+
+    stored = await repository.store("key", "grofvuil", "gpt-5-mini", None, "set", "Grofvuil", -1)
+    assert stored is not None
+    assert await repository.delete_batch_expired(10) == 1
+
+    await repository.record_hits(melding.id, [(stored[0], "grofvuil", "Grofvuil")])
+
+    result = await db_session.execute(select(ClassificationResultHit.result_id, ClassificationResultHit.melding_id))
+    assert result.tuples().all() == [(None, melding.id)]
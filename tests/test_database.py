@@ -0,0 +1,145 @@
+import sqlite3
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from meldingen import database
+from meldingen.database import DatabaseReplica, MeteredAsyncAdaptedQueuePool, invalidate_after_commit
+from meldingen.dependencies import read_only_database_session
+from meldingen.models import Classification, Source
+
+
+@pytest.mark.anyio
+async def test_metered_pool_records_checkout_wait_and_connections_in_use(monkeypatch: pytest.MonkeyPatch) -> None:
+    checkout_wait = Mock()
+    connections_in_use = Mock()
+    monkeypatch.setattr(database.pool_checkout_wait, "record", checkout_wait)
+    monkeypatch.setattr(database.pool_connections_in_use, "add", connections_in_use)
+
+    pool = MeteredAsyncAdaptedQueuePool(lambda: sqlite3.connect(":memory:"), pool_size=1)
+    connection = pool.connect()
+    connection.close()
+
+    checkout_wait.assert_called_once()
+    assert [call.args[0] for call in connections_in_use.call_args_list] == [1, -1]
+
+
+@pytest.mark.anyio
+async def test_metered_pool_does_not_duplicate_listeners_when_recreated(monkeypatch: pytest.MonkeyPatch) -> None:
+    connections_in_use = Mock()
+    monkeypatch.setattr(database.pool_connections_in_use, "add", connections_in_use)
+
+    pool = MeteredAsyncAdaptedQueuePool(lambda: sqlite3.connect(":memory:"), pool_size=1).recreate()
+    connection = pool.connect()
+    connection.close()
+
+    assert [call.args[0] for call in connections_in_use.call_args_list] == [1, -1]
+
+
+def _replica(
+    lag: float | None | Exception, max_lag: float = 5, check_interval: float = 5
+) -> tuple[DatabaseReplica, Mock]:
+    connection = AsyncMock()
+    if isinstance(lag, Exception):
+        connection.scalar.side_effect = lag
+    else:
+        connection.scalar.return_value = lag
+
+    engine = MagicMock()
+    engine.connect.return_value.__aenter__.return_value = connection
+
+    return DatabaseReplica(engine, max_lag, check_interval), connection.scalar
+
+
+@pytest.mark.anyio
+async def test_database_replica_is_available_when_in_sync() -> None:
+    replica, scalar = _replica(0.5)
+
+    assert await replica.is_available() is True
+    assert await replica.is_available() is True
+    scalar.assert_awaited_once()
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("lag", [30.0, None, Exception("Connection refused")])
+async def test_database_replica_is_unavailable_when_lagging_or_unreachable(lag: float | None | Exception) -> None:
+    replica, _ = _replica(lag)
+
+    assert await replica.is_available() is False
+
+
+@pytest.mark.anyio
+async def test_database_replica_is_checked_again_after_interval() -> None:
+    replica, scalar = _replica(30.0, check_interval=0)
+
+    assert await replica.is_available() is False
+
+    scalar.side_effect = None
+    scalar.return_value = 0
+
+    assert await replica.is_available() is True
+    assert scalar.await_count == 2
+
+
+@pytest.mark.anyio
+async def test_read_only_database_session_reuses_the_primary_session_without_replica() -> None:
+    session = Mock()
+
+    assert [read_session async for read_session in read_only_database_session(session, None)] == [session]
+
+
+@pytest.mark.anyio
+async def test_read_only_database_session_reuses_the_primary_session_when_replica_is_unavailable() -> None:
+    session = Mock()
+    replica, _ = _replica(30.0)
+
+    assert [read_session async for read_session in read_only_database_session(session, replica)] == [session]
+
+
+@pytest.mark.anyio
+async def test_invalidate_after_commit_only_after_committed_changes(
+    db_session: AsyncSession, test_database: None
+) -> None:
+    invalidate = Mock()
+    stop = invalidate_after_commit((Classification,), invalidate)
+
+    try:
+        db_session.add(Classification(name="Afval"))
+        await db_session.flush()
+        invalidate.assert_not_called()
+
+        await db_session.rollback()
+        await db_session.commit()
+        invalidate.assert_not_called()
+
+        db_session.add(Classification(name="Afval"))
+        await db_session.commit()
+        invalidate.assert_called_once()
+    finally:
+        stop()
+
+
+@pytest.mark.anyio
+async def test_invalidate_after_commit_only_the_matching_invalidations(
+    db_session: AsyncSession, test_database: None
+) -> None:
+    classification_changed = Mock()
+    source_changed = Mock()
+    stopped = Mock()
+    stops = [
+        invalidate_after_commit((Classification,), classification_changed),
+        invalidate_after_commit((Source,), source_changed),
+    ]
+    invalidate_after_commit((Classification,), stopped)()
+
+    try:
+        db_session.add(Classification(name="Afval"))
+        await db_session.commit()
+    finally:
+        for stop in stops:
+            stop()
+
+    classification_changed.assert_called_once()
+    source_changed.assert_not_called()
+    stopped.assert_not_called()
@@ -0,0 +1,127 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any
+
+import pytest
+
+from meldingen.export import (
+    CSVMeldingExportSerializer,
+    GeoJSONMeldingExportSerializer,
+    NDJSONMeldingExportSerializer,
+    buffered,
+)
+
+
+def _row(melding_id: int, geo_location: str | None = None, labels: list[str] | None = None) -> dict[str, Any]:
+    return {
+        "id": melding_id,
+        "public_id": f"MELDI{melding_id}",
+        "text": "Er ligt poep op de stoep.",
+        "state": "submitted",
+        "urgency": 0,
+        "classification": "Afval",
+        "source": None,
+        "labels": labels,
+        "street": "Amstel",
+        "house_number": 1,
+        "house_number_addition": None,
+        "postal_code": "1011PN",
+        "city": "Amsterdam",
+        "email": None,
+        "phone": None,
+        "created_at": datetime(2025, 1, 1, 12, 0, 0),
+        "updated_at": datetime(2025, 1, 2, 12, 0, 0),
+        "geo_location": geo_location,
+    }
+
+
+async def _rows(*rows: dict[str, Any]) -> AsyncIterator[dict[str, Any]]:
+    for row in rows:
+        yield row
+
+
+async def _join(chunks: AsyncIterator[str]) -> str:
+    return "".join([chunk async for chunk in chunks])
+
+
+POINT = '{"type":"Point","coordinates":[4.9,52.37]}'
+
+
+@pytest.mark.anyio
+async def test_ndjson_export() -> None:
+    output = await _join(NDJSONMeldingExportSerializer()(_rows(_row(1, POINT, ["Klacht"]), _row(2))))
+
+    lines = output.splitlines()
+    assert len(lines) == 2
+
+    first = json.loads(lines[0])
+    assert first["public_id"] == "MELDI1"
+    assert first["labels"] == ["Klacht"]
+    assert first["created_at"] == "2025-01-01T12:00:00Z"
+    assert first["geo_location"] == {"type": "Point", "coordinates": [4.9, 52.37]}
+    assert json.loads(lines[1])["geo_location"] is None
+
+
+@pytest.mark.anyio
+async def test_csv_export() -> None:
+    output = await _join(CSVMeldingExportSerializer()(_rows(_row(1, POINT, ["Klacht", "Melding"]), _row(2))))
+
+    rows = list(csv.DictReader(io.StringIO(output)))
+
+    assert len(rows) == 2
+    assert rows[0]["labels"] == "Klacht, Melding"
+    assert (rows[0]["longitude"], rows[0]["latitude"]) == ("4.9", "52.37")
+    assert (rows[1]["longitude"], rows[1]["latitude"]) == ("", "")
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("text", ['=HYPERLINK("https://example.com")', "+31", "-1+1", "@SUM(A1)", "\tA", "\rA"])
+async def test_csv_export_escapes_formulas(text: str) -> None:
+    row = {**_row(1), "text": text, "street": text}
+
+    output = await _join(CSVMeldingExportSerializer()(_rows(row)))
+
+    exported = next(csv.DictReader(io.StringIO(output)))
+    assert exported["text"] == "'" + text
+    assert exported["street"] == "'" + text
+    assert exported["house_number"] == "1"
+
+
+@pytest.mark.anyio
+async def test_csv_export_keeps_phone_numbers() -> None:
+    row = {**_row(1), "phone": "+31612345678"}
+
+    output = await _join(CSVMeldingExportSerializer()(_rows(row)))
+
+    assert next(csv.DictReader(io.StringIO(output)))["phone"] == "+31612345678"
+
+
+@pytest.mark.anyio
+async def test_geojson_export() -> None:
+    output = await _join(GeoJSONMeldingExportSerializer()(_rows(_row(1, POINT), _row(2))))
+
+    collection = json.loads(output)
+
+    assert collection["type"] == "FeatureCollection"
+    assert [feature["id"] for feature in collection["features"]] == [1, 2]
+    assert collection["features"][0]["geometry"]["type"] == "Point"
+    assert collection["features"][0]["properties"]["state"] == "submitted"
+
+
+@pytest.mark.anyio
+async def test_geojson_export_empty() -> None:
+    output = await _join(GeoJSONMeldingExportSerializer()(_rows()))
+
+    assert json.loads(output) == {"type": "FeatureCollection", "features": []}
+
+
+@pytest.mark.anyio
+async def test_buffered_passes_first_chunk_and_joins_the_rest() -> None:
+    async def chunks() -> AsyncIterator[str]:
+        for chunk in ["header", "a", "b", "c", "d", "e"]:
+            yield chunk
+
+    assert [chunk async for chunk in buffered(chunks(), size=2)] == ["header", "ab", "cd", "e"]
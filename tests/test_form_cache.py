@@ -0,0 +1,112 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import pytest
+from fastapi import HTTPException
+
+from meldingen.form_cache import FormOutputCache
+
+
+@pytest.mark.anyio
+async def test_get_caches_the_output() -> None:
+    cache = FormOutputCache("form", max_size=10, ttl=60)
+    calls = 0
+
+    async def produce() -> bytes:
+        nonlocal calls
+        calls += 1
+        return b"{}"
+
+    assert await cache.get(1, produce) == b"{}"
+    assert await cache.get(1, produce) == b"{}"
+    assert calls == 1
+
+    cache.invalidate()
+
+    assert await cache.get(1, produce) == b"{}"
+    assert calls == 2
+    assert cache.version == 1
+
+
+@pytest.mark.anyio
+async def test_concurrent_misses_are_coalesced() -> None:
+    cache = FormOutputCache("form", max_size=10, ttl=60)
+    release = asyncio.Event()
+    calls = 0
+
+    async def produce() -> bytes:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return b"{}"
+
+    tasks = [asyncio.create_task(cache.get(1, produce)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == [b"{}"] * 5
+    assert calls == 1
+
+
+@pytest.mark.anyio
+async def test_exceptions_are_shared_and_not_cached() -> None:
+    cache = FormOutputCache("form", max_size=10, ttl=60)
+    release = asyncio.Event()
+    calls = 0
+
+    async def produce() -> bytes:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        raise HTTPException(status_code=404)
+
+    tasks = [asyncio.create_task(cache.get(1, produce)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(result, HTTPException) for result in results)
+    assert calls == 1
+
+    with pytest.raises(HTTPException):
+        await cache.get(1, produce)
+    assert calls == 2
+
+
+@pytest.mark.anyio
+async def test_output_produced_during_an_invalidation_is_not_cached() -> None:
+    cache = FormOutputCache("form", max_size=10, ttl=60)
+    calls = 0
+
+    async def produce() -> bytes:
+        nonlocal calls
+        calls += 1
+        cache.invalidate()
+        return b"{}"
+
+    await cache.get(1, produce)
+    await cache.get(1, produce)
+
+    assert calls == 2
+
+
+@pytest.mark.anyio
+async def test_least_recently_used_output_is_evicted() -> None:
+    cache = FormOutputCache("form", max_size=2, ttl=60)
+    calls: list[int] = []
+
+    def producer(key: int) -> Callable[[], Awaitable[bytes]]:
+        async def produce() -> bytes:
+            calls.append(key)
+            return str(key).encode()
+
+        return produce
+
+    await cache.get(1, producer(1))
+    await cache.get(2, producer(2))
+    await cache.get(1, producer(1))
+    await cache.get(3, producer(3))
+    await cache.get(1, producer(1))
+    await cache.get(2, producer(2))
+
+    assert calls == [1, 2, 3, 2]
@@ -1,22 +1,80 @@
-from meldingen.generators import PublicIdGenerator
+from unittest.mock import AsyncMock, Mock
 
+import pytest
+from pydantic import ValidationError
 
-def test_public_id_generator() -> None:
-    generator = PublicIdGenerator("a")
+from meldingen.config import Settings
+from meldingen.generators import PUBLIC_ID_ALPHABET, PublicIdAllocator, PublicIdPermutation
+from meldingen.repositories import MeldingRepository
 
-    alphabet = generator()
 
-    assert generator._alphabet == "a"
+def test_public_id_permutation_is_one_to_one() -> None:
+    permutation = PublicIdPermutation("key", alphabet="AB", length=8)
 
-    assert len(alphabet) == 6
-    assert alphabet == "aaaaaa"
+    public_ids = [permutation.encode(number) for number in range(permutation.size)]
 
+    assert permutation.size == 256
+    assert len(set(public_ids)) == 256
+    assert all(len(public_id) == 8 and set(public_id) <= {"A", "B"} for public_id in public_ids)
+    assert [permutation.decode(public_id) for public_id in public_ids] == list(range(256))
 
-def test_public_id_generator_no_arguments() -> None:
-    generator = PublicIdGenerator()
 
-    alphabet = generator()
+def test_public_id_permutation_defaults() -> None:
+    permutation = PublicIdPermutation("key")
 
-    assert generator._alphabet == "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+    public_id = permutation.encode(0)
 
-    assert len(alphabet) == 6
+    assert permutation.size == 36**6
+    assert len(public_id) == 6
+    assert set(public_id) <= set(PUBLIC_ID_ALPHABET)
+    assert permutation.decode(permutation.encode(permutation.size - 1)) == permutation.size - 1
+
+
+def test_public_id_permutation_depends_on_the_key() -> None:
+    numbers = range(100)
+
+    first = [PublicIdPermutation("key").encode(number) for number in numbers]
+    second = [PublicIdPermutation("other key").encode(number) for number in numbers]
+
+    assert first != second
+
+
+@pytest.mark.parametrize("number", [-1, 36**6])
+def test_public_id_permutation_number_out_of_range(number: int) -> None:
+    with pytest.raises(ValueError):
+        PublicIdPermutation("key").encode(number)
+
+
+def test_public_id_permutation_odd_length() -> None:
+    with pytest.raises(ValueError):
+        PublicIdPermutation("key", length=5)
+
+
+@pytest.mark.anyio
+async def test_public_id_allocator_reserves_blocks() -> None:
+    permutation = PublicIdPermutation("key")
+    repository = Mock(MeldingRepository)
+    repository.reserve_public_id_numbers = AsyncMock(side_effect=[[0, 1], [2, 3]])
+    repository.find_existing_public_ids = AsyncMock(return_value=set())
+    allocate = PublicIdAllocator(permutation, block_size=2)
+
+    public_ids = [await allocate(repository) for _ in range(3)]
+
+    assert public_ids == [permutation.encode(number) for number in range(3)]
+    assert repository.reserve_public_id_numbers.await_count == 2
+
+
+@pytest.mark.anyio
+async def test_public_id_allocator_skips_public_ids_that_are_taken() -> None:
+    permutation = PublicIdPermutation("key")
+    repository = Mock(MeldingRepository)
+    repository.reserve_public_id_numbers = AsyncMock(side_effect=[[0, 1], [2, 3]])
+    repository.find_existing_public_ids = AsyncMock(side_effect=[{permutation.encode(0), permutation.encode(1)}, set()])
+    allocate = PublicIdAllocator(permutation, block_size=2)
+
+    assert await allocate(repository) == permutation.encode(2)
+
+
+def test_settings_refuse_a_short_public_id_key() -> None:
+    with pytest.raises(ValidationError, match="melding_public_id_key"):
+        Settings(melding_public_id_key="000000")
@@ -3,12 +3,17 @@ from jsonlogic import JSONLogicSyntaxError
 from jsonlogic.registry import UnkownOperator as UnknownOperator
 from jsonlogic.resolving import DotReferenceParser
 
-from meldingen.jsonlogic import JSONLogicValidationException, JSONLogicValidator
+from meldingen.jsonlogic import JSONLogicExpressionCache, JSONLogicValidationException, JSONLogicValidator
 
 
 @pytest.fixture
-def jsonlogic_validator() -> JSONLogicValidator:
-    return JSONLogicValidator(DotReferenceParser())
+def expression_cache() -> JSONLogicExpressionCache:
+    return JSONLogicExpressionCache(max_size=2)
+
+
+@pytest.fixture
+def jsonlogic_validator(expression_cache: JSONLogicExpressionCache) -> JSONLogicValidator:
+    return JSONLogicValidator(DotReferenceParser(), expression_cache)
 
 
 def test_validation_fails_when_jsonlogic_evaluation_fails(jsonlogic_validator: JSONLogicValidator) -> None:
@@ -137,3 +142,38 @@ def test_two_length_operators(jsonlogic_validator: JSONLogicValidator) -> None:
     with pytest.raises(JSONLogicValidationException) as exc_max:
         jsonlogic_validator(logic, {"text": "ABCD"})
     assert exc_max.value.msg == "Too long"
+
+
+def test_compiled_rule_is_reused(
+    jsonlogic_validator: JSONLogicValidator, expression_cache: JSONLogicExpressionCache
+) -> None:
+    logic = '{"if": [{"==": [{"var": ["text"]},"Water"]}, true, "You must type \'Water\'!"]}'
+
+    jsonlogic_validator(logic, {"text": "Water"})
+    root_operator = expression_cache.get(logic)
+
+    with pytest.raises(JSONLogicValidationException) as exception_info:
+        jsonlogic_validator(logic, {"text": "Fire"})
+
+    assert exception_info.value.msg == "You must type 'Water'!"
+    assert expression_cache.get(logic) is root_operator
+    assert len(expression_cache) == 1
+
+
+def test_least_recently_used_rule_is_evicted(expression_cache: JSONLogicExpressionCache) -> None:
+    first = expression_cache.get('{">=":[1, 1]}')
+    expression_cache.get('{">=":[2, 1]}')
+    expression_cache.get('{">=":[1, 1]}')
+    expression_cache.get('{">=":[3, 1]}')
+
+    assert len(expression_cache) == 2
+    assert expression_cache.get('{">=":[1, 1]}') is first
+
+
+def test_rule_that_fails_to_compile_is_not_cached(
+    jsonlogic_validator: JSONLogicValidator, expression_cache: JSONLogicExpressionCache
+) -> None:
+    with pytest.raises(UnknownOperator):
+        jsonlogic_validator('{"non_existing_operator": [1, 1]}', {})
+
+    assert len(expression_cache) == 0
@@ -0,0 +1,108 @@
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+from meldingen.jwks import JWKSKeyStore, SigningKeyNotFoundException
+
+
+def _jwk(kid: str) -> dict[str, Any]:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk: dict[str, Any] = RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    jwk["kid"] = kid
+    jwk["use"] = "sig"
+
+    return jwk
+
+
+def _key_store(*kids: str, min_refresh_interval: float = 60) -> tuple[JWKSKeyStore, AsyncMock]:
+    key_store = JWKSKeyStore("http://identity-provider/certs", 3600, min_refresh_interval, 5)
+    fetch = AsyncMock(return_value={"keys": [_jwk(kid) for kid in kids]})
+    key_store._fetch = fetch  # type: ignore[method-assign]
+
+    return key_store, fetch
+
+
+@pytest.mark.anyio
+async def test_get_signing_key_uses_prefetched_keys() -> None:
+    key_store, fetch = _key_store("key-1")
+    await key_store.start()
+
+    try:
+        first = await key_store.get_signing_key("key-1")
+        second = await key_store.get_signing_key("key-1")
+    finally:
+        await key_store.stop()
+
+    assert first is second
+    assert first.key_id == "key-1"
+    fetch.assert_awaited_once()
+
+
+@pytest.mark.anyio
+async def test_get_signing_key_fetches_when_prefetch_failed() -> None:
+    key_store, fetch = _key_store("key-1", min_refresh_interval=0)
+    fetch.side_effect = [Exception("Identity provider unavailable"), {"keys": [_jwk("key-1")]}]
+    await key_store.start()
+
+    try:
+        key = await key_store.get_signing_key("key-1")
+    finally:
+        await key_store.stop()
+
+    assert key.key_id == "key-1"
+    assert fetch.await_count == 2
+
+
+@pytest.mark.anyio
+async def test_get_signing_key_retries_soon_when_prefetch_failed() -> None:
+    key_store, fetch = _key_store("key-1")
+    fetch.side_effect = [Exception("Identity provider unavailable"), {"keys": [_jwk("key-1")]}]
+    await key_store.start()
+
+    try:
+        assert key_store._last_refresh_attempt is not None
+        # Pretend the retry interval has passed, which is far shorter than the minimum refresh interval
+        key_store._last_refresh_attempt -= JWKSKeyStore.RETRY_INTERVAL_WITHOUT_KEYS
+        key = await key_store.get_signing_key("key-1")
+    finally:
+        await key_store.stop()
+
+    assert key.key_id == "key-1"
+    assert fetch.await_count == 2
+
+
+@pytest.mark.anyio
+async def test_get_signing_key_refreshes_on_unknown_kid() -> None:
+    key_store, fetch = _key_store("key-1", min_refresh_interval=0)
+    await key_store.refresh()
+    fetch.return_value = {"keys": [_jwk("key-1"), _jwk("key-2")]}
+
+    key = await key_store.get_signing_key("key-2")
+
+    assert key.key_id == "key-2"
+    assert fetch.await_count == 2
+
+
+@pytest.mark.anyio
+async def test_get_signing_key_unknown_kid_refresh_is_rate_limited() -> None:
+    key_store, fetch = _key_store("key-1")
+    await key_store.refresh()
+
+    for _ in range(3):
+        with pytest.raises(SigningKeyNotFoundException):
+            await key_store.get_signing_key("unknown")
+
+    fetch.assert_awaited_once()
+
+
+@pytest.mark.anyio
+async def test_get_signing_key_without_kid() -> None:
+    key_store, fetch = _key_store("key-1")
+
+    with pytest.raises(SigningKeyNotFoundException):
+        await key_store.get_signing_key(None)
+
+    fetch.assert_not_awaited()
@@ -5,6 +5,7 @@ from pydantic import ValidationError
 from pydantic_ai.models.openai import OpenAIChatModelSettings
 
 from meldingen.adapters.classification.agent_classifier import AgentClassifierAdapter
+from meldingen.classification import ClassificationResultCache
 from meldingen.config import Settings
 
 # ---------------------------------------------------------------------------
@@ -114,3 +115,39 @@ async def test_adapter_forwards_model_settings_to_run() -> None:
 
     assert result == "Zwerfvuil"
     assert agent.run.call_args.kwargs["model_settings"] == model_settings
+
+
+@pytest.mark.anyio
+async def test_adapter_reuses_the_classification_of_an_equal_text() -> None:
+    agent = MagicMock()
+    run_result = MagicMock()
+    run_result.output.classification = "Zwerfvuil"
+    agent.run = AsyncMock(return_value=run_result)
+
+    classification = MagicMock()
+    classification.name = "Zwerfvuil"
+    classification.instructions = None
+    repository = MagicMock()
+    repository.list = AsyncMock(return_value=[classification])
+    result_repository = MagicMock()
+    result_repository.find_unexpired = AsyncMock(return_value=None)
+    result_repository.store = AsyncMock(return_value=(1, "Zwerfvuil", 60.0))
+    result_hits = MagicMock()
+
+    model_settings = OpenAIChatModelSettings(openai_reasoning_effort="low")
+    adapter = AgentClassifierAdapter(
+        agent,
+        repository,
+        model_settings,
+        result_cache=ClassificationResultCache(max_size=10, ttl=60),
+        result_repository=result_repository,
+        result_hits=result_hits,
+    )
+
+    assert await adapter.classify("Er ligt afval op straat.") == "Zwerfvuil"
+    assert await adapter.classify("er ligt  afval op straat") == "Zwerfvuil"
+
+    agent.run.assert_awaited_once()
+    assert result_repository.store.await_args.args[1] == "er ligt afval op straat"
+    assert result_repository.store.await_args.args[3] == "low"
+    result_hits.add.assert_called_once_with(1, "er ligt afval op straat", "Zwerfvuil")
@@ -0,0 +1,24 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from asgi_lifespan import LifespanManager
+from fastapi import FastAPI
+
+from meldingen.dependencies import jwks_key_store, primary_form_snapshot
+
+
+@pytest.mark.anyio
+async def test_lifespan_starts_and_stops_the_key_store(
+    app: FastAPI, jwks_fetch: AsyncMock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    refresh = AsyncMock()
+    monkeypatch.setattr(primary_form_snapshot(), "refresh", refresh)
+    key_store = jwks_key_store()
+
+    async with LifespanManager(app):
+        jwks_fetch.assert_awaited_once()
+        refresh.assert_awaited_once()
+        assert key_store._refresh_task is not None
+
+    assert key_store._refresh_task is None
+    assert await key_store.get_signing_key("test-key") is not None
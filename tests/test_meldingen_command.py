@@ -0,0 +1,78 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from meldingen_core.statemachine import MeldingStates
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from commands.meldingen import DRAFT_MELDING_STATES
+from meldingen.models import Melding, melding_statistics
+from meldingen.repositories import MeldingRepository
+
+
+def _melding(public_id: str, state: str, token_expires: datetime) -> Melding:
+    melding = Melding(text=f"Melding {public_id}", state=state)
+    melding.public_id = public_id
+    melding.token_expires = token_expires
+    return melding
+
+
+@pytest.mark.anyio
+async def test_delete_batch_with_expired_token_and_in_states(db_session: AsyncSession, test_database: None) -> None:
+    expired = datetime.now() - timedelta(days=1)
+    drafts = [_melding(f"DRAFT{i}", MeldingStates.CLASSIFIED, expired) for i in range(5)]
+    submitted = _melding("SUBMIT", MeldingStates.SUBMITTED, expired)
+    active = _melding("ACTIVE", MeldingStates.NEW, datetime.now() + timedelta(days=1))
+    db_session.add_all([*drafts, submitted, active])
+    await db_session.commit()
+    draft_ids = {melding.id for melding in drafts}
+
+    repository = MeldingRepository(db_session)
+    batches = []
+    while ids := await repository.delete_batch_with_expired_token_and_in_states(DRAFT_MELDING_STATES, 2):
+        batches.append(ids)
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert {melding_id for batch in batches for melding_id in batch} == draft_ids
+
+    remaining = (await db_session.execute(select(Melding.public_id))).scalars().all()
+    assert set(remaining) == {"SUBMIT", "ACTIVE"}
+
+
+@pytest.mark.anyio
+async def test_rebuild_statistics_replaces_the_rows_with_a_fresh_count(
+    db_session: AsyncSession, test_database: None
+) -> None:
+    meldingen = [_melding(f"STATS{i}", MeldingStates.SUBMITTED, datetime.now()) for i in range(3)]
+    db_session.add_all(meldingen)
+    await db_session.commit()
+    meldingen[0].state = MeldingStates.COMPLETED
+    await db_session.commit()
+    # Get the table out of step with the meldingen
+    await db_session.execute(delete(melding_statistics))
+    await db_session.execute(insert(melding_statistics).values(day=date(2000, 1, 1), state=MeldingStates.NEW, count=7))
+    await db_session.commit()
+
+    rows = await MeldingRepository(db_session).rebuild_statistics()
+
+    statistics = (await db_session.execute(select(melding_statistics.c.state, melding_statistics.c.count))).all()
+    assert rows == 2
+    assert sorted(statistics) == [(MeldingStates.COMPLETED, 1), (MeldingStates.SUBMITTED, 2)]
+
+
+@pytest.mark.anyio
+async def test_compact_statistics_sums_the_rows_per_group(db_session: AsyncSession, test_database: None) -> None:
+    meldingen = [_melding(f"STATS{i}", MeldingStates.SUBMITTED, datetime.now()) for i in range(3)]
+    db_session.add_all(meldingen)
+    await db_session.commit()
+    meldingen[0].state = MeldingStates.PROCESSING
+    await db_session.commit()
+    meldingen[0].state = MeldingStates.COMPLETED
+    meldingen[1].state = MeldingStates.COMPLETED
+    await db_session.commit()
+
+    rows = await MeldingRepository(db_session).compact_statistics()
+
+    statistics = (await db_session.execute(select(melding_statistics.c.state, melding_statistics.c.count))).all()
+    assert rows == 2
+    assert sorted(statistics) == [(MeldingStates.COMPLETED, 2), (MeldingStates.SUBMITTED, 1)]
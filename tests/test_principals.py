@@ -0,0 +1,58 @@
+import time
+from datetime import datetime
+
+from meldingen.principals import UserSnapshot, VerifiedPrincipalCache
+
+
+def _snapshot(user_id: int, email: str) -> UserSnapshot:
+    now = datetime.now()
+    return UserSnapshot(id=user_id, email=email, username=email, created_at=now, updated_at=now, groups=())
+
+
+def test_verified_principal_cache_get_miss() -> None:
+    cache = VerifiedPrincipalCache(10, 60)
+
+    assert cache.get("user@example.com") is None
+
+
+def test_verified_principal_cache_put_and_get() -> None:
+    cache = VerifiedPrincipalCache(10, 60)
+    snapshot = _snapshot(1, "user@example.com")
+
+    cache.put("user@example.com", snapshot, time.time() + 300)
+
+    assert cache.get("user@example.com") == snapshot
+
+
+def test_verified_principal_cache_does_not_outlive_token() -> None:
+    cache = VerifiedPrincipalCache(10, 60)
+
+    cache.put("user@example.com", _snapshot(1, "user@example.com"), time.time() - 1)
+
+    assert cache.get("user@example.com") is None
+
+
+def test_verified_principal_cache_evicts_least_recently_used() -> None:
+    cache = VerifiedPrincipalCache(2, 60)
+    expires_at = time.time() + 300
+
+    cache.put("first@example.com", _snapshot(1, "first@example.com"), expires_at)
+    cache.put("second@example.com", _snapshot(2, "second@example.com"), expires_at)
+    cache.get("first@example.com")
+    cache.put("third@example.com", _snapshot(3, "third@example.com"), expires_at)
+
+    assert cache.get("first@example.com") is not None
+    assert cache.get("second@example.com") is None
+    assert cache.get("third@example.com") is not None
+
+
+def test_verified_principal_cache_invalidate_user() -> None:
+    cache = VerifiedPrincipalCache(10, 60)
+    expires_at = time.time() + 300
+
+    cache.put("first@example.com", _snapshot(1, "first@example.com"), expires_at)
+    cache.put("second@example.com", _snapshot(2, "second@example.com"), expires_at)
+    cache.invalidate_user(1)
+
+    assert cache.get("first@example.com") is None
+    assert cache.get("second@example.com") is not None
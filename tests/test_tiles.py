@@ -0,0 +1,81 @@
+import time
+
+import pytest
+from meldingen_core.statemachine import MeldingStates
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from meldingen.models import Melding
+from meldingen.tiles import VectorTileCache, _is_shown_on_tiles, cluster_cell_size, tile_buffer_in_meters
+
+
+def test_vector_tile_cache_key_ignores_state_order() -> None:
+    assert VectorTileCache.key(["processing", "submitted"], 1, 2, 3) == VectorTileCache.key(
+        ["submitted", "processing", "submitted"], 1, 2, 3
+    )
+
+
+def test_vector_tile_cache_put_and_get() -> None:
+    cache = VectorTileCache(10, 60)
+    key = VectorTileCache.key(["processing"], 10, 525, 336)
+
+    assert cache.get(key) is None
+
+    cache.put(key, b"tile")
+
+    assert cache.get(key) == b"tile"
+
+
+def test_vector_tile_cache_expires(monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = VectorTileCache(10, 60)
+    key = VectorTileCache.key(["processing"], 10, 525, 336)
+    cache.put(key, b"tile")
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+
+    assert cache.get(key) is None
+
+
+def test_vector_tile_cache_evicts_least_recently_used() -> None:
+    cache = VectorTileCache(2, 60)
+    first, second, third = (VectorTileCache.key(["processing"], 10, x, 336) for x in range(3))
+
+    cache.put(first, b"first")
+    cache.put(second, b"second")
+    cache.get(first)
+    cache.put(third, b"third")
+
+    assert cache.get(first) == b"first"
+    assert cache.get(second) is None
+    assert cache.get(third) == b"third"
+
+
+def test_tile_buffer_in_meters_halves_per_zoom_level() -> None:
+    assert tile_buffer_in_meters(11) == tile_buffer_in_meters(10) / 2
+
+
+def test_cluster_cell_size_is_square_on_the_map() -> None:
+    width, height = cluster_cell_size(0, 0)
+    assert width == height == 90
+
+    width, height = cluster_cell_size(10, 60)
+    assert height == pytest.approx(width / 2)
+
+
+@pytest.mark.anyio
+async def test_only_changes_to_meldingen_shown_on_tiles_are_tracked(
+    db_session: AsyncSession, test_database: None
+) -> None:
+    melding = Melding(text="Er ligt afval op straat", state=MeldingStates.CONTACT_INFO_ADDED)
+    melding.public_id = "TILE01"
+    db_session.add(melding)
+    await db_session.flush()
+
+    assert _is_shown_on_tiles(melding) is False
+
+    melding.state = MeldingStates.SUBMITTED
+    assert _is_shown_on_tiles(melding) is True
+    await db_session.flush()
+
+    melding.state = MeldingStates.CONTACT_INFO_ADDED
+    assert _is_shown_on_tiles(melding) is True
@@ -1,13 +1,18 @@
 from os import path
 from typing import Any
+from unittest.mock import AsyncMock, Mock
 
 import pytest
+from meldingen_core.exceptions import NotFoundException
 from meldingen_core.validators import MediaTypeIntegrityError, MediaTypeNotAllowed
 from pydantic_media_type import MediaType
 
+from meldingen.models import FormIoTextAreaComponent, StaticForm, StaticFormTypeEnum
+from meldingen.repositories import StaticFormRepository
 from meldingen.validators import (
     MediaTypeIntegrityValidator,
     MediaTypeValidator,
+    PrimaryFormSnapshot,
     create_match_validator,
     create_non_match_validator,
 )
@@ -119,3 +124,52 @@ class TestMediaTypeIntegrityValidator:
     def test_media_type_does_not_match(self, media_type_integrity_validator: MediaTypeIntegrityValidator) -> None:
         with pytest.raises(MediaTypeIntegrityError):
             media_type_integrity_validator("image/jpeg", self._get_header())
+
+
+class TestPrimaryFormSnapshot:
+    @pytest.fixture
+    def repository(self) -> Mock:
+        primary_form = StaticForm(type=StaticFormTypeEnum.primary, title="Primary form")
+        primary_form.components.append(FormIoTextAreaComponent(label="Waar gaat het om?", key="text", jsonlogic="{}"))
+
+        repository = Mock(StaticFormRepository)
+        repository.find_by_type = AsyncMock(return_value=primary_form)
+
+        return repository
+
+    @pytest.mark.anyio
+    async def test_rule_is_loaded_once(self, repository: Mock) -> None:
+        snapshot = PrimaryFormSnapshot(max_age=60)
+
+        assert await snapshot.jsonlogic(repository) == "{}"
+        assert await snapshot.jsonlogic(repository) == "{}"
+        assert repository.find_by_type.await_count == 1
+
+    @pytest.mark.anyio
+    async def test_rule_is_loaded_again_when_invalidated(self, repository: Mock) -> None:
+        snapshot = PrimaryFormSnapshot(max_age=60)
+
+        await snapshot.jsonlogic(repository)
+        snapshot.invalidate()
+        await snapshot.jsonlogic(repository)
+
+        assert repository.find_by_type.await_count == 2
+
+    @pytest.mark.anyio
+    async def test_rule_is_loaded_again_when_too_old(self, repository: Mock) -> None:
+        snapshot = PrimaryFormSnapshot(max_age=0)
+
+        await snapshot.jsonlogic(repository)
+        await snapshot.jsonlogic(repository)
+
+        assert repository.find_by_type.await_count == 2
+
+    @pytest.mark.anyio
+    async def test_missing_primary_form_has_no_rule(self) -> None:
+        repository = Mock(StaticFormRepository)
+        repository.find_by_type = AsyncMock(side_effect=NotFoundException())
+        snapshot = PrimaryFormSnapshot(max_age=60)
+
+        assert await snapshot.jsonlogic(repository) is None
+        assert await snapshot.jsonlogic(repository) is None
+        assert repository.find_by_type.await_count == 1